@@ -5,6 +5,7 @@ import string
 import os
 import time
 import re
+import heapq
 
 #----------------------------------------------------------------------------------------------
 # CONSTANTES Y CONFIGURACIÓN
@@ -46,6 +47,35 @@ ARCHIVO_HUESPEDES = 'huespedes.json'
 ARCHIVO_HABITACIONES = 'habitaciones.json'
 ARCHIVO_RESERVAS = 'reservas.json'
 
+#----------------------------------------------------------------------------------------------
+# FECHAS COMO NÚMERO DE DÍA
+#----------------------------------------------------------------------------------------------
+# Las comparaciones de fechas se hacen con el número de día (ordinal). Todas las fechas DDMMAA
+# de los años permitidos se convierten una sola vez al iniciar y se guardan en una tabla.
+ORDINALES_DDMMAA = {}
+
+def construir_tabla_ordinales():
+    """Arma la tabla DDMMAA → número de día con todas las fechas de los años ANIO_MIN a ANIO_MAX."""
+    dia = datetime.date(2000 + ANIO_MIN, 1, 1)
+    ultimo = datetime.date(2000 + ANIO_MAX, 12, 31).toordinal()
+    for ordinal in range(dia.toordinal(), ultimo + 1):
+        ORDINALES_DDMMAA[datetime.date.fromordinal(ordinal).strftime("%d%m%y")] = ordinal
+
+construir_tabla_ordinales()
+
+def fecha_a_ordinal(fecha_str):
+    """Convierte una fecha DDMMAA en su número de día (ordinal); devuelve None si no es válida."""
+    ordinal = ORDINALES_DDMMAA.get(fecha_str)
+    if ordinal is not None:
+        return ordinal
+    # Fuera de los años de la tabla: se calcula
+    if len(fecha_str) != 6 or not fecha_str.isdigit():
+        return None
+    dia, mes, anio = int(fecha_str[:2]), int(fecha_str[2:4]), 2000 + int(fecha_str[4:6])
+    if not es_fecha_valida(dia, mes, anio):
+        return None
+    return datetime.date(anio, mes, dia).toordinal()
+
 #----------------------------------------------------------------------------------------------
 # FUNCIONES DE VALIDACIÓN
 #----------------------------------------------------------------------------------------------
@@ -153,14 +183,18 @@ def validar_fecha_ddmmaa(fecha_str, tipo="fecha"):
     
     return True, ""
 
-def validar_unicidad_email_telefono(huespedes, email, telefono, id_excluir=None):
-    """Valida que el email y teléfono sean únicos entre huéspedes activos."""
-    for idh, datos in huespedes.items():
-        if idh != id_excluir and datos["activo"]:
-            if datos["email"] == email:
-                return False, f"Email '{email}' ya existe en huésped {idh}"
-            if str(datos["telefono"]) == str(telefono):
-                return False, f"Teléfono '{telefono}' ya existe en huésped {idh}"
+def validar_unicidad_email_telefono(claves_vistas, email, telefono):
+    """
+    Valida que el email y teléfono no se repitan en la carga. 'claves_vistas' guarda
+    {"email": {email: id}, "telefono": {teléfono: id}} de los huéspedes ya aceptados, así
+    toda la carga se valida en una sola pasada. Los emails se comparan sin mayúsculas.
+    """
+    idh = claves_vistas["email"].get(email.strip().lower())
+    if idh is not None:
+        return False, f"Email '{email}' ya existe en huésped {idh}"
+    idh = claves_vistas["telefono"].get(str(telefono).strip())
+    if idh is not None:
+        return False, f"Teléfono '{telefono}' ya existe en huésped {idh}"
     return True, ""
 
 def validar_formato_id_reserva(rid):
@@ -187,24 +221,12 @@ def migrar_reservas_ddmmaa(reservas):
     # Validar fechas migradas
     reservas_invalidas = []
     for rid, datos in reservas.items():
-        try:
-            # Validar fecha de entrada
-            if len(datos["fechaEntrada"]) == 6:
-                dia = int(datos["fechaEntrada"][:2])
-                mes = int(datos["fechaEntrada"][2:4])
-                anio = int(datos["fechaEntrada"][4:6])
-                if not es_fecha_valida(dia, mes, 2000 + anio):
-                    reservas_invalidas.append(rid)
-                else:
-                    # Validar fecha de salida
-                    if len(datos["fechaSalida"]) == 6:
-                        dia = int(datos["fechaSalida"][:2])
-                        mes = int(datos["fechaSalida"][2:4])
-                        anio = int(datos["fechaSalida"][4:6])
-                        if not es_fecha_valida(dia, mes, 2000 + anio):
-                            reservas_invalidas.append(rid)
-        except (ValueError, IndexError):
-            reservas_invalidas.append(rid)
+        # Validar fecha de entrada y, si es válida, la de salida
+        if len(datos["fechaEntrada"]) == 6:
+            if fecha_a_ordinal(datos["fechaEntrada"]) is None:
+                reservas_invalidas.append(rid)
+            elif len(datos["fechaSalida"]) == 6 and fecha_a_ordinal(datos["fechaSalida"]) is None:
+                reservas_invalidas.append(rid)
     # Remover reservas con fechas inválidas
     for rid in reservas_invalidas:
         if rid in reservas:
@@ -295,6 +317,7 @@ def generar_huespedes():
     
     huespedes = {}
     errores = []
+    claves_vistas = {"email": {}, "telefono": {}}
     
     for i, datos in enumerate(datos_base, 1):
         idh = f"H{i}"
@@ -343,13 +366,15 @@ def generar_huespedes():
         
         # Validar unicidad de email y teléfono
         if huésped_válido:
-            valido, error = validar_unicidad_email_telefono(huespedes, datos["email"], datos["telefono"])
+            valido, error = validar_unicidad_email_telefono(claves_vistas, datos["email"], datos["telefono"])
             if not valido:
                 errores.append(f"Huésped {idh}: {error}")
                 huésped_válido = False
         
         # Si todas las validaciones pasan, agregar el huésped
         if huésped_válido:
+            claves_vistas["email"][datos["email"].strip().lower()] = idh
+            claves_vistas["telefono"][str(datos["telefono"]).strip()] = idh
             huespedes[idh] = {
                 "activo": True,
                 "nombre": datos["nombre"],
@@ -445,41 +470,18 @@ def generar_habitaciones():
 
 def verificar_solapamiento_reserva(reservas, id_hab, fecha_entrada, fecha_salida):
     """Verifica si una nueva reserva se solapa con reservas existentes."""
-    try:
-        dia_ent = int(fecha_entrada[:2])
-        mes_ent = int(fecha_entrada[2:4])
-        anio_ent = int(fecha_entrada[4:6])
-        dia_sal = int(fecha_salida[:2])
-        mes_sal = int(fecha_salida[2:4])
-        anio_sal = int(fecha_salida[4:6])
-        
-        fecha_ent = datetime.datetime(2000 + anio_ent, mes_ent, dia_ent)
-        fecha_sal = datetime.datetime(2000 + anio_sal, mes_sal, dia_sal)
-        
-        for rid, datos in reservas.items():
-            if datos["idhabitacion"] == id_hab:
-                fe_existente = datos["fechaEntrada"]
-                fs_existente = datos["fechaSalida"]
-                
-                if len(fe_existente) == 6 and len(fs_existente) == 6:
-                    try:
-                        dia_e_ex = int(fe_existente[:2])
-                        mes_e_ex = int(fe_existente[2:4])
-                        anio_e_ex = int(fe_existente[4:6])
-                        dia_s_ex = int(fs_existente[:2])
-                        mes_s_ex = int(fs_existente[2:4])
-                        anio_s_ex = int(fs_existente[4:6])
-                        
-                        inicio_existente = datetime.datetime(2000 + anio_e_ex, mes_e_ex, dia_e_ex)
-                        fin_existente = datetime.datetime(2000 + anio_s_ex, mes_s_ex, dia_s_ex)
-                        
-                        if fecha_ent < fin_existente and fecha_sal > inicio_existente:
-                            return True
-                    except (ValueError, IndexError):
-                        pass
-        return False
-    except (ValueError, IndexError):
+    entrada = fecha_a_ordinal(fecha_entrada)
+    salida = fecha_a_ordinal(fecha_salida)
+    if entrada is None or salida is None:
         return False
+    for rid, datos in reservas.items():
+        if datos["idhabitacion"] == id_hab:
+            inicio_existente = fecha_a_ordinal(datos["fechaEntrada"])
+            fin_existente = fecha_a_ordinal(datos["fechaSalida"])
+            if inicio_existente is not None and fin_existente is not None:
+                if entrada < fin_existente and salida > inicio_existente:
+                    return True
+    return False
 
 def generar_reservas(huespedes, habitaciones):
     """Genera el diccionario de reservas con validaciones exhaustivas."""
@@ -533,25 +535,16 @@ def generar_reservas(huespedes, habitaciones):
             
             # Verificar que la fecha de salida sea posterior a la de entrada
             if reserva_valida:
-                try:
-                    dia_ent = int(fecha_entrada[:2])
-                    mes_ent = int(fecha_entrada[2:4])
-                    anio_ent = int(fecha_entrada[4:6])
-                    dia_sal = int(fecha_salida[:2])
-                    mes_sal = int(fecha_salida[2:4])
-                    anio_sal = int(fecha_salida[4:6])
-                    
-                    fecha_ent = datetime.datetime(2000 + anio_ent, mes_ent, dia_ent)
-                    fecha_sal = datetime.datetime(2000 + anio_sal, mes_sal, dia_sal)
-                    
-                    if fecha_sal <= fecha_ent:
-                        errores.append(f"Reserva {id_reserva}: La fecha de salida debe ser posterior a la de entrada")
-                        reserva_valida = False
-                    else:
-                        cantidad_noches = (fecha_sal - fecha_ent).days
-                except ValueError:
+                entrada = fecha_a_ordinal(fecha_entrada)
+                salida = fecha_a_ordinal(fecha_salida)
+                if entrada is None or salida is None:
                     errores.append(f"Reserva {id_reserva}: Error al calcular fechas")
                     reserva_valida = False
+                elif salida <= entrada:
+                    errores.append(f"Reserva {id_reserva}: La fecha de salida debe ser posterior a la de entrada")
+                    reserva_valida = False
+                else:
+                    cantidad_noches = salida - entrada
             
             # Seleccionar huésped y habitación
             if reserva_valida:
@@ -605,16 +598,70 @@ def generar_reservas(huespedes, habitaciones):
 #----------------------------------------------------------------------------------------------
 # FUNCIONES DE PERSISTENCIA
 #----------------------------------------------------------------------------------------------
-def hacer_backup_archivo(ruta):
-    """Función de backup deshabilitada."""
-    return True
+# Mismo formato de backups que Entrega2.py ("archivo.AAAAMMDD_HHMMSS.bak"), de modo que el sistema
+# principal pueda restaurarlos. Este script reemplaza los archivos enteros, así que cada guardado
+# deja un backup completo de los datos nuevos (no hace falta compararlos con los anteriores) y el
+# sistema principal sigue con incrementales a partir de él.
+FORMATO_MARCA_BACKUP = "%Y%m%d_%H%M%S"
+
+def escribir_json_atomico(datos, archivo):
+    """Escribe un JSON en un temporal sincronizado a disco y lo renombra sobre el archivo destino."""
+    temporal = archivo + ".tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, ensure_ascii=False, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, archivo)
+
+def listar_backups(archivo):
+    """Devuelve los backups de un archivo como lista de (marca, ruta), en orden cronológico."""
+    carpeta = os.path.dirname(archivo) or "."
+    prefijo = os.path.basename(archivo) + "."
+    backups = []
+    for nombre in os.listdir(carpeta):
+        if nombre.startswith(prefijo) and nombre.endswith(".bak"):
+            marca = nombre[len(prefijo):-4]
+            if len(marca) >= 15 and marca[:8].isdigit() and marca[9:15].isdigit():
+                backups.append((marca, os.path.join(carpeta, nombre)))
+    backups.sort()
+    return backups
+
+def escribir_backup(archivo, tipo, cambios, eliminados, instante):
+    """Escribe un archivo de backup con marca de tiempo."""
+    marca = time.strftime(FORMATO_MARCA_BACKUP, time.localtime(instante))
+    ruta = f"{archivo}.{marca}.bak"
+    secuencia = 0
+    while os.path.exists(ruta):
+        secuencia += 1
+        ruta = f"{archivo}.{marca}_{str(secuencia).zfill(2)}.bak"
+    escribir_json_atomico({
+        "archivo": os.path.basename(archivo),
+        "fecha": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(instante)),
+        "tipo": tipo,
+        "incrementales": 0,
+        "cambios": cambios,
+        "eliminados": eliminados
+    }, ruta)
+
+def hacer_backup_archivo(ruta, datos):
+    """Respalda el archivo antes de sobrescribirlo con un backup completo de los datos nuevos."""
+    try:
+        if os.path.exists(ruta) and not listar_backups(ruta):
+            # Primer backup: se conserva completo el archivo actual, con su fecha de modificación
+            with open(ruta, 'r', encoding='utf-8') as f:
+                anterior = json.load(f)
+            escribir_backup(ruta, "completo", anterior, [], os.path.getmtime(ruta))
+        escribir_backup(ruta, "completo", datos, [], time.time())
+        return True
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠️  No se pudo respaldar {ruta}: {e}")
+        return False
 
 def guardar_archivo_json(datos, archivo, descripcion):
     """Guarda datos en un archivo JSON con manejo de errores."""
     try:
-        hacer_backup_archivo(archivo)
-        with open(archivo, 'w', encoding='utf-8') as f:
-            json.dump(datos, f, ensure_ascii=False, indent=4)
+        hacer_backup_archivo(archivo, datos)
+        escribir_json_atomico(datos, archivo)
         print(f"✅ {descripcion} guardado en {archivo}")
         return True
     except Exception as e:
@@ -624,6 +671,37 @@ def guardar_archivo_json(datos, archivo, descripcion):
 #----------------------------------------------------------------------------------------------
 # FUNCIONES DE VALIDACIÓN DE INTEGRIDAD
 #----------------------------------------------------------------------------------------------
+def detectar_solapamientos(reservas, intervalos):
+    """
+    Devuelve los pares (rid1, rid2), con rid1 < rid2, de reservas de una misma habitación que se solapan
+    o que tienen una fecha inexistente (intervalo con None). Agrupa por habitación, ordena por entrada y
+    barre las estadías manteniendo las abiertas en un heap por salida: O(n log n) más los conflictos.
+    Los pares salen en el orden en que los informaba la comparación de todas contra todas.
+    """
+    por_habitacion = {}
+    for rid, (inicio, fin) in intervalos.items():
+        por_habitacion.setdefault(reservas[rid]['idhabitacion'], []).append((inicio, fin, rid))
+    pares = set()
+    for estadias in por_habitacion.values():
+        validas = sorted((inicio, rid, fin) for inicio, fin, rid in estadias if inicio is not None and fin is not None)
+        if len(validas) < len(estadias):
+            # Una fecha inexistente no se puede comparar: se informa junto a cada reserva de la habitación
+            for inicio, fin, rid in estadias:
+                if inicio is None or fin is None:
+                    for otra_inicio, otra_fin, otra in estadias:
+                        if otra != rid:
+                            pares.add((min(rid, otra), max(rid, otra)))
+        abiertas = []  # (salida, id, entrada) de las estadías que siguen abiertas
+        for inicio, rid, fin in validas:
+            while abiertas and abiertas[0][0] <= inicio:
+                heapq.heappop(abiertas)
+            for otra_fin, otra, otra_inicio in abiertas:
+                if fin > otra_inicio:
+                    pares.add((min(rid, otra), max(rid, otra)))
+            heapq.heappush(abiertas, (fin, rid, inicio))
+    posicion = {rid: i for i, rid in enumerate(reservas)}
+    return [(rid1, rid2) for _, _, rid1, rid2 in sorted((posicion[rid1], posicion[rid2], rid1, rid2) for rid1, rid2 in pares)]
+
 def validar_integridad_referencial(huespedes, habitaciones, reservas):
     """Valida la integridad referencial entre las entidades."""
     print("🔍 Validando integridad referencial...")
@@ -642,36 +720,19 @@ def validar_integridad_referencial(huespedes, habitaciones, reservas):
         elif not habitaciones[reserva['idhabitacion']]['activo']:
             errores.append(f"Reserva {rid}: Habitación {reserva['idhabitacion']} está inactiva")
     
-    # Verificar solapamientos de reservas
-    for rid1, reserva1 in reservas.items():
-        for rid2, reserva2 in reservas.items():
-            if rid1 < rid2:  # Solo comparar cuando rid1 < rid2 para evitar duplicados
-                # Solo verificar solapamientos si es la misma habitación
-                if reserva1['idhabitacion'] == reserva2['idhabitacion']:
-                    try:
-                        # Convertir fechas a objetos datetime para comparación
-                        fe1 = reserva1['fechaEntrada']
-                        fs1 = reserva1['fechaSalida']
-                        fe2 = reserva2['fechaEntrada']
-                        fs2 = reserva2['fechaSalida']
-                        
-                        if len(fe1) == 6 and len(fs1) == 6 and len(fe2) == 6 and len(fs2) == 6:
-                            dia_e1, mes_e1, anio_e1 = int(fe1[:2]), int(fe1[2:4]), int(fe1[4:6])
-                            dia_s1, mes_s1, anio_s1 = int(fs1[:2]), int(fs1[2:4]), int(fs1[4:6])
-                            dia_e2, mes_e2, anio_e2 = int(fe2[:2]), int(fe2[2:4]), int(fe2[4:6])
-                            dia_s2, mes_s2, anio_s2 = int(fs2[:2]), int(fs2[2:4]), int(fs2[4:6])
-                            
-                            inicio1 = datetime.datetime(2000 + anio_e1, mes_e1, dia_e1)
-                            fin1 = datetime.datetime(2000 + anio_s1, mes_s1, dia_s1)
-                            inicio2 = datetime.datetime(2000 + anio_e2, mes_e2, dia_e2)
-                            fin2 = datetime.datetime(2000 + anio_s2, mes_s2, dia_s2)
-                            
-                            # Verificar solapamiento
-                            if inicio1 < fin2 and fin1 > inicio2:
-                                errores.append(f"Solapamiento detectado: Reserva {rid1} ({fe1}-{fs1}) y {rid2} ({fe2}-{fs2}) en habitación {reserva1['idhabitacion']}")
-                            # Si no hay solapamiento, continuar con la siguiente comparación
-                    except (ValueError, IndexError) as e:
-                        errores.append(f"Error al validar fechas de reservas {rid1} y {rid2}: {e}")
+    # Verificar solapamientos de reservas (las fechas de cada reserva se convierten una sola vez)
+    intervalos = {}
+    for rid, reserva in reservas.items():
+        if len(reserva['fechaEntrada']) == 6 and len(reserva['fechaSalida']) == 6:
+            intervalos[rid] = (fecha_a_ordinal(reserva['fechaEntrada']), fecha_a_ordinal(reserva['fechaSalida']))
+    for rid1, rid2 in detectar_solapamientos(reservas, intervalos):
+        reserva1, reserva2 = reservas[rid1], reservas[rid2]
+        fe1, fs1 = reserva1['fechaEntrada'], reserva1['fechaSalida']
+        fe2, fs2 = reserva2['fechaEntrada'], reserva2['fechaSalida']
+        if None in intervalos[rid1] + intervalos[rid2]:
+            errores.append(f"Error al validar fechas de reservas {rid1} y {rid2}: fecha inexistente")
+        else:
+            errores.append(f"Solapamiento detectado: Reserva {rid1} ({fe1}-{fs1}) y {rid2} ({fe2}-{fs2}) en habitación {reserva1['idhabitacion']}")
     
     if errores:
         print(f"❌ Se encontraron {len(errores)} errores de integridad:")
@@ -26,6 +26,26 @@ import random
 import string
 import time
 import os
+import hashlib
+import sqlite3
+import itertools
+import mmap
+import array
+import collections
+import bisect
+import heapq
+import csv
+import concurrent.futures
+try:
+    import fcntl
+except ImportError:
+    # Windows: no hay bloqueo entre terminales, pero se mantiene el control de versiones
+    fcntl = None
+try:
+    import numpy
+except ImportError:
+    # Sin NumPy el motor de ocupación usa listas de Python: mismos resultados, más lento
+    numpy = None
 
 #----------------------------------------------------------------------------------------------
 # CONSTANTES Y CONFIGURACIÓN
@@ -54,6 +74,7 @@ MAX_LENGTH_PRECIO = 8
 # Formatos y rangos
 ANIO_MIN = 25
 ANIO_MAX = 27
+MAX_NOCHES_RESERVA = 30
 
 # Opciones válidas
 MEDIOS_DE_PAGO = ["Efectivo", "Tarjeta", "Transferencia", "Débito", "Crédito"]
@@ -61,238 +82,2666 @@ TIPOS_HABITACION = ["Simple", "Doble", "Triple", "Suite", "Familiar"]
 ESTADOS_HABITACION = ["Disponible", "Ocupada", "Mantenimiento"]
 SERVICIOS_POSIBLES = ["WiFi", "TV", "Aire", "Frigobar", "Limpieza", "Desayuno"]
 
+# Expresiones regulares compiladas una sola vez (se usan en cada validación)
+PATRON_EMAIL = re.compile(r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$")
+PATRON_TEXTO_HABITACION = re.compile(r'[a-zA-Z0-9,. ]+')
+# Tabla para quitar acentos en una sola pasada con str.translate
+TABLA_SIN_ACENTOS = str.maketrans("áéíóúüñÁÉÍÓÚÜÑ", "aeiouunAEIOUUN")
+
 # Archivos
 ARCHIVO_HUESPEDES = "huespedes.json"
 ARCHIVO_HABITACIONES = "habitaciones.json"
-ARCHIVO_RESERVAS = "reservas.json"
+# Formato de reservas: "json" (un diccionario) o "jsonl" (una reserva por línea, los informes la leen en flujo)
+FORMATO_RESERVAS = "json"
+ARCHIVO_RESERVAS_JSON = "reservas.json"
+ARCHIVO_RESERVAS_JSONL = "reservas.jsonl"
+# Particiones por año: cada año en reservas.AAAA.json y un manifiesto que las lista
+PARTICIONAR_RESERVAS_POR_ANIO = False
+ARCHIVO_MANIFIESTO_RESERVAS = "reservas.particiones.json"
+if PARTICIONAR_RESERVAS_POR_ANIO:
+    ARCHIVO_RESERVAS = ARCHIVO_MANIFIESTO_RESERVAS
+elif FORMATO_RESERVAS == "jsonl":
+    ARCHIVO_RESERVAS = ARCHIVO_RESERVAS_JSONL
+else:
+    ARCHIVO_RESERVAS = ARCHIVO_RESERVAS_JSON
+ARCHIVO_DIARIO_RESERVAS = "reservas.diario.jsonl"
+
+# Diario de reservas: cantidad de registros a partir de la cual se compacta automáticamente
+MAX_REGISTROS_DIARIO = 500
+
+# Backups: cada cuántos backups incrementales se guarda uno completo (limita lo que lee una restauración)
+MAX_BACKUPS_INCREMENTALES = 50
+
+# Motor de almacenamiento: "json" (archivos JSON) o "sqlite" (base de datos con índices)
+MOTOR_ALMACENAMIENTO = "json"
+ARCHIVO_BASE_SQLITE = "hotel.db"
+
+# Almacén columnar binario de reservas para los informes anuales (se lee con mmap)
+USAR_ALMACEN_COLUMNAR = True
+PREFIJO_ALMACEN_COLUMNAR = "reservas.columnas"
+# Registro de cambios del almacén: pasado este tamaño se descarta y el almacén se reconstruye una vez
+MAX_BYTES_CAMBIOS_COLUMNAR = 1024 * 1024
+# Reservas cambiadas que se buscan de a una en la columna de claves; con más se recorre la columna
+MAX_BUSQUEDAS_COLUMNAR = 32
+
+# Varias terminales sobre la misma carpeta: bloqueo de escritura y monitoreo de esperas
+ARCHIVO_BLOQUEO = "hotel.lock"
+ARCHIVO_MONITOREO_BLOQUEOS = "hotel.bloqueos.jsonl"
+ESPERA_MAXIMA_BLOQUEO = 10.0        # segundos antes de desistir de guardar
+INTERVALO_REINTENTO_BLOQUEO = 0.05  # segundos entre intentos de tomar el bloqueo
+UMBRAL_MONITOREO_ESPERA = 0.5       # esperas más largas se anotan en el archivo de monitoreo
+
+# Índice de intervalos por habitación: con True cada consulta se contrasta con el recorrido completo
+VERIFICAR_INDICE_INTERVALOS = False
+
+# Carga perezosa: registros sueltos leídos por ID que se conservan en memoria (los más recientes)
+MAX_REGISTROS_RECIENTES = 256
+SUFIJO_INDICE_REGISTROS = ".indice"
+
+# Motor de ocupación: cantidad de noches, desde hoy, del informe de disponibilidad
+DIAS_PLANIFICACION = 90
+
+# Conciliación de reservas: minutos entre pasadas automáticas desde el menú principal
+MINUTOS_ENTRE_CONCILIACIONES = 5
+
+# Validación masiva: desde cuántos registros se reparte en varios procesos y de a cuántos
+MIN_REGISTROS_VALIDACION_PARALELA = 20000
+REGISTROS_POR_FRAGMENTO = 25000
+
+# Búsqueda de huéspedes: cuántos resultados se muestran como máximo (los mejores primero)
+MAX_RESULTADOS_BUSQUEDA = 50
+# Búsqueda aproximada de huéspedes: cuántas letras cambiadas, agregadas o quitadas se toleran por palabra
+DISTANCIA_MAXIMA_BUSQUEDA = 2
+# Autocompletado al registrar reservas: cuántas sugerencias se muestran para un ID no encontrado
+MAX_SUGERENCIAS_AUTOCOMPLETADO = 8
 
 #----------------------------------------------------------------------------------------------
-# FUNCIONES
+# ALMACÉN DE DATOS EN MEMORIA
 #----------------------------------------------------------------------------------------------
-def generar_id_reserva(reservas):
-    """Genera un ID único tipo RSVxxxnnn para la reserva (exactamente 9 caracteres)."""
-    intentos = 0
-    max_intentos = 1000
-    
-    while intentos < max_intentos:
-        numeros = ''.join(random.choices(string.digits, k=3))
-        letras = ''.join(random.choices(string.ascii_uppercase, k=3))
-        rid = f"RSV{numeros}{letras}"
-        # Verificar que tenga exactamente 9 caracteres
-        if len(rid) == MAX_LENGTH_ID_RESERVA and rid not in reservas:
-            return rid
-        intentos += 1
-    
-    # Si no se encuentra un ID único después de muchos intentos, generar uno con timestamp
-    timestamp = str(int(time.time()))[-3:]
-    rid = f"RSV{timestamp}{random.choice(string.ascii_uppercase)}{random.choice(string.ascii_uppercase)}{random.choice(string.ascii_uppercase)}"
-    return rid
+# Cada archivo JSON se lee una sola vez por sesión. Se vuelve a leer únicamente si su fecha
+# de modificación o su tamaño cambiaron en disco (por ejemplo, si otra terminal lo guardó).
+ALMACEN = {}
+ESTADISTICAS_ALMACEN = {"cargas": 0, "recargas_evitadas": 0}
 
-def input_int(msg):
-    """Solicita un entero por consola, validando la entrada."""
-    while True:
-        try:
-            dato = input(msg)
-            if dato.lower() in ['cancelar', 'cancel', 'c']:
-                return None
-            if dato.isdigit():
-                return int(dato)
-            print("❌ Ingrese un número válido o 'cancelar' para salir.")
-        except KeyboardInterrupt:
-            print("\n❌ Operación cancelada por el usuario.")
-            return None
+def firma_archivo(archivo):
+    """Devuelve la firma (fecha de modificación, tamaño) de un archivo en disco."""
+    estado = os.stat(archivo)
+    return (estado.st_mtime_ns, estado.st_size)
 
-def input_float(msg):
-    """Solicita un número flotante por consola, validando la entrada."""
-    while True:
-        try:
-            dato = input(msg).strip()
-            if dato.lower() in ['cancelar', 'cancel', 'c']:
-                return None
-            # Permite un punto decimal.
-            if dato.count('.') <= 1 and dato.replace('.', '', 1).isdigit():
-                valor = float(dato)
-                if valor >= 0:
-                    return valor
-                else:
-                    print("❌ No se permiten valores negativos.")
-            else:
-                print("❌ Ingrese un valor numérico positivo o 'cancelar' para salir.")
-        except KeyboardInterrupt:
-            print("\n❌ Operación cancelada por el usuario.")
-            return None
+def firma_almacen(archivo):
+    """Devuelve la firma con la que el almacén detecta cambios: archivo, diario (si corresponde) y versión."""
+    if usa_sqlite(archivo):
+        return ("sqlite", sqlite_version_datos())
+    version = leer_version(archivo)
+    diario = firma_diario() if archivo_usa_diario(archivo) else None
+    return (firma_archivo(archivo), diario, version)
 
-def input_email(msg):
-    """Solicita un email por consola, validando su formato básico."""
-    while True:
-        email = input(msg).strip()
-        # Validación simple: contiene un '@' y al menos un '.' después del '@'.
-        partes = email.split('@')
-        if len(partes) == 2 and partes[0] and partes[1] and '.' in partes[1]:
-            return email
-        print("Ingrese un email válido.")
+def cargar_archivo(archivo):
+    """Devuelve los datos de un archivo JSON desde el almacén, leyéndolo solo si cambió en disco."""
+    firma = firma_almacen(archivo)
+    entrada = ALMACEN.get(archivo)
+    if entrada is not None and entrada["firma"] == firma:
+        ESTADISTICAS_ALMACEN["recargas_evitadas"] += 1
+        return entrada["datos"]
+    if usa_sqlite(archivo):
+        datos = sqlite_cargar_tabla(TABLAS_SQLITE[archivo])
+    else:
+        datos = leer_json_con_diario(archivo)
+        registrar_lectura(archivo, datos, firma[2])
+    ALMACEN[archivo] = {"datos": datos, "firma": firma}
+    ESTADISTICAS_ALMACEN["cargas"] += 1
+    return datos
 
-def input_opciones(msg, opciones):
-    """Solicita una opción válida de un conjunto dado."""
-    while True:
-        try:
-            op = input(msg)
-            if op in opciones:
-                return op
-            print(f"❌ Opción inválida. Opciones válidas: {', '.join(opciones)}")
-        except KeyboardInterrupt:
-            print("\n❌ Operación cancelada por el usuario.")
+def leer_json_con_diario(archivo):
+    """Lee un archivo JSON (o JSON Lines) y le aplica el diario de reservas si corresponde."""
+    datos = leer_datos_archivo(archivo)
+    if archivo_usa_diario(archivo):
+        aplicar_diario(archivo, datos)
+    return datos
+
+def actualizar_almacen(archivo, datos):
+    """Registra en el almacén los datos recién guardados junto con la firma actual del archivo."""
+    olvidar_registros_recientes(archivo)
+    try:
+        firma = firma_almacen(archivo)
+    except OSError:
+        descartar_del_almacen(archivo)
+        return
+    ALMACEN[archivo] = {"datos": datos, "firma": firma}
+    if not usa_sqlite(archivo):
+        registrar_lectura(archivo, datos, firma[2])
+
+def descartar_del_almacen(archivo):
+    """Quita un archivo del almacén para que la próxima lectura vuelva a disco."""
+    if archivo in ALMACEN:
+        del ALMACEN[archivo]
+    olvidar_registros_recientes(archivo)
+
+def datos_en_almacen(archivo):
+    """Devuelve los datos de un archivo si ya están en el almacén y al día con el disco; si no, None."""
+    entrada = ALMACEN.get(archivo)
+    if entrada is None:
+        return None
+    try:
+        if entrada["firma"] != firma_almacen(archivo):
             return None
+    except OSError:
+        return None
+    return entrada["datos"]
 
-def es_fecha_valida(dia, mes, anio):
-    """Chequea si una fecha es válida (ej: que no sea 31 de abril)."""
-    if not (1 <= mes <= 12):
-        return False
-    
-    dias_por_mes = [0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
-    
-    # Manejo de año bisiesto
-    if (anio % 4 == 0 and anio % 100 != 0) or (anio % 400 == 0):
-        dias_por_mes[2] = 29
-        
-    if not (1 <= dia <= dias_por_mes[mes]):
-        return False
-        
-    return True
+def mostrar_estadisticas_almacen():
+    """Muestra cuántos archivos se leyeron de disco y cuántas relecturas se evitaron."""
+    print("\n--- Estadísticas del almacén en memoria ---")
+    print(f"🗄️ Motor de almacenamiento: {MOTOR_ALMACENAMIENTO}")
+    print(f"📂 Archivos en memoria: {len(ALMACEN)}")
+    for archivo, entrada in ALMACEN.items():
+        print(f"   - {archivo}: {len(entrada['datos'])} registros")
+    print(f"📥 Lecturas desde disco: {ESTADISTICAS_ALMACEN['cargas']}")
+    print(f"⚡ Relecturas evitadas: {ESTADISTICAS_ALMACEN['recargas_evitadas']}")
+    print(f"📝 Registros pendientes en el diario de reservas: {ESTADO_DIARIO['registros']}")
+    print(f"🔒 Escrituras con bloqueo: {ESTADISTICAS_BLOQUEO['bloqueos']} "
+          f"(espera total {ESTADISTICAS_BLOQUEO['espera_total']:.3f} s, máxima {ESTADISTICAS_BLOQUEO['espera_maxima']:.3f} s, "
+          f"{ESTADISTICAS_BLOQUEO['reintentos_bloqueo']} reintentos)")
+    print(f"🔁 Escrituras sobre datos desactualizados: {ESTADISTICAS_BLOQUEO['escrituras_rebasadas']} "
+          f"({ESTADISTICAS_BLOQUEO['reservas_rechazadas']} reservas rechazadas por solapamiento)")
+    print(f"📅 Índice de intervalos por habitación: {ESTADISTICAS_INTERVALOS['consultas']} consultas, "
+          f"{ESTADISTICAS_INTERVALOS['construcciones']} construcciones"
+          + (f", {ESTADISTICAS_INTERVALOS['verificaciones']} verificadas ({ESTADISTICAS_INTERVALOS['discrepancias']} discrepancias)"
+             if VERIFICAR_INDICE_INTERVALOS else ""))
+    print(f"🗂️  Índices por huésped y habitación: {ESTADISTICAS_INDICE_POR_ID['consultas']} consultas, "
+          f"{ESTADISTICAS_INDICE_POR_ID['construcciones']} construcciones, "
+          f"{ESTADISTICAS_INDICE_POR_ID['depuradas']} reservas finalizadas depuradas")
+    print(f"🔑 Índices de unicidad: {ESTADISTICAS_UNICIDAD['consultas']} consultas, {ESTADISTICAS_UNICIDAD['construcciones']} construcciones")
+    print(f"🔎 Búsqueda de huéspedes: {ESTADISTICAS_TEXTO_HUESPEDES['consultas']} consultas, "
+          f"{ESTADISTICAS_TEXTO_HUESPEDES['construcciones']} construcciones, {ESTADISTICAS_TEXTO_HUESPEDES['textos_revisados']} textos revisados")
+    print(f"🔤 Búsqueda aproximada de huéspedes: {ESTADISTICAS_ARBOL_NOMBRES['consultas']} consultas, "
+          f"{ESTADISTICAS_ARBOL_NOMBRES['construcciones']} construcciones, {ESTADISTICAS_ARBOL_NOMBRES['comparaciones']} comparaciones de palabras")
+    print(f"⌨️  Autocompletado de IDs: {ESTADISTICAS_AUTOCOMPLETADO['consultas']} consultas, "
+          f"{ESTADISTICAS_AUTOCOMPLETADO['construcciones']} construcciones")
+    restantes = ids_reserva_restantes()
+    if restantes is not None:
+        print(f"🎫 IDs de reserva: {ESPACIO_IDS_RESERVA - restantes} asignados por el contador, {restantes} disponibles "
+              f"({restantes / ESPACIO_IDS_RESERVA:.4%} del espacio)")
+    print(f"🔄 Conciliaciones: {ESTADO_CONCILIACION['ejecuciones']} "
+          f"({ESTADO_CONCILIACION['finalizadas']} reservas finalizadas, {ESTADO_CONCILIACION['habitaciones']} cambios de estado)")
+    print(f"🧩 Registros sueltos en memoria: {len(REGISTROS_RECIENTES)} de {MAX_REGISTROS_RECIENTES} "
+          f"({ESTADISTICAS_LECTURA['aciertos']} aciertos, {ESTADISTICAS_LECTURA['lecturas']} lecturas por índice)")
+    if ESTADISTICAS_LECTURA["operaciones"]:
+        print("📏 Bytes leídos de disco por operación:")
+        for nombre, operacion in ESTADISTICAS_LECTURA["operaciones"].items():
+            promedio = operacion["bytes"] / operacion["veces"] if operacion["veces"] else 0
+            print(f"   - {nombre}: {operacion['veces']} veces, última {operacion['ultima']} bytes, "
+                  f"promedio {promedio:.0f} bytes, total {operacion['bytes']} bytes")
 
-def validar_email_regex(email):
-    """Valida el email usando una expresión regular estricta."""
-    if len(email) > 254:  # RFC 5321 limit
-        return False
-    pat = r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$"
-    return re.match(pat, email) is not None
+#----------------------------------------------------------------------------------------------
+# DIARIO DE RESERVAS (JSON LINES)
+#----------------------------------------------------------------------------------------------
+# Cada reserva nueva y cada cambio de estado de habitación se agrega como una línea al diario,
+# en lugar de reescribir reservas.json y habitaciones.json completos. Al cargar, los archivos
+# se leen y luego se les aplica el diario. La compactación vuelca el diario sobre los archivos.
+ESTADO_DIARIO = {"registros": 0}
 
-def validar_dni(dni):
-    """Valida que el DNI tenga entre 6 y 8 caracteres numéricos."""
-    if isinstance(dni, int):
-        if dni < 0:
-            return False
-        dni = str(dni)
-    elif isinstance(dni, str):
-        if dni.startswith('-'):
-            return False
-    else:
+def archivo_usa_diario(archivo):
+    """Indica si a un archivo se le aplican los registros del diario de reservas."""
+    if MOTOR_ALMACENAMIENTO != "json":
         return False
-    
-    return dni.isdigit() and MIN_LENGTH_DNI <= len(dni) <= MAX_LENGTH_DNI
+    return archivo == ARCHIVO_RESERVAS or archivo == ARCHIVO_HABITACIONES
 
-def validar_telefono(telefono):
-    """Valida que el teléfono tenga el formato correcto."""
-    telefono_str = str(telefono)
-    # Permitir + solo al inicio, y solo si hay más de 7 dígitos después
-    if telefono_str.startswith('+'):
-        resto = telefono_str[1:]
-        if not (resto.isdigit() and MIN_LENGTH_TELEFONO <= len(resto) <= MAX_LENGTH_TELEFONO):
-            return False
-        if len(resto) > 15:  # Máximo 15 dígitos después del +
-            return False
+def firma_diario():
+    """Devuelve la firma del diario de reservas en disco, o None si no hay diario pendiente."""
+    try:
+        return firma_archivo(ARCHIVO_DIARIO_RESERVAS)
+    except FileNotFoundError:
+        return None
+
+def leer_diario():
+    """Lee todos los registros del diario. Una línea incompleta (corte durante la escritura) se ignora."""
+    registros = []
+    try:
+        with open(ARCHIVO_DIARIO_RESERVAS, mode='r', encoding='utf-8') as f:
+            sumar_bytes_leidos(os.fstat(f.fileno()).st_size)
+            for linea in f:
+                linea = linea.strip()
+                if linea:
+                    try:
+                        registros.append(json.loads(linea))
+                    except json.JSONDecodeError:
+                        pass
+    except FileNotFoundError:
+        pass
+    ESTADO_DIARIO["registros"] = len(registros)
+    return registros
+
+def aplicar_diario(archivo, datos):
+    """Aplica sobre los datos cargados de un archivo los registros del diario que le corresponden."""
+    for registro in leer_diario():
+        if archivo == ARCHIVO_RESERVAS and registro["tipo"] == "reserva":
+            datos[registro["id"]] = registro["datos"]
+        elif archivo == ARCHIVO_HABITACIONES and registro["tipo"] == "estado_habitacion":
+            if registro["id"] in datos:
+                datos[registro["id"]]["estado"] = registro["estado"]
+
+def anotar_en_diario(registros):
+    """Agrega registros al final del diario, fuerza su escritura a disco y avanza la versión de los archivos."""
+    tomar_bloqueo("diario")
+    try:
+        firma_columnar_previa = firma_columnar()
+        with open(ARCHIVO_DIARIO_RESERVAS, mode='a+b') as f:
+            # Si la última línea quedó incompleta, se la cierra para no pegarle el registro nuevo
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+            for registro in registros:
+                f.write((json.dumps(registro, ensure_ascii=False) + "\n").encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+        incrementar_version(ARCHIVO_RESERVAS)
+        incrementar_version(ARCHIVO_HABITACIONES)
+        anotar_cambios_columnar(firma_columnar_previa, [registro["id"] for registro in registros if registro["tipo"] == "reserva"])
+    finally:
+        soltar_bloqueo()
+    ESTADO_DIARIO["registros"] += len(registros)
+
+def registrar_reserva_en_diario(reservas, rid, idhabitacion, estado):
+    """
+    Persiste una reserva nueva y el estado de su habitación como dos líneas del diario.
+    Las habitaciones en memoria se actualizan solo si estaban al día (pueden no estar cargadas).
+    Con reservas particionadas, 'reservas' son solo las de las particiones de la estadía.
+    """
+    habitaciones = datos_en_almacen(ARCHIVO_HABITACIONES)
+    diario_previo = firma_diario()
+    try:
+        anotar_en_diario([
+            {"tipo": "reserva", "id": rid, "datos": reservas[rid]},
+            {"tipo": "estado_habitacion", "id": idhabitacion, "estado": estado}
+        ])
+    except (OSError, TimeoutError) as e:
+        print(f"❌ Error al escribir el diario de reservas: {e}")
+        descartar_del_almacen(ARCHIVO_RESERVAS)
+        descartar_del_almacen(ARCHIVO_HABITACIONES)
+        descartar_particiones_cargadas()
+        return False
+    if reservas_particionadas():
+        # 'reservas' son solo las de la estadía: se ponen al día las particiones en memoria
+        anotar_reserva_en_particiones(rid, reservas[rid], diario_previo)
     else:
-        if not (telefono_str.isdigit() and MIN_LENGTH_TELEFONO <= len(telefono_str) <= MAX_LENGTH_TELEFONO):
-            return False
-        if len(telefono_str) > 15:  # Máximo 15 dígitos
-            return False
+        actualizar_almacen(ARCHIVO_RESERVAS, reservas)
+    if habitaciones is not None and idhabitacion in habitaciones:
+        habitaciones[idhabitacion]["estado"] = estado
+        actualizar_almacen(ARCHIVO_HABITACIONES, habitaciones)
+    else:
+        descartar_del_almacen(ARCHIVO_HABITACIONES)
+    if ESTADO_DIARIO["registros"] >= MAX_REGISTROS_DIARIO:
+        compactar_diario()
     return True
 
-def validar_id_huesped(idh):
-    """Valida que el ID del huésped tenga entre 2 y 6 caracteres."""
-    if not (MIN_LENGTH_ID <= len(idh) <= MAX_LENGTH_ID):
-        return False
-    # Verificar que solo contenga letras y números
-    if not idh.isalnum():
+def compactar_diario():
+    """Vuelca el diario sobre reservas.json y habitaciones.json y luego lo elimina."""
+    if MOTOR_ALMACENAMIENTO != "json" or not os.path.exists(ARCHIVO_DIARIO_RESERVAS):
+        return True
+    datos_por_archivo = {}
+    try:
+        tomar_bloqueo("compactar diario")
+    except (OSError, TimeoutError) as e:
+        print(f"❌ Error al compactar el diario de reservas: {e}")
         return False
-    # Verificar que no sea solo números
-    if idh.isdigit():
+    try:
+        # Otra terminal pudo compactarlo mientras se esperaba el bloqueo
+        if not os.path.exists(ARCHIVO_DIARIO_RESERVAS):
+            return True
+        for archivo in [ARCHIVO_RESERVAS, ARCHIVO_HABITACIONES]:
+            try:
+                datos_por_archivo[archivo] = cargar_archivo(archivo)
+            except FileNotFoundError:
+                datos_por_archivo[archivo] = {}
+                aplicar_diario(archivo, datos_por_archivo[archivo])
+        # Los registros del diario son los que cambiaron desde el último guardado de cada archivo
+        registros = leer_diario()
+        cambiados = {ARCHIVO_RESERVAS: [registro["id"] for registro in registros if registro["tipo"] == "reserva"],
+                     ARCHIVO_HABITACIONES: [registro["id"] for registro in registros if registro["tipo"] == "estado_habitacion"
+                                            and registro["id"] in datos_por_archivo[ARCHIVO_HABITACIONES]]}
+        cantidad = len(registros)
+        # Primero se escriben los archivos completos y recién después se borra el diario:
+        # si hay un corte en el medio, volver a aplicar el diario no cambia el resultado.
+        for archivo, datos in datos_por_archivo.items():
+            escribir_datos(datos, archivo, cambiados[archivo])
+        firma_columnar_previa = firma_columnar()
+        os.remove(ARCHIVO_DIARIO_RESERVAS)
+        # Borrar el diario cambia la firma de las reservas, pero no sus datos
+        anotar_cambios_columnar(firma_columnar_previa, [])
+        for archivo, datos in datos_por_archivo.items():
+            actualizar_almacen(archivo, datos)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error al compactar el diario de reservas: {e}")
         return False
+    finally:
+        soltar_bloqueo()
+    ESTADO_DIARIO["registros"] = 0
+    print(f"✅ Diario compactado: {cantidad} registros volcados a {ARCHIVO_RESERVAS} y {ARCHIVO_HABITACIONES}")
     return True
 
-def validar_nombre_apellido(texto):
-    """Valida que el nombre o apellido tenga entre 2 y 20 caracteres y solo contenga letras y espacios."""
-    texto_limpio = texto.strip()
-    if not (MIN_LENGTH_NOMBRE <= len(texto_limpio) <= MAX_LENGTH_NOMBRE):
+#----------------------------------------------------------------------------------------------
+# GUARDADO SEGURO Y BACKUPS INCREMENTALES
+#----------------------------------------------------------------------------------------------
+# Los archivos se escriben en un temporal que se sincroniza a disco y recién entonces se renombra
+# sobre el original: un corte en medio del guardado nunca deja un archivo truncado.
+# Cada guardado deja un backup "archivo.AAAAMMDD_HHMMSS.bak" con solo los registros que cambiaron
+# (o se eliminaron) desde el backup anterior. Son las mismas claves que el guardado indica para el
+# control de versiones, así que no hace falta comparar el diccionario con el estado anterior.
+# El primer backup de un archivo es completo, igual que el de un guardado que reemplaza el archivo
+# entero y uno de cada MAX_BACKUPS_INCREMENTALES: una restauración parte del último completo.
+FORMATO_MARCA_BACKUP = "%Y%m%d_%H%M%S"
+ESTADO_BACKUPS = {}
+
+def sincronizar_directorio(archivo):
+    """Sincroniza el directorio de un archivo para que su renombrado quede persistido."""
+    if os.name != "posix":
+        return
+    descriptor = os.open(os.path.dirname(os.path.abspath(archivo)), os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+def escribir_json_atomico(datos, archivo):
+    """Escribe un JSON (o JSON Lines) en un temporal sincronizado a disco y lo renombra sobre el archivo destino."""
+    if es_manifiesto_particiones(archivo):
+        escribir_particiones_reservas(datos, archivo)
+        return
+    if es_archivo_jsonl(archivo):
+        texto = "".join(linea_jsonl(clave, registro) for clave, registro in datos.items())
+    elif lleva_indice_de_registros(archivo):
+        texto, registros = texto_json_indexado(datos)
+        escribir_texto_atomico(texto, archivo)
+        guardar_indice_registros(archivo, registros)
+        return
+    else:
+        texto = json.dumps(datos, ensure_ascii=False, indent=4)
+    escribir_texto_atomico(texto, archivo)
+
+def escribir_texto_atomico(texto, archivo):
+    """Escribe un texto en un temporal sincronizado a disco y lo renombra sobre el archivo destino."""
+    temporal = archivo + ".tmp"
+    with open(temporal, mode='w', encoding='utf-8') as f:
+        f.write(texto)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, archivo)
+    sincronizar_directorio(archivo)
+
+def listar_backups(archivo):
+    """Devuelve los backups de un archivo como lista de (marca, ruta), en orden cronológico."""
+    carpeta = os.path.dirname(archivo) or "."
+    prefijo = os.path.basename(archivo) + "."
+    try:
+        nombres = os.listdir(carpeta)
+    except OSError:
+        return []
+    backups = []
+    for nombre in nombres:
+        if nombre.startswith(prefijo) and nombre.endswith(".bak"):
+            marca = nombre[len(prefijo):-4]
+            if len(marca) >= 15 and marca[:8].isdigit() and marca[9:15].isdigit():
+                backups.append((marca, os.path.join(carpeta, nombre)))
+    backups.sort()
+    return backups
+
+def reconstruir_desde_backups(archivo, hasta=None):
+    """
+    Reconstruye el contenido de un archivo hasta una marca AAAAMMDD_HHMMSS (inclusive): busca hacia
+    atrás el último backup completo y le aplica los incrementales posteriores.
+    """
+    rutas = [ruta for marca, ruta in listar_backups(archivo) if hasta is None or marca[:15] <= hasta]
+    pendientes = []
+    for ruta in reversed(rutas):
+        with open(ruta, mode='r', encoding='utf-8') as f:
+            backup = json.load(f)
+        pendientes.append(backup)
+        if backup["tipo"] == "completo":
+            break
+    else:
+        return None, 0
+    datos = pendientes.pop()["cambios"]
+    aplicados = 1
+    while pendientes:
+        backup = pendientes.pop()
+        datos.update(backup["cambios"])
+        for clave in backup["eliminados"]:
+            datos.pop(clave, None)
+        aplicados += 1
+    return datos, aplicados
+
+def escribir_backup(archivo, tipo, cambios, eliminados, instante=None, incrementales=0):
+    """Escribe un archivo de backup con marca de tiempo y devuelve su ruta ('incrementales': cuántos van desde el último completo)."""
+    if instante is None:
+        instante = time.time()
+    marca = time.strftime(FORMATO_MARCA_BACKUP, time.localtime(instante))
+    ruta = f"{archivo}.{marca}.bak"
+    secuencia = 0
+    while os.path.exists(ruta):
+        secuencia += 1
+        ruta = f"{archivo}.{marca}_{str(secuencia).zfill(2)}.bak"
+    contenido = {
+        "archivo": os.path.basename(archivo),
+        "fecha": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(instante)),
+        "tipo": tipo,
+        "incrementales": incrementales,
+        "cambios": cambios,
+        "eliminados": eliminados
+    }
+    escribir_json_atomico(contenido, ruta)
+    return ruta
+
+def hacer_backup_incremental(archivo, datos, cambiados=None):
+    """
+    Guarda un backup con los registros 'cambiados' de 'datos' (los que ya no están quedan como
+    eliminados). Sin 'cambiados', o cuando ya hay MAX_BACKUPS_INCREMENTALES seguidos, el backup es completo.
+    """
+    backups = listar_backups(archivo)
+    ultimo = backups[-1][1] if backups else None
+    estado = ESTADO_BACKUPS.get(archivo)
+    incrementales = None
+    if ultimo is None:
+        if os.path.exists(archivo):
+            try:
+                anterior = leer_datos_archivo(archivo)
+                # El backup base conserva el archivo tal como estaba, con su fecha de modificación
+                ultimo = escribir_backup(archivo, "completo", anterior, [], os.path.getmtime(archivo))
+                incrementales = 0
+            except ValueError:
+                pass
+    elif estado is not None and estado["ultimo"] == ultimo:
+        incrementales = estado["incrementales"]
+    else:
+        # Primera vez en la sesión (u otra terminal agregó backups): la cuenta está en el último backup
+        try:
+            with open(ultimo, mode='r', encoding='utf-8') as f:
+                incrementales = json.load(f).get("incrementales")
+        except (OSError, ValueError):
+            pass
+    
+    if cambiados is None or incrementales is None or incrementales >= MAX_BACKUPS_INCREMENTALES:
+        ultimo = escribir_backup(archivo, "completo", datos, [])
+        incrementales = 0
+    elif cambiados:
+        cambios = {clave: datos[clave] for clave in cambiados if clave in datos}
+        eliminados = [clave for clave in cambiados if clave not in datos]
+        incrementales += 1
+        ultimo = escribir_backup(archivo, "incremental", cambios, eliminados, incrementales=incrementales)
+    ESTADO_BACKUPS[archivo] = {"ultimo": ultimo, "incrementales": incrementales}
+
+def restaurar_backup(archivo, hasta):
+    """Restaura un archivo al estado de su último backup anterior o igual a la marca indicada."""
+    try:
+        datos, aplicados = reconstruir_desde_backups(archivo, hasta)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ Error al leer los backups de {archivo}: {e}")
         return False
-    # Verificar que solo contenga letras y espacios
-    for caracter in texto_limpio:
-        if not (caracter.isalpha() or caracter.isspace()):
-            return False
-    # Verificar que no sea solo espacios
-    if texto_limpio.replace(" ", "") == "":
+    if datos is None:
+        print(f"❌ No hay backups de {archivo} anteriores a {hasta}.")
         return False
-    # Verificar que no tenga espacios múltiples consecutivos
-    if "  " in texto_limpio:
+    print(f"📦 Estado reconstruido con {aplicados} backups: {len(datos)} registros.")
+    confirm = input(f"⚠️  ¿Confirma sobrescribir {archivo} con ese estado? (s/n): ").strip().lower()
+    if confirm != "s":
+        print("❌ Operación cancelada.")
         return False
-    # Verificar que no empiece o termine con espacio
-    if texto_limpio.startswith(" ") or texto_limpio.endswith(" "):
+    if archivo_usa_diario(archivo):
+        # El diario tiene registros posteriores: se vuelca antes para que no se apliquen encima
+        if not compactar_diario():
+            return False
+    try:
+        escribir_datos(datos, archivo)
+    except (OSError, TimeoutError) as e:
+        print(f"❌ Error al restaurar {archivo}: {e}")
         return False
+    print(f"✅ {archivo} restaurado al estado del {hasta}.")
     return True
 
-def validar_unicidad_email_telefono(huespedes, email, telefono, id_excluir=None):
-    """Valida que el email y teléfono sean únicos entre huéspedes activos."""
-    for idh, datos in huespedes.items():
-        if idh != id_excluir and datos["activo"]:
-            if datos["email"] == email:
-                return False, f"Email '{email}' ya existe en huésped {idh}"
-            if str(datos["telefono"]) == str(telefono):
-                return False, f"Teléfono '{telefono}' ya existe en huésped {idh}"
-    return True, ""
+def menu_restaurar_backup():
+    """Solicita el archivo y el momento a restaurar, mostrando los backups disponibles."""
+    print("\n--- Restaurar archivo desde backups ---")
+    archivos = {"1": ARCHIVO_HUESPEDES, "2": ARCHIVO_HABITACIONES, "3": ARCHIVO_RESERVAS}
+    print(f"[1] {ARCHIVO_HUESPEDES}  [2] {ARCHIVO_HABITACIONES}  [3] {ARCHIVO_RESERVAS}")
+    op = input_opciones("Archivo: ", ["1", "2", "3"])
+    if op is None:
+        return
+    archivo = archivos[op]
+    backups = listar_backups(archivo)
+    if not backups:
+        print(f"❌ No hay backups de {archivo}.")
+        return
+    print(f"📋 {len(backups)} backups disponibles. Últimos:")
+    for marca, ruta in backups[-10:]:
+        print(f"   - {marca}")
+    hasta = input("Restaurar al estado del (AAAAMMDD_HHMMSS, o AAAAMMDD para el fin de ese día): ").strip()
+    if len(hasta) == 8 and hasta.isdigit():
+        hasta += "_235959"
+    if not (len(hasta) == 15 and hasta[:8].isdigit() and hasta[8] == "_" and hasta[9:].isdigit()):
+        print("❌ Formato inválido. Use AAAAMMDD_HHMMSS o AAAAMMDD.")
+        return
+    restaurar_backup(archivo, hasta)
 
-def es_medio_pago_valido(medio):
-    """Valida que el medio de pago sea válido."""
-    return medio in MEDIOS_DE_PAGO
+#----------------------------------------------------------------------------------------------
+# BLOQUEOS Y VERSIONES ENTRE TERMINALES
+#----------------------------------------------------------------------------------------------
+# Varias terminales pueden trabajar sobre la misma carpeta. Toda escritura se hace con el bloqueo
+# exclusivo de hotel.lock (fcntl) y cada archivo lleva un número de versión en "archivo.version"
+# que aumenta con cada escritura (también con cada línea del diario). Al leer un archivo se anota
+# su versión y cada guardado indica las claves de los registros que agregó, modificó o eliminó:
+# si al guardar la versión en disco es otra, los datos se vuelven a leer y se les aplican solo esos
+# registros. Así leer y guardar no recorren ni comparan todos los registros para detectar cambios.
+# Las reservas nuevas se vuelven a validar contra solapamientos antes de escribirlas.
+ESTADO_BLOQUEO = {"descriptor": None, "nivel": 0}
+ESTADISTICAS_BLOQUEO = {"bloqueos": 0, "espera_total": 0.0, "espera_maxima": 0.0, "reintentos_bloqueo": 0,
+                        "escrituras_rebasadas": 0, "reservas_rechazadas": 0}
+LECTURAS = {}
+MAX_LECTURAS_POR_ARCHIVO = 3
 
-def es_tipo_habitacion_valido(tipo):
-    """Valida que el tipo de habitación sea válido."""
-    return tipo in TIPOS_HABITACION
+def anotar_monitoreo_bloqueo(operacion, evento, espera, reintentos):
+    """Agrega una línea al archivo de monitoreo de bloqueos (esperas largas y conflictos)."""
+    registro = {"fecha": datetime.datetime.now().strftime("%Y.%m.%d - %H:%M:%S"), "pid": os.getpid(),
+                "operacion": operacion, "evento": evento, "espera": round(espera, 3), "reintentos": reintentos}
+    try:
+        with open(ARCHIVO_MONITOREO_BLOQUEOS, mode='a', encoding='utf-8') as f:
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+    except OSError:
+        pass
 
-def es_estado_habitacion_valido(estado):
-    """Valida que el estado de habitación sea válido."""
-    return estado in ESTADOS_HABITACION
+def tomar_bloqueo(operacion):
+    """
+    Toma el bloqueo exclusivo de escritura (es reentrante dentro de la misma terminal).
+    Reintenta sin bloquearse hasta ESPERA_MAXIMA_BLOQUEO segundos; si otra terminal no lo
+    libera, lanza TimeoutError.
+    """
+    if ESTADO_BLOQUEO["nivel"] > 0:
+        ESTADO_BLOQUEO["nivel"] += 1
+        return
+    descriptor = os.open(ARCHIVO_BLOQUEO, os.O_RDWR | os.O_CREAT, 0o644)
+    inicio = time.perf_counter()
+    reintentos = 0
+    if fcntl is not None:
+        while True:
+            try:
+                fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.perf_counter() - inicio >= ESPERA_MAXIMA_BLOQUEO:
+                    os.close(descriptor)
+                    ESTADISTICAS_BLOQUEO["reintentos_bloqueo"] += reintentos
+                    anotar_monitoreo_bloqueo(operacion, "sin bloqueo", time.perf_counter() - inicio, reintentos)
+                    raise TimeoutError(f"otra terminal mantiene bloqueado {ARCHIVO_BLOQUEO}")
+                reintentos += 1
+                time.sleep(INTERVALO_REINTENTO_BLOQUEO)
+    espera = time.perf_counter() - inicio
+    ESTADO_BLOQUEO["descriptor"] = descriptor
+    ESTADO_BLOQUEO["nivel"] = 1
+    ESTADISTICAS_BLOQUEO["bloqueos"] += 1
+    ESTADISTICAS_BLOQUEO["espera_total"] += espera
+    ESTADISTICAS_BLOQUEO["espera_maxima"] = max(ESTADISTICAS_BLOQUEO["espera_maxima"], espera)
+    ESTADISTICAS_BLOQUEO["reintentos_bloqueo"] += reintentos
+    if espera >= UMBRAL_MONITOREO_ESPERA:
+        anotar_monitoreo_bloqueo(operacion, "espera", espera, reintentos)
 
-def input_id_huesped(msg):
-    """Solicita un ID de huésped válido por consola, validando la entrada."""
-    while True:
-        idh = input(msg).strip()
-        if validar_id_huesped(idh):
-            return idh
-        print("❌ ID inválido. Debe tener entre 2 y 6 caracteres.")
+def soltar_bloqueo():
+    """Libera el bloqueo de escritura cuando se cierra la última operación que lo tomó."""
+    ESTADO_BLOQUEO["nivel"] -= 1
+    if ESTADO_BLOQUEO["nivel"] > 0:
+        return
+    descriptor = ESTADO_BLOQUEO["descriptor"]
+    ESTADO_BLOQUEO["descriptor"] = None
+    if fcntl is not None:
+        fcntl.flock(descriptor, fcntl.LOCK_UN)
+    os.close(descriptor)
 
-def input_nombre_apellido(msg):
-    """Solicita un nombre o apellido válido por consola, validando la entrada."""
-    while True:
-        texto = input(msg).strip()
-        if validar_nombre_apellido(texto):
-            return texto
-        print("❌ Nombre/Apellido inválido. Debe tener entre 2 y 20 caracteres y solo contener letras.")
+def leer_version(archivo):
+    """Devuelve el número de versión de un archivo de datos (0 si nunca se guardó con versión)."""
+    try:
+        with open(archivo + ".version", mode='r', encoding='utf-8') as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
 
-def input_dni(msg):
-    """Solicita un DNI por consola, validando la entrada."""
-    while True:
-        dni = input(msg).strip()
-        if not dni.isdigit():
-            print("❌ DNI inválido. Debe contener solo dígitos numéricos.")
-        else:
-            dni = int(dni)
-            if dni < 0:
-                print("❌ DNI inválido. No puede ser negativo.")
-            elif dni > 99999999:
-                print("❌ DNI inválido. No puede exceder 99999999 (8 dígitos).")
-            elif validar_dni(dni):
-                return dni
-            else:
-                print("❌ DNI inválido. Debe tener entre 6 y 8 dígitos numéricos.")
+def incrementar_version(archivo):
+    """Avanza la versión de un archivo de datos. Se llama con el bloqueo tomado."""
+    version = leer_version(archivo) + 1
+    temporal = archivo + ".version.tmp"
+    with open(temporal, mode='w', encoding='utf-8') as f:
+        f.write(str(version))
+    os.replace(temporal, archivo + ".version")
+    return version
 
-def input_telefono(msg):
-    """Solicita un teléfono válido por consola, validando la entrada."""
-    while True:
-        telefono = input(msg).strip()
-        if validar_telefono(telefono):
-            # Si tiene +, mantener como string, sino convertir a int
-            if telefono.startswith('+'):
-                return telefono
+def registrar_lectura(archivo, datos, version):
+    """Anota la versión del archivo con que se leyó (o guardó) un diccionario."""
+    lecturas = [lectura for lectura in LECTURAS.get(archivo, []) if lectura["datos"] is not datos]
+    lecturas.append({"datos": datos, "version": version})
+    LECTURAS[archivo] = lecturas[-MAX_LECTURAS_POR_ARCHIVO:]
+
+def buscar_lectura(archivo, datos):
+    """Devuelve la lectura anotada para un diccionario, o None si no proviene de cargar_archivo."""
+    for lectura in LECTURAS.get(archivo, []):
+        if lectura["datos"] is datos:
+            return lectura
+    return None
+
+def esta_desactualizado(archivo, datos):
+    """Indica si un diccionario se leyó en una versión del archivo anterior a la actual."""
+    lectura = buscar_lectura(archivo, datos)
+    return lectura is not None and not usa_sqlite(archivo) and lectura["version"] != leer_version(archivo)
+
+def reserva_se_solapa(reservas, datos):
+    """Indica si una reserva se solapa con alguna de las reservas de su habitación."""
+    entrada = fecha_a_ordinal(datos["fechaEntrada"])
+    salida = fecha_a_ordinal(datos["fechaSalida"])
+    if entrada is None or salida is None:
+        return False
+    return solapa_reserva(reservas, datos["idhabitacion"], entrada, salida)
+
+def rebasar_si_desactualizado(archivo, datos, cambiados):
+    """
+    Si 'datos' se leyó en una versión anterior a la de disco, vuelve a leer el archivo y le aplica
+    los registros 'cambiados' por esta terminal (los que ya no están en 'datos' se eliminan); 'datos'
+    queda actualizado en el lugar. Se llama con el bloqueo tomado. Devuelve los IDs de las reservas
+    nuevas descartadas porque ahora se solapan con una reserva guardada por otra terminal.
+    """
+    if not esta_desactualizado(archivo, datos):
+        return []
+    cambios = {clave: datos[clave] for clave in cambiados if clave in datos}
+    eliminados = [clave for clave in cambiados if clave not in datos]
+    descartar_del_almacen(archivo)
+    try:
+        actual = cargar_archivo(archivo)
+    except FileNotFoundError:
+        actual = {}
+    # La lectura recién hecha pasa a ser la base del diccionario de esta terminal
+    LECTURAS[archivo] = [lectura for lectura in LECTURAS.get(archivo, []) if lectura["datos"] is not datos]
+    lectura_actual = buscar_lectura(archivo, actual)
+    for clave in eliminados:
+        actual.pop(clave, None)
+    rechazadas = []
+    for clave, registro in cambios.items():
+        if archivo == ARCHIVO_RESERVAS and clave not in actual and reserva_se_solapa(actual, registro):
+            rechazadas.append(clave)
+        else:
+            actual[clave] = registro
+            if archivo == ARCHIVO_RESERVAS:
+                indexar_reserva(actual, clave)
+    # Otra terminal pudo cambiar emails, DNIs o números: los índices del diccionario se vuelven a armar
+    descartar_indices(datos)
+    datos.clear()
+    datos.update(actual)
+    trasladar_indice_intervalos(actual, datos)
+    if lectura_actual is not None:
+        lectura_actual["datos"] = datos
+    if archivo in ALMACEN:
+        ALMACEN[archivo]["datos"] = datos
+    ESTADISTICAS_BLOQUEO["escrituras_rebasadas"] += 1
+    ESTADISTICAS_BLOQUEO["reservas_rechazadas"] += len(rechazadas)
+    evento = "datos desactualizados" + (f", {len(rechazadas)} reservas rechazadas" if rechazadas else "")
+    anotar_monitoreo_bloqueo(archivo, evento, 0.0, 1)
+    return rechazadas
+
+#----------------------------------------------------------------------------------------------
+# RESERVAS EN FORMATO JSON LINES
+#----------------------------------------------------------------------------------------------
+# Con FORMATO_RESERVAS = "jsonl" cada reserva ocupa una línea {"id": ..., "datos": {...}}.
+# Los informes y el listado la recorren línea a línea sin cargar el diccionario completo, y
+# las conversiones entre ambos formatos también trabajan de a una reserva por vez.
+TAMANIO_BLOQUE_LECTURA = 65536
+
+def es_archivo_jsonl(archivo):
+    """Indica si un archivo de datos se guarda en formato JSON Lines."""
+    return archivo.endswith(".jsonl")
+
+def linea_jsonl(clave, registro):
+    """Devuelve la línea JSON Lines de un registro."""
+    return json.dumps({"id": clave, "datos": registro}, ensure_ascii=False) + "\n"
+
+def decodificar_linea_jsonl(linea):
+    """Devuelve el par (id, registro) de una línea JSON Lines."""
+    registro = json.loads(linea)
+    return registro["id"], registro["datos"]
+
+def leer_datos_archivo(archivo):
+    """Lee un archivo de datos completo como diccionario, sea JSON, JSON Lines o reservas particionadas."""
+    if es_manifiesto_particiones(archivo):
+        return leer_particiones_reservas(archivo)
+    with open(archivo, mode='r', encoding='utf-8') as f:
+        sumar_bytes_leidos(os.fstat(f.fileno()).st_size)
+        if es_archivo_jsonl(archivo):
+            return dict(decodificar_linea_jsonl(linea) for linea in f if linea.strip())
+        return json.load(f)
+
+def reservas_en_flujo():
+    """Indica si los informes deben leer las reservas en flujo desde el archivo JSON Lines."""
+    return es_archivo_jsonl(ARCHIVO_RESERVAS) and not usa_sqlite(ARCHIVO_RESERVAS)
+
+def iterar_reservas_jsonl(f):
+    """
+    Devuelve un generador de pares (id, reserva) que lee el archivo JSON Lines abierto línea a línea.
+    Las reservas aún en el diario se entregan al final y reemplazan a las del archivo con igual ID.
+    """
+    pendientes = {}
+    aplicar_diario(ARCHIVO_RESERVAS, pendientes)
+    del_archivo = (decodificar_linea_jsonl(linea) for linea in f if linea.strip())
+    return itertools.chain((par for par in del_archivo if par[0] not in pendientes), pendientes.items())
+
+def iterar_pares_reservas(reservas):
+    """Devuelve los pares (id, reserva) de un diccionario de reservas o de un flujo ya abierto."""
+    if isinstance(reservas, dict):
+        return reservas.items()
+    return reservas
+
+def ejecutar_informe(informe, reservas, *otros, por_anio=False):
+    """
+    Ejecuta un informe con el diccionario de reservas o, si es None, leyendo reservas.jsonl en flujo.
+    Con reservas particionadas, los informes 'por_anio' leen solo su partición; el resto, todas.
+    """
+    if reservas is not None:
+        informe(reservas, *otros)
+        return
+    try:
+        if reservas_particionadas():
+            informe(None if por_anio else cargar_archivo(ARCHIVO_RESERVAS), *otros)
+            return
+        with open(ARCHIVO_RESERVAS, mode='r', encoding='utf-8') as f:
+            informe(iterar_reservas_jsonl(f), *otros)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ Error al leer {ARCHIVO_RESERVAS}: {e}")
+
+def convertir_reservas_json_a_jsonl(origen=ARCHIVO_RESERVAS_JSON, destino=ARCHIVO_RESERVAS_JSONL):
+    """
+    Convierte reservas.json en reservas.jsonl leyendo el JSON por bloques: cada reserva se
+    decodifica y escribe apenas se completa, sin cargar el diccionario entero.
+    Devuelve la cantidad de reservas convertidas.
+    """
+    temporal = destino + ".tmp"
+    with open(origen, mode='rb') as entrada, open(temporal, mode='w', encoding='utf-8') as salida:
+        cantidad = recorrer_diccionario_json(entrada, escribir_linea_convertida, salida)
+        salida.flush()
+        os.fsync(salida.fileno())
+    os.replace(temporal, destino)
+    sincronizar_directorio(destino)
+    return cantidad
+
+def escribir_linea_convertida(clave, contenido, desplazamiento, salida):
+    """Escribe como línea JSON Lines una reserva leída del archivo JSON."""
+    salida.write(linea_jsonl(clave, json.loads(contenido)))
+    return False
+
+def convertir_reservas_jsonl_a_json(origen=ARCHIVO_RESERVAS_JSONL, destino=ARCHIVO_RESERVAS_JSON):
+    """
+    Convierte reservas.jsonl en reservas.json línea a línea, con el mismo formato (indentado)
+    que el resto de los archivos JSON. Devuelve la cantidad de reservas convertidas.
+    """
+    temporal = destino + ".tmp"
+    cantidad = 0
+    with open(origen, mode='r', encoding='utf-8') as entrada, open(temporal, mode='w', encoding='utf-8') as salida:
+        salida.write("{")
+        for linea in entrada:
+            if not linea.strip():
+                continue
+            clave, registro = decodificar_linea_jsonl(linea)
+            texto = json.dumps(registro, ensure_ascii=False, indent=4).replace("\n", "\n    ")
+            salida.write(("," if cantidad else "") + "\n    " + json.dumps(clave, ensure_ascii=False) + ": " + texto)
+            cantidad += 1
+        salida.write("\n}" if cantidad else "}")
+        salida.flush()
+        os.fsync(salida.fileno())
+    os.replace(temporal, destino)
+    sincronizar_directorio(destino)
+    return cantidad
+
+def menu_convertir_formato_reservas():
+    """Convierte las reservas entre reservas.json, reservas.jsonl y las particiones por año."""
+    print("\n--- Convertir formato de reservas ---")
+    print(f"Archivo de reservas configurado: {ARCHIVO_RESERVAS}")
+    print(f"[1] {ARCHIVO_RESERVAS_JSON} → {ARCHIVO_RESERVAS_JSONL}")
+    print(f"[2] {ARCHIVO_RESERVAS_JSONL} → {ARCHIVO_RESERVAS_JSON}")
+    print(f"[3] {ARCHIVO_RESERVAS_JSON} → particiones por año ({ARCHIVO_MANIFIESTO_RESERVAS})")
+    print(f"[4] Particiones por año → {ARCHIVO_RESERVAS_JSON}")
+    print("[0] Cancelar")
+    op = input_opciones("Opción: ", ["1", "2", "3", "4", "0"])
+    if op == "0":
+        return
+    # Las reservas pendientes del diario se vuelcan antes, para que la copia quede completa
+    if not compactar_diario():
+        return
+    conversiones = {
+        "1": (convertir_reservas_json_a_jsonl, ARCHIVO_RESERVAS_JSONL, 'FORMATO_RESERVAS = "jsonl"'),
+        "2": (convertir_reservas_jsonl_a_json, ARCHIVO_RESERVAS_JSON, 'FORMATO_RESERVAS = "json"'),
+        "3": (convertir_reservas_a_particiones, ARCHIVO_MANIFIESTO_RESERVAS, "PARTICIONAR_RESERVAS_POR_ANIO = True"),
+        "4": (convertir_particiones_a_reservas, ARCHIVO_RESERVAS_JSON, "PARTICIONAR_RESERVAS_POR_ANIO = False")
+    }
+    convertir, destino, configuracion = conversiones[op]
+    try:
+        tomar_bloqueo("convertir reservas")
+        try:
+            cantidad = convertir()
+            incrementar_version(destino)
+        finally:
+            soltar_bloqueo()
+    except (OSError, ValueError, KeyError, TimeoutError) as e:
+        print(f"❌ Error al convertir: {e}")
+        return
+    descartar_del_almacen(destino)
+    print(f"✅ {cantidad} reservas convertidas a {destino}")
+    if destino != ARCHIVO_RESERVAS:
+        print(f"💡 Para usar {destino}, configure {configuracion}.")
+
+#----------------------------------------------------------------------------------------------
+# RESERVAS PARTICIONADAS POR AÑO
+#----------------------------------------------------------------------------------------------
+# Con PARTICIONAR_RESERVAS_POR_ANIO las reservas se guardan en un archivo por año
+# (reservas.2025.json, ...) y reservas.particiones.json lista las particiones con su cantidad de
+# registros y una huella de su contenido: al guardar solo se reescriben las que cambiaron. Una
+# estadía que cruza de año (30/12/25 a 03/01/26) se guarda en las particiones de ambos años, así
+# los informes anuales y la verificación de solapamientos leen solo los años que les tocan.
+# Cada partición, con las reservas del diario que caen en ella, queda en memoria y se devuelve
+# siempre el mismo diccionario mientras ni su archivo ni el diario cambien: el índice de intervalos
+# armado sobre ella sigue valiendo de una consulta a la siguiente. Las reservas que esta terminal
+# anota en el diario se agregan en el lugar a las particiones en memoria que estaban al día.
+PARTICION_SIN_FECHA = "sin_fecha"
+PARTICIONES_CARGADAS = {}  # año → {"base": datos del archivo, "diario": firma del diario, "datos": partición}
+
+def es_manifiesto_particiones(archivo):
+    """Indica si un archivo es el manifiesto de las reservas particionadas."""
+    return archivo == ARCHIVO_MANIFIESTO_RESERVAS
+
+def reservas_particionadas():
+    """Indica si las reservas se guardan particionadas por año."""
+    return es_manifiesto_particiones(ARCHIVO_RESERVAS) and not usa_sqlite(ARCHIVO_RESERVAS)
+
+def ruta_particion(clave):
+    """Devuelve el archivo de la partición de un año (AAAA)."""
+    return f"reservas.{clave}.json"
+
+def particiones_de_reserva(datos):
+    """Devuelve las particiones (años AAAA) de todas las noches de una reserva."""
+    entrada = fecha_a_ordinal(datos.get("fechaEntrada", ""))
+    salida = fecha_a_ordinal(datos.get("fechaSalida", ""))
+    if entrada is None:
+        return [PARTICION_SIN_FECHA]
+    anio_inicio = datetime.date.fromordinal(entrada).year
+    anio_fin = anio_inicio
+    if salida is not None and salida > entrada:
+        anio_fin = datetime.date.fromordinal(salida - 1).year
+    return [str(anio) for anio in range(anio_inicio, anio_fin + 1)]
+
+def leer_manifiesto_particiones(manifiesto=ARCHIVO_MANIFIESTO_RESERVAS):
+    """Lee el manifiesto de particiones; lanza FileNotFoundError si las reservas no están particionadas."""
+    with open(manifiesto, mode='r', encoding='utf-8') as f:
+        return json.load(f)
+
+def leer_particiones_reservas(manifiesto):
+    """Lee todas las particiones del manifiesto como un único diccionario de reservas."""
+    datos = {}
+    for entrada in leer_manifiesto_particiones(manifiesto)["particiones"].values():
+        with open(entrada["archivo"], mode='r', encoding='utf-8') as f:
+            sumar_bytes_leidos(os.fstat(f.fileno()).st_size)
+            datos.update(json.load(f))
+    return datos
+
+def escribir_particiones_reservas(datos, manifiesto):
+    """
+    Reparte las reservas por año y reescribe solo las particiones cuyo contenido cambió.
+    El manifiesto se escribe al final y las particiones que quedaron vacías se eliminan.
+    """
+    particiones = {}
+    for rid, registro in datos.items():
+        for clave in particiones_de_reserva(registro):
+            particiones.setdefault(clave, {})[rid] = registro
+    try:
+        anteriores = leer_manifiesto_particiones(manifiesto)["particiones"]
+    except (OSError, ValueError, KeyError):
+        anteriores = {}
+    nuevo = {"particiones": {}}
+    for clave in sorted(particiones):
+        ruta = ruta_particion(clave)
+        texto = json.dumps(particiones[clave], ensure_ascii=False, indent=4)
+        huella = hashlib.sha1(texto.encode('utf-8')).hexdigest()
+        anterior = anteriores.get(clave)
+        if anterior is None or anterior["huella"] != huella or not os.path.exists(ruta):
+            escribir_texto_atomico(texto, ruta)
+        nuevo["particiones"][clave] = {"archivo": ruta, "registros": len(particiones[clave]), "huella": huella}
+    escribir_texto_atomico(json.dumps(nuevo, ensure_ascii=False, indent=4), manifiesto)
+    for clave, anterior in anteriores.items():
+        if clave not in nuevo["particiones"] and os.path.exists(anterior["archivo"]):
+            os.remove(anterior["archivo"])
+
+def cargar_particion_reservas(clave):
+    """
+    Devuelve {id: reserva} con las reservas de un año (AAAA) más las del diario que caen en él.
+    El archivo de cada partición se guarda en el almacén en memoria como un archivo más, y el
+    diccionario devuelto se conserva sin copiar mientras ni la partición ni el diario cambien.
+    """
+    try:
+        ruta = leer_manifiesto_particiones()["particiones"][clave]["archivo"]
+        base = cargar_archivo(ruta)
+    except (FileNotFoundError, KeyError):
+        base = None
+    diario = firma_diario()
+    entrada = PARTICIONES_CARGADAS.get(clave)
+    if entrada is not None and entrada["base"] is base and entrada["diario"] == diario:
+        return entrada["datos"]
+    # Se copia una sola vez por cambio en disco: las reservas del diario no van al archivo de la partición
+    datos = {} if base is None else dict(base)
+    pendientes = {}
+    aplicar_diario(ARCHIVO_RESERVAS, pendientes)
+    for rid, registro in pendientes.items():
+        if clave in particiones_de_reserva(registro):
+            datos[rid] = registro
+    PARTICIONES_CARGADAS[clave] = {"base": base, "diario": diario, "datos": datos}
+    return datos
+
+def anotar_reserva_en_particiones(rid, datos, diario_previo):
+    """
+    Después de anotar en el diario una reserva nueva, la agrega (junto con sus índices) a las
+    particiones en memoria que estaban al día con el diario anterior ('diario_previo'); las que
+    no lo estaban se vuelven a armar en la próxima consulta.
+    """
+    diario = firma_diario()
+    anios = particiones_de_reserva(datos)
+    for clave, entrada in list(PARTICIONES_CARGADAS.items()):
+        if entrada["diario"] != diario_previo:
+            del PARTICIONES_CARGADAS[clave]
+            continue
+        if clave in anios and entrada["datos"].get(rid) is not datos:
+            entrada["datos"][rid] = datos
+            indexar_reserva(entrada["datos"], rid)
+        entrada["diario"] = diario
+
+def descartar_particiones_cargadas():
+    """Descarta las particiones en memoria para que la próxima consulta las vuelva a armar."""
+    PARTICIONES_CARGADAS.clear()
+
+def reserva_en_particiones(rid):
+    """Indica si un ID de reserva ya existe en alguna partición o en el diario."""
+    pendientes = {}
+    aplicar_diario(ARCHIVO_RESERVAS, pendientes)
+    if rid in pendientes:
+        return True
+    try:
+        particiones = leer_manifiesto_particiones()["particiones"]
+    except FileNotFoundError:
+        return False
+    # Cada archivo de partición queda en el almacén: solo se vuelve a leer si cambió en disco
+    for entrada in particiones.values():
+        if rid in cargar_archivo(entrada["archivo"]):
+            return True
+    return False
+
+def reservas_de_los_anios(anio_desde, anio_hasta):
+    """
+    Devuelve {id: reserva} con las reservas de las particiones de un rango de años (AAAA). Con un
+    solo año es la partición en memoria misma; con varios, un diccionario nuevo con su unión.
+    """
+    if anio_desde == anio_hasta:
+        return cargar_particion_reservas(str(anio_desde))
+    datos = {}
+    for anio in range(anio_desde, anio_hasta + 1):
+        datos.update(cargar_particion_reservas(str(anio)))
+    return datos
+
+def convertir_reservas_a_particiones():
+    """Reparte reservas.json en particiones por año. Devuelve la cantidad de reservas."""
+    datos = leer_datos_archivo(ARCHIVO_RESERVAS_JSON)
+    escribir_particiones_reservas(datos, ARCHIVO_MANIFIESTO_RESERVAS)
+    return len(datos)
+
+def convertir_particiones_a_reservas():
+    """Une las particiones por año en reservas.json. Devuelve la cantidad de reservas."""
+    datos = leer_particiones_reservas(ARCHIVO_MANIFIESTO_RESERVAS)
+    escribir_texto_atomico(json.dumps(datos, ensure_ascii=False, indent=4), ARCHIVO_RESERVAS_JSON)
+    return len(datos)
+
+#----------------------------------------------------------------------------------------------
+# ALMACÉN COLUMNAR DE RESERVAS
+#----------------------------------------------------------------------------------------------
+# Los datos de cada reserva que usan los informes anuales se guardan en un archivo binario por
+# columna, con ancho fijo por fila. Los informes los abren con mmap y los recorren sin copiarlos
+# ni decodificar fechas. Habitaciones y huéspedes se guardan como índice dentro de las listas de
+# reservas.columnas.json, que también lleva las columnas, la cantidad de filas y la firma del
+# archivo de reservas con la que se sincronizó. Cada guardado de reservas anota en
+# reservas.columnas.cambios.jsonl los IDs que cambió junto con la firma de antes y la de después:
+# para ponerse al día, el almacén sigue esa cadena desde su firma, agrega al final las reservas
+# nuevas y reescribe en su lugar las filas de las modificadas (las eliminadas quedan como filas
+# vacías). Solo se leen esas reservas, no todo el historial. Si la cadena se corta (un guardado
+# completo como una restauración, o un archivo cambiado por otro medio) o la mitad de las filas
+# quedó vacía, el almacén se reconstruye completo. Con SQLite los informes usan su consulta indexada.
+# Con reservas particionadas cada año tiene su propio almacén (reservas.columnas.AAAA.*), que
+# sigue la misma cadena de cambios pero se arma y se pone al día leyendo solo la partición del año.
+COLUMNAS_RESERVAS = {
+    "clave": "Q",        # huella de 64 bits del ID de la reserva
+    "habitacion": "i",   # índice en la lista "habitaciones"; -1 en las filas vacías
+    "huesped": "i",      # índice en la lista "huespedes"; -1 en las filas vacías
+    "entrada": "i",      # número de día (ordinal) de entrada; 0 si la fecha no es válida o la fila está vacía
+    "salida": "i",       # número de día (ordinal) de salida; 0 si la fecha no es válida o la fila está vacía
+    "descuento": "h",
+    "precio": "d"        # precio por noche de la reserva (los informes facturan con el de la habitación)
+}
+ARCHIVO_CAMBIOS_COLUMNAR = PREFIJO_ALMACEN_COLUMNAR + ".cambios.jsonl"
+
+def prefijo_columnar(anio):
+    """Devuelve el prefijo de los archivos del almacén; con reservas particionadas, el del año (AAAA)."""
+    if reservas_particionadas():
+        return f"{PREFIJO_ALMACEN_COLUMNAR}.{anio}"
+    return PREFIJO_ALMACEN_COLUMNAR
+
+def archivo_columna(metadatos, nombre):
+    """Devuelve la ruta del archivo binario de una columna del almacén."""
+    return f"{metadatos['prefijo']}.{nombre}.bin"
+
+def clave_columnar(rid):
+    """Devuelve la huella de 64 bits con la que se identifica una reserva en el almacén columnar."""
+    return int.from_bytes(hashlib.sha1(rid.encode('utf-8')).digest()[:8], "little")
+
+def firma_columnar():
+    """Devuelve la firma actual de las reservas en disco (None con SQLite o si no hay archivo)."""
+    if usa_sqlite(ARCHIVO_RESERVAS):
+        return None
+    try:
+        return json.loads(json.dumps(firma_almacen(ARCHIVO_RESERVAS)))
+    except OSError:
+        return None
+
+def anotar_cambios_columnar(firma_previa, ids):
+    """
+    Anota en el registro de cambios del almacén los IDs de reserva que cambió un guardado (None si
+    reemplazó el archivo completo). Se llama con el bloqueo tomado, después de guardar.
+    """
+    if not USAR_ALMACEN_COLUMNAR or firma_previa is None:
+        return
+    cambio = {"antes": firma_previa, "despues": firma_columnar(), "ids": None if ids is None else list(ids)}
+    try:
+        # Un registro muy largo se descarta: la cadena se corta y el almacén se reconstruye una vez
+        if os.path.exists(ARCHIVO_CAMBIOS_COLUMNAR) and os.path.getsize(ARCHIVO_CAMBIOS_COLUMNAR) > MAX_BYTES_CAMBIOS_COLUMNAR:
+            os.remove(ARCHIVO_CAMBIOS_COLUMNAR)
+        with open(ARCHIVO_CAMBIOS_COLUMNAR, mode='a', encoding='utf-8') as f:
+            f.write(json.dumps(cambio, ensure_ascii=False) + "\n")
+    except OSError as e:
+        # Sin el cambio anotado la cadena se corta y el próximo informe reconstruye el almacén
+        print(f"⚠️ No se pudo anotar el cambio en el almacén columnar: {e}")
+
+def cambios_columnar_desde(firma_desde, firma_hasta):
+    """
+    Sigue en el registro de cambios la cadena de guardados que lleva de una firma a la otra y devuelve
+    el conjunto de IDs cambiados, o None si la cadena está cortada o pasa por un guardado completo.
+    """
+    if firma_desde is None:
+        return None
+    ids = set()
+    firma = firma_desde
+    try:
+        with open(ARCHIVO_CAMBIOS_COLUMNAR, mode='r', encoding='utf-8') as f:
+            for linea in f:
+                try:
+                    cambio = json.loads(linea)
+                except json.JSONDecodeError:
+                    continue
+                if cambio["antes"] == firma:
+                    if cambio["ids"] is None:
+                        return None
+                    ids.update(cambio["ids"])
+                    firma = cambio["despues"]
+    except FileNotFoundError:
+        pass
+    return ids if firma == firma_hasta else None
+
+def leer_metadatos_columnar(prefijo=PREFIJO_ALMACEN_COLUMNAR):
+    """Lee los metadatos del almacén columnar; devuelve None si no existen, están dañados o son de otras columnas."""
+    try:
+        with open(prefijo + ".json", mode='r', encoding='utf-8') as f:
+            metadatos = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(metadatos, dict) or metadatos.get("columnas") != list(COLUMNAS_RESERVAS) or metadatos.get("prefijo") != prefijo:
+        return None
+    return metadatos
+
+def metadatos_columnar_vacios(prefijo=PREFIJO_ALMACEN_COLUMNAR):
+    """Devuelve los metadatos de un almacén columnar sin filas."""
+    return {"columnas": list(COLUMNAS_RESERVAS), "prefijo": prefijo, "filas": 0, "vacias": 0,
+            "habitaciones": [], "huespedes": [], "firma": None}
+
+def indices_columnares(metadatos):
+    """Devuelve {"habitaciones": {id: índice}, "huespedes": {id: índice}} de las listas de los metadatos."""
+    return {lista: {clave: i for i, clave in enumerate(metadatos[lista])} for lista in ("habitaciones", "huespedes")}
+
+def indice_columnar(metadatos, indices, lista, clave):
+    """Devuelve el índice de una habitación o un huésped, agregándolo a su lista si es nuevo."""
+    if clave not in indices[lista]:
+        indices[lista][clave] = len(metadatos[lista])
+        metadatos[lista].append(clave)
+    return indices[lista][clave]
+
+def valores_columnares(datos):
+    """Devuelve (habitación, huésped, entrada, salida, descuento, precio) de una reserva tal como los guarda el almacén."""
+    return (datos["idhabitacion"], datos["idhuesped"], fecha_a_ordinal(datos["fechaEntrada"]) or 0,
+            fecha_a_ordinal(datos["fechaSalida"]) or 0, int(datos.get("descuento", 0)), float(datos.get("precioNoche", 0)))
+
+def fila_columnar(metadatos, indices, rid, datos):
+    """Devuelve los valores de cada columna para una reserva (si 'datos' es None, los de una fila vacía)."""
+    if datos is None:
+        return (clave_columnar(rid), -1, -1, 0, 0, 0, 0.0)
+    id_hab, idh, entrada, salida, descuento, precio = valores_columnares(datos)
+    return (clave_columnar(rid), indice_columnar(metadatos, indices, "habitaciones", id_hab),
+            indice_columnar(metadatos, indices, "huespedes", idh), entrada, salida, descuento, precio)
+
+def anexar_al_almacen_columnar(pares, metadatos):
+    """
+    Agrega al final de cada columna las reservas recibidas como pares (id, reserva).
+    Cada archivo se recorta antes a las filas válidas, por si una escritura anterior quedó a medias.
+    """
+    indices = indices_columnares(metadatos)
+    valores = {nombre: array.array(formato) for nombre, formato in COLUMNAS_RESERVAS.items()}
+    for rid, datos in pares:
+        for nombre, valor in zip(COLUMNAS_RESERVAS, fila_columnar(metadatos, indices, rid, datos)):
+            valores[nombre].append(valor)
+    cantidad = len(valores["clave"])
+    if cantidad == 0:
+        return 0
+    for nombre, columna in valores.items():
+        with open(archivo_columna(metadatos, nombre), mode='ab') as f:
+            f.truncate(metadatos["filas"] * columna.itemsize)
+            f.write(columna.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+    metadatos["filas"] += cantidad
+    return cantidad
+
+def reescribir_filas_columnares(cambios, metadatos):
+    """Reescribe en su lugar las filas {número de fila: (id, reserva o None si se eliminó)}."""
+    if not cambios:
+        return
+    indices = indices_columnares(metadatos)
+    filas = {fila: fila_columnar(metadatos, indices, rid, datos) for fila, (rid, datos) in sorted(cambios.items())}
+    for posicion, (nombre, formato) in enumerate(COLUMNAS_RESERVAS.items()):
+        ancho = array.array(formato).itemsize
+        with open(archivo_columna(metadatos, nombre), mode='r+b') as f:
+            for fila, valores in filas.items():
+                f.seek(fila * ancho)
+                f.write(array.array(formato, [valores[posicion]]).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+def abrir_columnas_reservas(metadatos):
+    """Abre con mmap las columnas del almacén y devuelve {nombre: (mapa, vista tipada de sus filas)}."""
+    filas = metadatos["filas"]
+    columnas = {}
+    try:
+        for nombre, formato in COLUMNAS_RESERVAS.items():
+            with open(archivo_columna(metadatos, nombre), mode='rb') as f:
+                mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            ancho = array.array(formato).itemsize
+            columnas[nombre] = (mapa, memoryview(mapa)[:filas * ancho].cast(formato))
+            if len(columnas[nombre][1]) < filas:
+                raise ValueError(f"la columna {nombre} tiene menos filas que las registradas")
+    except (OSError, ValueError, TypeError):
+        cerrar_columnas_reservas(columnas)
+        raise
+    return columnas
+
+def cerrar_columnas_reservas(columnas):
+    """Libera las vistas y cierra los mapas de memoria de las columnas."""
+    for mapa, vista in columnas.values():
+        vista.release()
+        mapa.close()
+
+def ubicar_filas_columnares(metadatos, ids):
+    """Devuelve {id: (número de fila, si estaba vacía)} de las reservas indicadas que ya tienen fila en el almacén."""
+    if not metadatos["filas"] or not ids:
+        return {}
+    buscadas = {clave_columnar(rid): rid for rid in ids}
+    columnas = abrir_columnas_reservas(metadatos)
+    try:
+        mapa, claves = columnas["clave"]
+        encontradas = {}
+        if len(buscadas) <= MAX_BUSQUEDAS_COLUMNAR:
+            # Pocas reservas: cada huella se busca en los bytes de la columna, sin recorrerla fila por fila
+            ancho = claves.itemsize
+            limite = metadatos["filas"] * ancho
+            for clave, rid in buscadas.items():
+                patron = array.array(COLUMNAS_RESERVAS["clave"], [clave]).tobytes()
+                posicion = mapa.find(patron, 0, limite)
+                while posicion != -1 and posicion % ancho:
+                    posicion = mapa.find(patron, posicion + 1, limite)
+                if posicion != -1:
+                    encontradas[rid] = posicion // ancho
+        else:
+            for fila, clave in enumerate(claves):
+                rid = buscadas.get(clave)
+                if rid is not None:
+                    encontradas[rid] = fila
+        habitacion = columnas["habitacion"][1]
+        return {rid: (fila, habitacion[fila] == -1) for rid, fila in encontradas.items()}
+    finally:
+        cerrar_columnas_reservas(columnas)
+
+def reservas_por_id(reservas, ids):
+    """
+    Devuelve {id: reserva} de las reservas indicadas que existen: del diccionario recibido o, si es un
+    flujo o None, de reservas.jsonl decodificando solo sus líneas.
+    """
+    if isinstance(reservas, dict):
+        return {rid: reservas[rid] for rid in ids if rid in reservas}
+    pendientes = {}
+    aplicar_diario(ARCHIVO_RESERVAS, pendientes)
+    buscadas = {json.dumps(rid, ensure_ascii=False).encode('utf-8') for rid in ids if rid not in pendientes}
+    encontradas = {rid: datos for rid, datos in pendientes.items() if rid in ids}
+    with open(ARCHIVO_RESERVAS, mode='rb') as f:
+        for linea in f:
+            sumar_bytes_leidos(len(linea))
+            # Cada línea empieza con {"id": "...", así que el ID se compara sin decodificar la línea
+            if linea.startswith(b'{"id": ') and linea[7:linea.find(b",", 7)] in buscadas:
+                rid, datos = decodificar_linea_jsonl(linea)
+                encontradas[rid] = datos
+    return encontradas
+
+def aplicar_cambios_columnar(reservas, metadatos, ids):
+    """Agrega al final las reservas nuevas de 'ids' y reescribe en su lugar las filas de las modificadas o eliminadas."""
+    actuales = reservas_por_id(reservas, ids)
+    ubicadas = ubicar_filas_columnares(metadatos, ids)
+    cambios = {}
+    nuevas = []
+    for rid in sorted(ids):
+        datos = actuales.get(rid)
+        if rid in ubicadas:
+            fila, vacia = ubicadas[rid]
+            cambios[fila] = (rid, datos)
+            metadatos["vacias"] += int(datos is None) - int(vacia)
+        elif datos is not None:
+            nuevas.append((rid, datos))
+    reescribir_filas_columnares(cambios, metadatos)
+    anexar_al_almacen_columnar(nuevas, metadatos)
+
+def recorrer_reservas(reservas, funcion, *otros):
+    """
+    Llama a funcion(pares, *otros) con los pares (id, reserva) del diccionario recibido o, si no es
+    un diccionario (flujo o None), con un flujo nuevo sobre reservas.jsonl.
+    """
+    if isinstance(reservas, dict):
+        return funcion(reservas.items(), *otros)
+    with open(ARCHIVO_RESERVAS, mode='r', encoding='utf-8') as f:
+        return funcion(iterar_reservas_jsonl(f), *otros)
+
+def sincronizar_almacen_columnar(reservas, anio):
+    """
+    Deja al día el almacén columnar que usa el informe de un año (AAAA) y devuelve sus metadatos
+    (None si falla). Si la firma del archivo de reservas no cambió no se lee nada; si cambió, se
+    aplican solo las reservas anotadas en el registro de cambios, o se reconstruye completo si la
+    cadena se cortó. Con reservas particionadas se lee solo la partición del año.
+    """
+    prefijo = prefijo_columnar(anio)
+    firma = firma_columnar()
+    if firma is None:
+        return None
+    metadatos = leer_metadatos_columnar(prefijo)
+    if metadatos is not None and metadatos["firma"] == firma:
+        return metadatos
+    try:
+        tomar_bloqueo("sincronizar almacén columnar")
+    except (OSError, TimeoutError) as e:
+        print(f"⚠️ Almacén columnar no disponible ({e}); se recorren las reservas.")
+        return None
+    try:
+        # Con el bloqueo tomado nadie guarda reservas: la firma y el registro de cambios quedan fijos
+        firma = firma_columnar()
+        metadatos = leer_metadatos_columnar(prefijo) or metadatos_columnar_vacios(prefijo)
+        if metadatos["firma"] != firma:
+            if reservas_particionadas():
+                reservas = cargar_particion_reservas(str(anio))
+            cambiados = cambios_columnar_desde(metadatos["firma"], firma)
+            if cambiados is not None:
+                aplicar_cambios_columnar(reservas, metadatos, cambiados)
+            if cambiados is None or metadatos["vacias"] * 2 > metadatos["filas"]:
+                metadatos = metadatos_columnar_vacios(prefijo)
+                recorrer_reservas(reservas, anexar_al_almacen_columnar, metadatos)
+            metadatos["firma"] = firma
+            escribir_json_atomico(metadatos, prefijo + ".json")
+    except (OSError, ValueError, KeyError, TypeError, OverflowError) as e:
+        print(f"⚠️ Almacén columnar no disponible ({e}); se recorren las reservas.")
+        return None
+    finally:
+        soltar_bloqueo()
+    return metadatos
+
+def acumular_matriz_columnar(reservas, habitaciones, anio, matriz, montos):
+    """
+    Suma a la matriz {habitación: {mes: valor}} las noches del año (o, si 'montos', lo facturado en
+    diezmilésimos de peso con el precio actual de la habitación y el descuento de la reserva) leyendo
+    el almacén columnar.
+    Devuelve False si el almacén no está disponible (o con SQLite) y hay que recorrer las reservas.
+    """
+    if not USAR_ALMACEN_COLUMNAR or usa_sqlite(ARCHIVO_RESERVAS):
+        return False
+    metadatos = sincronizar_almacen_columnar(reservas, anio)
+    if metadatos is None:
+        return False
+    if metadatos["filas"] == 0:
+        return True
+    limites = [datetime.date(anio, mes, 1).toordinal() for mes in range(1, 13)] + [datetime.date(anio + 1, 1, 1).toordinal()]
+    inicio, fin = limites[0], limites[12]
+    ids_habitaciones = metadatos["habitaciones"]
+    try:
+        columnas = abrir_columnas_reservas(metadatos)
+    except (OSError, ValueError, TypeError) as e:
+        print(f"⚠️ Almacén columnar no disponible ({e}); se recorren las reservas.")
+        return False
+    try:
+        habitacion = columnas["habitacion"][1]
+        entrada = columnas["entrada"][1]
+        salida = columnas["salida"][1]
+        descuento = columnas["descuento"][1]
+        for i in range(metadatos["filas"]):
+            e, s = entrada[i], salida[i]
+            if e == 0 or s <= inicio or e >= fin:
+                continue
+            hab_id = ids_habitaciones[habitacion[i]]
+            if hab_id not in matriz:
+                continue
+            if montos:
+                if "precioNoche" not in habitaciones[hab_id]:
+                    continue
+                valor = monto_noche_en_unidades(habitaciones[hab_id]["precioNoche"], descuento[i])
+            for mes in range(1, 13):
+                noches = min(s, limites[mes]) - max(e, limites[mes - 1])
+                if noches <= 0:
+                    continue
+                matriz[hab_id][mes] += noches * valor if montos else noches
+    finally:
+        cerrar_columnas_reservas(columnas)
+    return True
+
+#----------------------------------------------------------------------------------------------
+# CARGA PEREZOSA DE REGISTROS
+#----------------------------------------------------------------------------------------------
+# Registrar una reserva solo necesita un huésped y una habitación, y dar de baja una habitación
+# solo necesita saber si existe alguna reserva activa suya. En lugar de cargar los archivos
+# completos, cada registro se lee por su ID desde su posición en el archivo, anotada en un índice
+# "archivo.indice" (desplazamiento y largo en bytes, junto con la firma del archivo indexado).
+# El índice se escribe con cada guardado y se reconstruye si el archivo cambió por otro medio.
+# Los últimos registros leídos se conservan en memoria (los menos usados se descartan primero)
+# y se cuentan los bytes leídos de disco por operación para comparar con la carga completa.
+REGISTROS_RECIENTES = collections.OrderedDict()  # (archivo, id) → (firma del archivo, registro)
+INDICES_REGISTROS = {}
+ESTADISTICAS_LECTURA = {"aciertos": 0, "lecturas": 0, "operaciones": {}}
+OPERACION_LECTURA = {"nombre": None, "bytes": 0}
+
+def sumar_bytes_leidos(cantidad):
+    """Suma bytes leídos de disco a la operación en curso."""
+    OPERACION_LECTURA["bytes"] += cantidad
+
+def ejecutar_midiendo_lectura(nombre, funcion, *argumentos):
+    """Ejecuta una operación y acumula en las estadísticas los bytes que leyó de disco."""
+    anterior = (OPERACION_LECTURA["nombre"], OPERACION_LECTURA["bytes"])
+    OPERACION_LECTURA["nombre"] = nombre
+    OPERACION_LECTURA["bytes"] = 0
+    try:
+        return funcion(*argumentos)
+    finally:
+        leidos = OPERACION_LECTURA["bytes"]
+        operacion = ESTADISTICAS_LECTURA["operaciones"].setdefault(nombre, {"veces": 0, "bytes": 0, "ultima": 0})
+        operacion["veces"] += 1
+        operacion["bytes"] += leidos
+        operacion["ultima"] = leidos
+        OPERACION_LECTURA["nombre"] = anterior[0]
+        OPERACION_LECTURA["bytes"] = anterior[1] + leidos
+
+def olvidar_registros_recientes(archivo):
+    """Descarta de memoria los registros sueltos leídos de un archivo."""
+    for clave in [clave for clave in REGISTROS_RECIENTES if clave[0] == archivo]:
+        del REGISTROS_RECIENTES[clave]
+
+def lleva_indice_de_registros(archivo):
+    """Indica si al guardar un archivo se escribe también el índice de posiciones de sus registros."""
+    if es_archivo_jsonl(archivo) or es_manifiesto_particiones(archivo):
+        return False
+    return archivo == ARCHIVO_HUESPEDES or archivo == ARCHIVO_HABITACIONES or archivo == ARCHIVO_RESERVAS
+
+def texto_json_indexado(datos):
+    """
+    Devuelve el texto JSON indentado de un diccionario de registros (igual al de json.dumps con
+    indent=4) y el índice {id: [desplazamiento, largo]} en bytes de cada registro dentro del texto.
+    """
+    partes = ["{"]
+    registros = {}
+    desplazamiento = 1
+    for clave, registro in datos.items():
+        prefijo = ("," if registros else "") + "\n    " + json.dumps(clave, ensure_ascii=False) + ": "
+        texto = json.dumps(registro, ensure_ascii=False, indent=4).replace("\n", "\n    ")
+        desplazamiento += len(prefijo.encode('utf-8'))
+        largo = len(texto.encode('utf-8'))
+        registros[clave] = [desplazamiento, largo]
+        desplazamiento += largo
+        partes.append(prefijo)
+        partes.append(texto)
+    partes.append("\n}" if registros else "}")
+    return "".join(partes), registros
+
+def guardar_indice_registros(archivo, registros):
+    """Guarda el índice de registros de un archivo junto con la firma actual del archivo."""
+    indice = {"firma": list(firma_archivo(archivo)), "registros": registros}
+    INDICES_REGISTROS[archivo] = indice
+    try:
+        escribir_texto_atomico(json.dumps(indice, ensure_ascii=False), archivo + SUFIJO_INDICE_REGISTROS)
+    except OSError:
+        # El índice es solo una ayuda: si no se puede guardar, se reconstruye la próxima vez
+        pass
+
+def recorrer_diccionario_json(f, funcion, *otros):
+    """
+    Recorre por bloques un archivo JSON abierto en binario que contiene un diccionario de registros
+    y llama a funcion(id, bytes_del_registro, desplazamiento, *otros) por cada uno, sin cargar el
+    diccionario entero. Si la función devuelve True, el recorrido termina ahí.
+    Devuelve la cantidad de registros recorridos.
+    """
+    # Los bloques se decodifican como latin-1 (un carácter por byte): las posiciones en el texto
+    # coinciden con los desplazamientos en el archivo y los bytes de los caracteres UTF-8 nunca se
+    # confunden con los signos del JSON. Cada id y registro se vuelve a decodificar desde sus bytes.
+    decodificador = json.JSONDecoder()
+    texto = ""
+    base = 0  # desplazamiento en el archivo del primer carácter de 'texto'
+    pos = 0
+    esperado = "{"  # "{" → "clave" → ":" → "valor" → "," (o "}") → "clave" ...
+    clave = None
+    cantidad = 0
+    while esperado != "fin":
+        while pos < len(texto) and texto[pos].isspace():
+            pos += 1
+        if pos == len(texto):
+            bloque = f.read(TAMANIO_BLOQUE_LECTURA)
+            if not bloque:
+                raise ValueError(f"{f.name}: el archivo termina antes de cerrar el diccionario")
+            sumar_bytes_leidos(len(bloque))
+            base += len(texto)
+            texto = bloque.decode('latin-1')
+            pos = 0
+            continue
+        caracter = texto[pos]
+        if esperado == "{":
+            if caracter != "{":
+                raise ValueError(f"{f.name}: se esperaba un diccionario de registros")
+            pos += 1
+            esperado = "clave"
+        elif esperado == "clave" and caracter == "}" and cantidad == 0:
+            pos += 1
+            esperado = "fin"
+        elif esperado == "clave" or esperado == "valor":
+            try:
+                objeto, fin = decodificador.raw_decode(texto, pos)
+            except json.JSONDecodeError:
+                # El registro quedó cortado al final del bloque: se lee otro bloque y se reintenta
+                bloque = f.read(TAMANIO_BLOQUE_LECTURA)
+                if not bloque:
+                    raise
+                sumar_bytes_leidos(len(bloque))
+                base += pos
+                texto = texto[pos:] + bloque.decode('latin-1')
+                pos = 0
+                continue
+            contenido = texto[pos:fin].encode('latin-1')
+            inicio = base + pos
+            pos = fin
+            if esperado == "clave":
+                if not isinstance(objeto, str):
+                    raise ValueError(f"{f.name}: id de registro inválido")
+                clave = json.loads(contenido)
+                esperado = ":"
+            else:
+                if not isinstance(objeto, dict):
+                    raise ValueError(f"{f.name}: el registro {clave} no es un diccionario")
+                cantidad += 1
+                esperado = ","
+                if funcion(clave, contenido, inicio, *otros):
+                    return cantidad
+        elif esperado == ":":
+            if caracter != ":":
+                raise ValueError(f"{f.name}: se esperaba ':' después de {clave}")
+            pos += 1
+            esperado = "valor"
+        else:
+            if caracter == ",":
+                esperado = "clave"
+            elif caracter == "}":
+                esperado = "fin"
+            else:
+                raise ValueError(f"{f.name}: se esperaba ',' o '}}' después de {clave}")
+            pos += 1
+    return cantidad
+
+def anotar_posicion_registro(clave, contenido, desplazamiento, registros):
+    """Anota en el índice la posición y el largo de un registro."""
+    registros[clave] = [desplazamiento, len(contenido)]
+    return False
+
+def leer_indice_registros(archivo):
+    """Devuelve el índice {id: [desplazamiento, largo]} de un archivo, reconstruyéndolo si quedó viejo."""
+    firma = list(firma_archivo(archivo))
+    indice = INDICES_REGISTROS.get(archivo)
+    if indice is not None and indice["firma"] == firma:
+        return indice["registros"]
+    try:
+        with open(archivo + SUFIJO_INDICE_REGISTROS, mode='rb') as f:
+            contenido = f.read()
+        sumar_bytes_leidos(len(contenido))
+        indice = json.loads(contenido)
+    except (OSError, ValueError):
+        indice = None
+    if isinstance(indice, dict) and indice.get("firma") == firma:
+        INDICES_REGISTROS[archivo] = indice
+        return indice["registros"]
+    # El archivo se escribió sin índice (o por otro medio): se lo recorre una vez para indexarlo
+    registros = {}
+    with open(archivo, mode='rb') as f:
+        recorrer_diccionario_json(f, anotar_posicion_registro, registros)
+    if list(firma_archivo(archivo)) == firma:
+        guardar_indice_registros(archivo, registros)
+    return registros
+
+def leer_registro_indexado(archivo, clave):
+    """Lee un único registro de un archivo JSON desde la posición que indica su índice."""
+    posicion = leer_indice_registros(archivo).get(clave)
+    if posicion is None:
+        return None
+    with open(archivo, mode='rb') as f:
+        f.seek(posicion[0])
+        contenido = f.read(posicion[1])
+    sumar_bytes_leidos(len(contenido))
+    ESTADISTICAS_LECTURA["lecturas"] += 1
+    try:
+        registro = json.loads(contenido)
+    except ValueError:
+        registro = None
+    if not isinstance(registro, dict):
+        # El archivo cambió entre la lectura del índice y la del registro: se lee completo
+        return leer_datos_archivo(archivo).get(clave)
+    return registro
+
+def obtener_registro(archivo, clave):
+    """
+    Devuelve un registro (huésped, habitación o reserva) por su ID, o None si no existe, leyendo
+    de disco solo ese registro. Si el archivo completo ya está en el almacén y al día, se usa ese.
+    """
+    datos = datos_en_almacen(archivo)
+    if datos is not None:
+        return datos.get(clave)
+    if es_archivo_jsonl(archivo) or es_manifiesto_particiones(archivo):
+        # Sin posiciones fijas por registro: se carga el archivo completo
+        return cargar_archivo(archivo).get(clave)
+    firma = firma_almacen(archivo)
+    reciente = REGISTROS_RECIENTES.get((archivo, clave))
+    if reciente is not None and reciente[0] == firma:
+        REGISTROS_RECIENTES.move_to_end((archivo, clave))
+        ESTADISTICAS_LECTURA["aciertos"] += 1
+        return reciente[1]
+    if usa_sqlite(archivo):
+        fila = obtener_conexion_sqlite().execute(f"SELECT datos FROM {TABLAS_SQLITE[archivo]} WHERE id = ?", (clave,)).fetchone()
+        registro = None
+        if fila is not None:
+            sumar_bytes_leidos(len(fila[0].encode('utf-8')))
+            registro = json.loads(fila[0])
+        ESTADISTICAS_LECTURA["lecturas"] += 1
+    else:
+        registro = leer_registro_indexado(archivo, clave)
+        if archivo_usa_diario(archivo):
+            parcial = {} if registro is None else {clave: registro}
+            aplicar_diario(archivo, parcial)
+            registro = parcial.get(clave)
+    REGISTROS_RECIENTES[(archivo, clave)] = (firma, registro)
+    REGISTROS_RECIENTES.move_to_end((archivo, clave))
+    while len(REGISTROS_RECIENTES) > MAX_REGISTROS_RECIENTES:
+        REGISTROS_RECIENTES.popitem(last=False)
+    return registro
+
+def es_reserva_activa_de(datos, campo, valor):
+    """Indica si una reserva no finalizada pertenece al huésped o habitación indicado."""
+    return datos[campo] == valor and not datos.get("finalizada", False)
+
+def anotar_reserva_activa(rid, contenido, desplazamiento, campo, valor, pendientes, encontradas, limite):
+    """Agrega a 'encontradas' una reserva leída del archivo si está activa; devuelve True al llegar al límite."""
+    # Antes de decodificar la reserva se descartan las que ni siquiera mencionan el ID buscado
+    if rid not in pendientes and json.dumps(valor, ensure_ascii=False).encode('utf-8') in contenido:
+        datos = json.loads(contenido)
+        if es_reserva_activa_de(datos, campo, valor):
+            encontradas[rid] = datos
+    return limite is not None and len(encontradas) >= limite
+
+def buscar_reservas_activas_en_disco(campo, valor, limite=None):
+    """
+    Devuelve {id: reserva} con las reservas activas de un huésped o habitación recorriendo el archivo
+    de reservas sin cargarlo: las reservas que no coinciden no se guardan y, con 'limite', el
+    recorrido termina apenas se encuentran esas reservas. Primero se revisa el diario.
+    """
+    pendientes = {}
+    aplicar_diario(ARCHIVO_RESERVAS, pendientes)
+    encontradas = {}
+    for rid, datos in pendientes.items():
+        if es_reserva_activa_de(datos, campo, valor):
+            encontradas[rid] = datos
+            if limite is not None and len(encontradas) >= limite:
+                return encontradas
+    if es_manifiesto_particiones(ARCHIVO_RESERVAS):
+        for rid, datos in cargar_archivo(ARCHIVO_RESERVAS).items():
+            if rid not in encontradas and es_reserva_activa_de(datos, campo, valor):
+                encontradas[rid] = datos
+                if limite is not None and len(encontradas) >= limite:
+                    break
+        return encontradas
+    with open(ARCHIVO_RESERVAS, mode='rb') as f:
+        if not es_archivo_jsonl(ARCHIVO_RESERVAS):
+            recorrer_diccionario_json(f, anotar_reserva_activa, campo, valor, pendientes, encontradas, limite)
+            return encontradas
+        buscado = json.dumps(valor, ensure_ascii=False).encode('utf-8')
+        for linea in f:
+            sumar_bytes_leidos(len(linea))
+            if buscado in linea:
+                rid, datos = decodificar_linea_jsonl(linea)
+                if rid not in pendientes and es_reserva_activa_de(datos, campo, valor):
+                    encontradas[rid] = datos
+                    if limite is not None and len(encontradas) >= limite:
+                        break
+    return encontradas
+
+#----------------------------------------------------------------------------------------------
+# ALMACENAMIENTO SQLITE
+#----------------------------------------------------------------------------------------------
+# Con MOTOR_ALMACENAMIENTO = "sqlite" los tres diccionarios se guardan en una base SQLite:
+# cada registro conserva su forma de diccionario (columna "datos", en JSON) y los campos por los
+# que se consulta se copian a columnas indexadas. Las fechas de reserva se indexan como número
+# de día (ordinal) para poder buscar por rango.
+TABLAS_SQLITE = {ARCHIVO_HUESPEDES: "huespedes", ARCHIVO_HABITACIONES: "habitaciones", ARCHIVO_RESERVAS: "reservas"}
+ESQUEMA_SQLITE = [
+    "CREATE TABLE IF NOT EXISTS huespedes (id TEXT PRIMARY KEY, activo INTEGER, documento INTEGER, email TEXT, datos TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS idx_huespedes_documento ON huespedes(documento)",
+    "CREATE INDEX IF NOT EXISTS idx_huespedes_email ON huespedes(email)",
+    "CREATE TABLE IF NOT EXISTS habitaciones (id TEXT PRIMARY KEY, activo INTEGER, numero INTEGER, tipo TEXT, datos TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS reservas (id TEXT PRIMARY KEY, idhuesped TEXT, idhabitacion TEXT, fechaEntrada TEXT, entrada INTEGER, salida INTEGER, finalizada INTEGER, fechaHoraOperacion TEXT, datos TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS idx_reservas_idhuesped ON reservas(idhuesped, finalizada)",
+    "CREATE INDEX IF NOT EXISTS idx_reservas_idhabitacion ON reservas(idhabitacion, entrada)",
+    "CREATE INDEX IF NOT EXISTS idx_reservas_fechaEntrada ON reservas(entrada)",
+    "CREATE INDEX IF NOT EXISTS idx_reservas_mes_operacion ON reservas(substr(fechaHoraOperacion, 6, 2))"
+]
+ESTADO_SQLITE = {"conexion": None}
+
+def usa_sqlite(archivo):
+    """Indica si un archivo de datos se guarda en la base SQLite según el motor configurado."""
+    return MOTOR_ALMACENAMIENTO == "sqlite" and archivo in TABLAS_SQLITE
+
+def obtener_conexion_sqlite():
+    """Devuelve la conexión a la base SQLite de la sesión, creando el esquema si hace falta."""
+    if ESTADO_SQLITE["conexion"] is None:
+        nueva = not os.path.exists(ARCHIVO_BASE_SQLITE)
+        conexion = sqlite3.connect(ARCHIVO_BASE_SQLITE)
+        with conexion:
+            for sentencia in ESQUEMA_SQLITE:
+                conexion.execute(sentencia)
+        ESTADO_SQLITE["conexion"] = conexion
+        if nueva and MOTOR_ALMACENAMIENTO == "sqlite":
+            print(f"💡 Se creó la base {ARCHIVO_BASE_SQLITE} vacía. Importe los archivos JSON desde Mantenimiento.")
+    return ESTADO_SQLITE["conexion"]
+
+def sqlite_version_datos():
+    """Devuelve el contador de cambios confirmados por otras conexiones a la base."""
+    return obtener_conexion_sqlite().execute("PRAGMA data_version").fetchone()[0]
+
+def sqlite_valores_fila(tabla, clave, registro):
+    """Devuelve los valores de la fila SQLite de un registro, incluidas sus columnas indexadas."""
+    texto = json.dumps(registro, ensure_ascii=False, sort_keys=True)
+    if tabla == "huespedes":
+        return (clave, int(registro["activo"]), registro["documento"], registro["email"], texto)
+    if tabla == "habitaciones":
+        return (clave, int(registro["activo"]), registro["numero"], registro["tipo"], texto)
+    return (clave, registro["idhuesped"], registro["idhabitacion"], registro["fechaEntrada"],
+            fecha_a_ordinal(registro["fechaEntrada"]), fecha_a_ordinal(registro["fechaSalida"]),
+            int(registro.get("finalizada", False)), registro.get("fechaHoraOperacion", ""), texto)
+
+def sqlite_sentencia_insercion(tabla):
+    """Devuelve la sentencia INSERT OR REPLACE para una tabla."""
+    marcadores = {"huespedes": 5, "habitaciones": 5, "reservas": 9}[tabla]
+    return f"INSERT OR REPLACE INTO {tabla} VALUES ({', '.join(['?'] * marcadores)})"
+
+def sqlite_cargar_tabla(tabla):
+    """Lee una tabla completa como diccionario {id: registro}."""
+    datos = {}
+    for clave, texto in obtener_conexion_sqlite().execute(f"SELECT id, datos FROM {tabla}"):
+        sumar_bytes_leidos(len(texto.encode('utf-8')))
+        datos[clave] = json.loads(texto)
+    return datos
+
+def sqlite_guardar_tabla(tabla, datos, cambiados=None):
+    """
+    Guarda un diccionario en su tabla. Con 'cambiados' se escriben solo esas claves (INSERT OR REPLACE
+    si siguen en el diccionario, DELETE si se eliminaron); sin 'cambiados' se reemplaza la tabla completa.
+    """
+    conexion = obtener_conexion_sqlite()
+    if cambiados is None:
+        with conexion:
+            conexion.execute(f"DELETE FROM {tabla}")
+            conexion.executemany(sqlite_sentencia_insercion(tabla),
+                                 [sqlite_valores_fila(tabla, clave, registro) for clave, registro in datos.items()])
+        return
+    filas = [sqlite_valores_fila(tabla, clave, datos[clave]) for clave in cambiados if clave in datos]
+    eliminados = [(clave,) for clave in cambiados if clave not in datos]
+    with conexion:
+        conexion.executemany(sqlite_sentencia_insercion(tabla), filas)
+        conexion.executemany(f"DELETE FROM {tabla} WHERE id = ?", eliminados)
+
+def sqlite_registrar_reserva(reservas, habitaciones, rid, idhabitacion):
+    """Inserta una reserva y actualiza su habitación en una sola transacción."""
+    return sqlite_registrar_reservas(reservas, habitaciones, [rid], [idhabitacion])
+
+def sqlite_registrar_reservas(reservas, habitaciones, rids, ids_habitaciones):
+    """Inserta varias reservas y actualiza sus habitaciones en una sola transacción."""
+    conexion = obtener_conexion_sqlite()
+    filas_reservas = [sqlite_valores_fila("reservas", rid, reservas[rid]) for rid in rids]
+    filas_habitaciones = [sqlite_valores_fila("habitaciones", idh, habitaciones[idh]) for idh in ids_habitaciones]
+    try:
+        with conexion:
+            conexion.executemany(sqlite_sentencia_insercion("reservas"), filas_reservas)
+            conexion.executemany(sqlite_sentencia_insercion("habitaciones"), filas_habitaciones)
+    except sqlite3.Error as e:
+        print(f"❌ Error al registrar la reserva en la base: {e}")
+        descartar_del_almacen(ARCHIVO_RESERVAS)
+        descartar_del_almacen(ARCHIVO_HABITACIONES)
+        return False
+    return True
+
+def sqlite_consultar_reservas(condicion, parametros):
+    """Devuelve {id: reserva} con las reservas que cumplen una condición SQL sobre columnas indexadas."""
+    consulta = f"SELECT id, datos FROM reservas WHERE {condicion}"
+    return {clave: json.loads(texto) for clave, texto in obtener_conexion_sqlite().execute(consulta, parametros)}
+
+def importar_json_a_sqlite():
+    """Importa de una sola vez los tres archivos JSON (más el diario de reservas) a la base SQLite."""
+    print("\n--- Importar archivos JSON a SQLite ---")
+    datos_por_tabla = {}
+    try:
+        for archivo, tabla in TABLAS_SQLITE.items():
+            datos_por_tabla[tabla] = leer_datos_archivo(archivo)
+            aplicar_diario(archivo, datos_por_tabla[tabla])
+    except (OSError, ValueError) as e:
+        print(f"❌ Error al leer los archivos JSON: {e}")
+        return False
+    conexion = obtener_conexion_sqlite()
+    try:
+        with conexion:
+            for tabla, datos in datos_por_tabla.items():
+                conexion.execute(f"DELETE FROM {tabla}")
+                conexion.executemany(sqlite_sentencia_insercion(tabla),
+                                     [sqlite_valores_fila(tabla, clave, registro) for clave, registro in datos.items()])
+    except (sqlite3.Error, KeyError) as e:
+        print(f"❌ Error al importar a {ARCHIVO_BASE_SQLITE}: {e}")
+        return False
+    for archivo in TABLAS_SQLITE:
+        descartar_del_almacen(archivo)
+    for tabla, datos in datos_por_tabla.items():
+        print(f"✅ {tabla}: {len(datos)} registros importados")
+    if MOTOR_ALMACENAMIENTO != "sqlite":
+        print('💡 Para usar la base, configure MOTOR_ALMACENAMIENTO = "sqlite".')
+    return True
+
+#----------------------------------------------------------------------------------------------
+# FECHAS COMO NÚMERO DE DÍA
+#----------------------------------------------------------------------------------------------
+# Internamente las fechas de las reservas se manejan como número de día (ordinal): comparar,
+# restar noches o recorrer días es aritmética entera. El formato DDMMAA queda solo para lo que
+# se ingresa, se guarda y se muestra. Todas las fechas DDMMAA de los años permitidos se
+# convierten una sola vez al iniciar y se guardan en una tabla; convertir es buscar en ella.
+ORDINALES_DDMMAA = {}
+
+def construir_tabla_ordinales():
+    """Arma la tabla DDMMAA → número de día con todas las fechas de los años ANIO_MIN a ANIO_MAX."""
+    dia = datetime.date(2000 + ANIO_MIN, 1, 1)
+    ultimo = datetime.date(2000 + ANIO_MAX, 12, 31).toordinal()
+    for ordinal in range(dia.toordinal(), ultimo + 1):
+        ORDINALES_DDMMAA[datetime.date.fromordinal(ordinal).strftime("%d%m%y")] = ordinal
+
+construir_tabla_ordinales()
+
+def fecha_a_ordinal(fecha_str):
+    """Convierte una fecha DDMMAA en su número de día (ordinal); devuelve None si no es válida."""
+    ordinal = ORDINALES_DDMMAA.get(fecha_str)
+    if ordinal is not None:
+        return ordinal
+    # Fuera de los años de la tabla (por ejemplo, reservas viejas): se calcula
+    if len(fecha_str) != 6 or not fecha_str.isdigit():
+        return None
+    dia, mes, anio = int(fecha_str[:2]), int(fecha_str[2:4]), 2000 + int(fecha_str[4:6])
+    if not es_fecha_valida(dia, mes, anio):
+        return None
+    return datetime.date(anio, mes, dia).toordinal()
+
+def inicios_de_mes(anio):
+    """Devuelve los números de día del 1° de cada mes de un año (AAAA) y del 1° de enero siguiente (13 valores)."""
+    return [datetime.date(anio, mes, 1).toordinal() for mes in range(1, 13)] + [datetime.date(anio + 1, 1, 1).toordinal()]
+
+#----------------------------------------------------------------------------------------------
+# IDS DE RESERVA
+#----------------------------------------------------------------------------------------------
+# Los IDs RSVdddLLL (3 dígitos y 3 letras) forman un espacio de 1000 × 26³ = 17.576.000 valores.
+# En lugar de sortearlos y reintentar si ya existen (cada vez más lento a medida que se llena el
+# espacio), se numeran las reservas con un contador guardado en disco y cada número se transforma
+# con una permutación afín (n × MULTIPLICADOR + DESPLAZAMIENTO) módulo el tamaño del espacio. Como
+# el multiplicador es coprimo con 17.576.000 = 2⁶·5³·13³, la transformación es biyectiva: dos
+# números distintos nunca dan el mismo ID y los IDs consecutivos no se parecen entre sí.
+# El contador se lee y se avanza con el bloqueo tomado, así que dos terminales no reciben el
+# mismo número. Los IDs que ya existían (sorteados antes del contador) se saltean.
+ARCHIVO_SECUENCIA_RESERVAS = "reservas.secuencia"
+LETRAS_ID_RESERVA = string.ascii_uppercase
+ESPACIO_IDS_RESERVA = 1000 * 26 ** 3
+MULTIPLICADOR_IDS_RESERVA = 10872831  # 618 × 26³ + 10863: desparrama tanto los dígitos como las letras
+DESPLAZAMIENTO_IDS_RESERVA = 4831597
+
+def id_reserva_de_numero(numero):
+    """Devuelve el ID RSVdddLLL que le corresponde al número de secuencia indicado."""
+    valor = (numero * MULTIPLICADOR_IDS_RESERVA + DESPLAZAMIENTO_IDS_RESERVA) % ESPACIO_IDS_RESERVA
+    digitos, resto = divmod(valor, 26 ** 3)
+    letras = LETRAS_ID_RESERVA[resto // 676] + LETRAS_ID_RESERVA[resto // 26 % 26] + LETRAS_ID_RESERVA[resto % 26]
+    return f"RSV{digitos:03d}{letras}"
+
+def leer_secuencia_reservas():
+    """Devuelve el próximo número de secuencia de reservas (0 si el contador no existe)."""
+    try:
+        with open(ARCHIVO_SECUENCIA_RESERVAS, mode='r', encoding='utf-8') as f:
+            return int(f.read().strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+def guardar_secuencia_reservas(numero):
+    """Guarda el próximo número de secuencia de reservas. Se llama con el bloqueo tomado."""
+    temporal = ARCHIVO_SECUENCIA_RESERVAS + ".tmp"
+    with open(temporal, mode='w', encoding='utf-8') as f:
+        f.write(str(numero))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, ARCHIVO_SECUENCIA_RESERVAS)
+
+def reserva_existente(reservas, rid):
+    """Indica si un ID de reserva ya está en 'reservas' o, si es None (reservas particionadas), en alguna partición."""
+    if reservas is None:
+        return reserva_en_particiones(rid)
+    return rid in reservas
+
+def siguiente_id_reserva(reservas, numero):
+    """
+    Devuelve (ID, próximo número) a partir del número de secuencia indicado, salteando los IDs que
+    ya están en 'reservas' (con reservas particionadas se pasa None y se buscan en las particiones).
+    Devuelve (None, número) si se agotó el espacio de IDs.
+    """
+    while numero < ESPACIO_IDS_RESERVA:
+        rid = id_reserva_de_numero(numero)
+        numero += 1
+        if not reserva_existente(reservas, rid):
+            return rid, numero
+    return None, numero
+
+def generar_id_reserva(reservas):
+    """
+    Asigna un ID único tipo RSVxxxnnn para la reserva (exactamente 9 caracteres) y avanza el contador
+    en disco. Devuelve None si no se pudo asignar (sin bloqueo, error de disco o espacio agotado).
+    """
+    try:
+        tomar_bloqueo("asignar ID de reserva")
+    except (OSError, TimeoutError) as e:
+        print(f"❌ No se pudo asignar un ID de reserva: {e}")
+        return None
+    try:
+        rid, numero = siguiente_id_reserva(reservas, leer_secuencia_reservas())
+        if rid is None:
+            print("❌ No quedan IDs de reserva disponibles.")
+            return None
+        guardar_secuencia_reservas(numero)
+        return rid
+    except (OSError, ValueError) as e:
+        print(f"❌ Error con el contador de IDs de reserva ({ARCHIVO_SECUENCIA_RESERVAS}): {e}")
+        return None
+    finally:
+        soltar_bloqueo()
+
+def ids_reserva_restantes():
+    """Devuelve cuántos IDs de reserva quedan por asignar según el contador."""
+    try:
+        return max(ESPACIO_IDS_RESERVA - leer_secuencia_reservas(), 0)
+    except (OSError, ValueError):
+        return None
+
+#----------------------------------------------------------------------------------------------
+# ÍNDICES DE UNICIDAD
+#----------------------------------------------------------------------------------------------
+# Email, teléfono y DNI de los huéspedes y número de las habitaciones no se pueden repetir entre
+# registros activos. En lugar de recorrer todos los registros en cada alta o modificación, por
+# cada campo se mantiene un diccionario {valor normalizado: IDs activos con ese valor}: validar es
+# una sola búsqueda. El índice se arma la primera vez que se consulta un diccionario y se actualiza
+# en cada alta, modificación y baja lógica; si el diccionario se reemplaza o se pone al día con
+# cambios de otra terminal, se vuelve a armar. Los emails se comparan sin mayúsculas y en todos los
+# campos se ignoran los espacios sobrantes (un DNI o número guardado como texto vale lo mismo que
+# como número).
+CAMPOS_UNICOS = {"huespedes": ("documento", "email", "telefono"), "habitaciones": ("numero",)}
+INDICE_UNICIDAD = {}
+ESTADISTICAS_UNICIDAD = {"construcciones": 0, "consultas": 0}
+
+def clave_unica(campo, valor):
+    """Normaliza un valor de un campo único para compararlo con los demás."""
+    texto = " ".join(str(valor).split())
+    if campo == "email":
+        return texto.lower()
+    if texto.isdigit():
+        return int(texto)
+    return texto
+
+def claves_de_registro(entidad, registro):
+    """Devuelve {campo: valor normalizado} de los campos únicos de un registro activo ({} si está inactivo)."""
+    if not registro.get("activo", False):
+        return {}
+    return {campo: clave_unica(campo, registro[campo]) for campo in CAMPOS_UNICOS[entidad] if campo in registro}
+
+def anotar_claves_unicas(indice, entidad, id_registro, registro):
+    """Agrega al índice las claves únicas de un registro."""
+    claves = claves_de_registro(entidad, registro)
+    indice["por_id"][id_registro] = claves
+    for campo, clave in claves.items():
+        indice["claves"][campo].setdefault(clave, set()).add(id_registro)
+
+def quitar_claves_unicas(indice, id_registro):
+    """Saca del índice las claves únicas con que estaba anotado un registro."""
+    for campo, clave in indice["por_id"].pop(id_registro, {}).items():
+        ids = indice["claves"][campo].get(clave)
+        if ids is not None:
+            ids.discard(id_registro)
+            if not ids:
+                del indice["claves"][campo][clave]
+
+def indice_unicidad(entidad, datos):
+    """Devuelve el índice de unicidad de 'huespedes' o 'habitaciones' para un diccionario, armándolo si hace falta."""
+    indice = INDICE_UNICIDAD.get(entidad)
+    if indice is not None and indice["datos"] is datos and len(indice["por_id"]) == len(datos):
+        return indice
+    indice = {"datos": datos, "por_id": {}, "claves": {campo: {} for campo in CAMPOS_UNICOS[entidad]}}
+    for id_registro, registro in datos.items():
+        anotar_claves_unicas(indice, entidad, id_registro, registro)
+    INDICE_UNICIDAD[entidad] = indice
+    ESTADISTICAS_UNICIDAD["construcciones"] += 1
+    return indice
+
+def actualizar_indice_unicidad(entidad, datos, id_registro):
+    """Pone al día el índice después de dar de alta, modificar o dar de baja un registro del diccionario."""
+    indice = INDICE_UNICIDAD.get(entidad)
+    if indice is None or indice["datos"] is not datos:
+        return
+    quitar_claves_unicas(indice, id_registro)
+    if id_registro in datos:
+        anotar_claves_unicas(indice, entidad, id_registro, datos[id_registro])
+
+def descartar_indice_unicidad(datos):
+    """Descarta los índices de unicidad armados sobre un diccionario (por ejemplo, al ponerlo al día)."""
+    for entidad in list(INDICE_UNICIDAD):
+        if INDICE_UNICIDAD[entidad]["datos"] is datos:
+            del INDICE_UNICIDAD[entidad]
+
+def actualizar_indices(entidad, datos, id_registro):
+    """Pone al día todos los índices de 'huespedes' o 'habitaciones' después de guardar un registro."""
+    actualizar_indice_unicidad(entidad, datos, id_registro)
+    actualizar_autocompletado(entidad, datos, id_registro)
+    if entidad == "huespedes":
+        actualizar_indice_texto_huespedes(datos, id_registro)
+        actualizar_arbol_nombres(datos, id_registro)
+
+def descartar_indices(datos):
+    """Descarta todos los índices armados sobre un diccionario (por ejemplo, al ponerlo al día o cambiarlo en el lugar)."""
+    descartar_indice_unicidad(datos)
+    descartar_indice_texto_huespedes(datos)
+    descartar_autocompletado(datos)
+    descartar_arbol_nombres(datos)
+    if INDICE_INTERVALOS["datos"] is datos:
+        descartar_indice_intervalos()
+    if INDICE_POR_ID["datos"] is datos:
+        descartar_indice_por_id()
+    if INDICE_SALIDAS["datos"] is datos:
+        descartar_indice_salidas()
+
+def registro_con_clave(entidad, datos, campo, valor, id_excluir=None):
+    """Devuelve el ID de un registro activo (distinto de id_excluir) con ese valor en un campo único, o None."""
+    ESTADISTICAS_UNICIDAD["consultas"] += 1
+    for id_registro in indice_unicidad(entidad, datos)["claves"][campo].get(clave_unica(campo, valor), ()):
+        if id_registro != id_excluir:
+            return id_registro
+    return None
+
+def claves_repetidas(entidad, datos):
+    """
+    Revisa en una sola pasada todos los registros activos de una carga y devuelve
+    [(campo, valor, [IDs])] con los valores únicos que aparecen en más de un registro.
+    """
+    vistos = {campo: {} for campo in CAMPOS_UNICOS[entidad]}
+    for id_registro, registro in datos.items():
+        for campo, clave in claves_de_registro(entidad, registro).items():
+            vistos[campo].setdefault(clave, []).append(id_registro)
+    return [(campo, clave, ids) for campo in CAMPOS_UNICOS[entidad] for clave, ids in vistos[campo].items() if len(ids) > 1]
+
+#----------------------------------------------------------------------------------------------
+# BÚSQUEDA DE HUÉSPEDES POR TEXTO
+#----------------------------------------------------------------------------------------------
+# Buscar un huésped ya no normaliza y recorre todos los registros. Nombre, apellido, DNI y email de
+# cada huésped activo se guardan normalizados (sin acentos y en minúsculas); cada texto distinto
+# apunta a los huéspedes que lo tienen y cada trigrama (tres caracteres seguidos) a los textos que
+# lo contienen. Como nombres y apellidos se repiten mucho, hay muchos menos textos que huéspedes.
+# Un término solo puede estar en los textos que tienen todos sus trigramas: se intersecan esos
+# conjuntos (del más chico al más grande) y solo se confirman los textos que quedan. Los términos
+# de uno o dos caracteres se buscan entre las claves del índice, que son pocas aunque haya millones
+# de huéspedes. Cada texto encontrado tiene un nivel: 0 si es igual al término, 1 si empieza con él,
+# 2 si una de sus palabras empieza con él y 3 si lo contiene en el medio. Con varias palabras, cada
+# una tiene que aparecer en algún campo y vale la peor. Los niveles se resuelven con operaciones
+# entre conjuntos y solo se ordenan (por apellido y nombre) los resultados que se van a mostrar.
+# El índice se arma en la primera búsqueda y se actualiza en cada alta, modificación y baja.
+CAMPOS_BUSQUEDA_HUESPEDES = ("apellido", "nombre", "documento", "email")
+INDICE_TEXTO_HUESPEDES = {"datos": None, "por_id": {}, "textos": {}, "trigramas": {}}
+ESTADISTICAS_TEXTO_HUESPEDES = {"construcciones": 0, "consultas": 0, "textos_revisados": 0}
+
+def trigramas_de(texto):
+    """Devuelve los trigramas de un texto normalizado (el texto entero si tiene menos de tres caracteres)."""
+    if len(texto) < 3:
+        return {texto} if texto else set()
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+def textos_de_huesped(datos):
+    """Devuelve los campos de búsqueda de un huésped activo, normalizados (() si está inactivo)."""
+    if not datos.get("activo", False):
+        return ()
+    return tuple(" ".join(normalizar_texto(str(datos.get(campo, ""))).split()) for campo in CAMPOS_BUSQUEDA_HUESPEDES)
+
+def anotar_texto_huesped(indice, idh, datos):
+    """Agrega un huésped al índice de búsqueda."""
+    textos = textos_de_huesped(datos)
+    indice["por_id"][idh] = textos
+    for texto in textos:
+        ids = indice["textos"].get(texto)
+        if ids is None:
+            ids = indice["textos"][texto] = set()
+            for trigrama in trigramas_de(texto):
+                indice["trigramas"].setdefault(trigrama, set()).add(texto)
+        ids.add(idh)
+
+def quitar_texto_huesped(indice, idh):
+    """Saca un huésped del índice de búsqueda (y los textos que ya no tiene nadie)."""
+    for texto in indice["por_id"].pop(idh, ()):
+        ids = indice["textos"].get(texto)
+        if ids is None:
+            continue
+        ids.discard(idh)
+        if ids:
+            continue
+        del indice["textos"][texto]
+        for trigrama in trigramas_de(texto):
+            textos = indice["trigramas"].get(trigrama)
+            if textos is not None:
+                textos.discard(texto)
+                if not textos:
+                    del indice["trigramas"][trigrama]
+
+def indice_texto_huespedes(huespedes):
+    """Devuelve el índice de búsqueda de los huéspedes, armándolo si no corresponde a este diccionario."""
+    indice = INDICE_TEXTO_HUESPEDES
+    if indice["datos"] is huespedes and len(indice["por_id"]) == len(huespedes):
+        return indice
+    indice["datos"], indice["por_id"], indice["textos"], indice["trigramas"] = huespedes, {}, {}, {}
+    for idh, datos in huespedes.items():
+        anotar_texto_huesped(indice, idh, datos)
+    ESTADISTICAS_TEXTO_HUESPEDES["construcciones"] += 1
+    return indice
+
+def actualizar_indice_texto_huespedes(huespedes, idh):
+    """Pone al día el índice después de dar de alta, modificar o dar de baja un huésped."""
+    indice = INDICE_TEXTO_HUESPEDES
+    if indice["datos"] is not huespedes:
+        return
+    quitar_texto_huesped(indice, idh)
+    if idh in huespedes:
+        anotar_texto_huesped(indice, idh, huespedes[idh])
+
+def descartar_indice_texto_huespedes(datos):
+    """Descarta el índice si estaba armado sobre ese diccionario (por ejemplo, al ponerlo al día)."""
+    if INDICE_TEXTO_HUESPEDES["datos"] is datos:
+        INDICE_TEXTO_HUESPEDES["datos"] = None
+
+def textos_candidatos(indice, palabra):
+    """Devuelve los textos que pueden contener la palabra: intersección de sus trigramas o, si es corta, unión de las claves que la contienen."""
+    if len(palabra) < 3:
+        return set().union(*[textos for clave, textos in indice["trigramas"].items() if palabra in clave])
+    conjuntos = sorted((indice["trigramas"].get(trigrama, set()) for trigrama in trigramas_de(palabra)), key=len)
+    candidatos = set(conjuntos[0])
+    for conjunto in conjuntos[1:]:
+        if not candidatos:
+            break
+        candidatos &= conjunto
+    return candidatos
+
+def huespedes_por_nivel(indice, palabra):
+    """
+    Devuelve cuatro conjuntos acumulados de IDs: en el de la posición n están los huéspedes con algún
+    campo que contiene la palabra con nivel n o mejor (0 igual, 1 al comienzo, 2 al comienzo de una palabra, 3 en el medio).
+    """
+    textos_por_nivel = ([], [], [], [])
+    candidatos = textos_candidatos(indice, palabra)
+    ESTADISTICAS_TEXTO_HUESPEDES["textos_revisados"] += len(candidatos)
+    inicio_de_palabra = " " + palabra
+    for texto in candidatos:
+        if texto == palabra:
+            nivel = 0
+        elif texto.startswith(palabra):
+            nivel = 1
+        elif inicio_de_palabra in texto:
+            nivel = 2
+        elif palabra in texto:
+            nivel = 3
+        else:
+            continue
+        textos_por_nivel[nivel].append(indice["textos"][texto])
+    acumulados = []
+    acumulado = set()
+    for conjuntos in textos_por_nivel:
+        acumulado = acumulado.union(*conjuntos)
+        acumulados.append(acumulado)
+    return acumulados
+
+def buscar_huespedes_por_texto(huespedes, termino, limite=MAX_RESULTADOS_BUSQUEDA):
+    """
+    Busca huéspedes activos cuyo nombre, apellido, DNI o email contenga cada palabra del término
+    (sin distinguir acentos ni mayúsculas). Devuelve (IDs de los mejores 'limite' resultados, total).
+    """
+    palabras = list(dict.fromkeys(normalizar_texto(termino).split()))
+    if not palabras:
+        return [], 0
+    indice = indice_texto_huespedes(huespedes)
+    ESTADISTICAS_TEXTO_HUESPEDES["consultas"] += 1
+    niveles = None
+    for palabra in sorted(palabras, key=len, reverse=True):
+        acumulados = huespedes_por_nivel(indice, palabra)
+        niveles = acumulados if niveles is None else [anterior & actual for anterior, actual in zip(niveles, acumulados)]
+        if not niveles[3]:
+            return [], 0
+    resultado = []
+    anteriores = set()
+    for conjunto in niveles:
+        if len(resultado) >= limite:
+            break
+        nuevos = conjunto - anteriores
+        anteriores = conjunto
+        mejores = heapq.nsmallest(limite - len(resultado), ((indice["por_id"][idh][0], indice["por_id"][idh][1], idh) for idh in nuevos))
+        resultado.extend(idh for *_, idh in mejores)
+    return resultado, len(niveles[3])
+
+#----------------------------------------------------------------------------------------------
+# BÚSQUEDA APROXIMADA DE HUÉSPEDES
+#----------------------------------------------------------------------------------------------
+# Un apellido mal escrito ("Fernandes" por "Fernández") no aparece en la búsqueda por texto y lleva
+# a dar de alta al mismo huésped dos veces. Por eso, si la búsqueda no encuentra nada, se buscan los
+# nombres y apellidos a pocas ediciones (letras cambiadas, agregadas o quitadas) de cada palabra
+# ingresada, sin acentos ni mayúsculas. Las palabras distintas de nombres y apellidos se guardan en
+# un árbol BK: cada nodo es una palabra y sus hijos cuelgan según su distancia a ella, así que por la
+# desigualdad triangular solo hace falta bajar por los hijos a distancia d ± máximo de la palabra
+# buscada, sin compararla con todas. Los nodos son posiciones en dos listas paralelas (palabras e
+# hijos {distancia: nodo}) y el árbol se recorre con una pila. Al dar de baja o modificar un huésped
+# su palabra queda en el árbol, pero sin huéspedes no se devuelve. El árbol se arma la primera vez
+# que hace falta y se actualiza en cada alta, modificación y baja.
+ARBOL_NOMBRES_HUESPEDES = {"datos": None, "por_id": {}, "ids_por_palabra": {}, "palabras": [], "hijos": []}
+ESTADISTICAS_ARBOL_NOMBRES = {"construcciones": 0, "consultas": 0, "comparaciones": 0}
+
+def distancia_edicion(a, b):
+    """
+    Distancia de Levenshtein entre dos textos: cantidad mínima de letras cambiadas, agregadas o quitadas.
+    Usa el algoritmo de vectores de bits de Myers: cada columna de la tabla de distancias se guarda
+    como diferencias de ±1 en los bits de dos enteros, así que cada letra del texto más corto se
+    procesa con unas pocas operaciones de bits en lugar de recorrer toda la fila.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if not b:
+        return len(a)
+    mascaras = {}
+    for posicion, letra in enumerate(a):
+        mascaras[letra] = mascaras.get(letra, 0) | (1 << posicion)
+    todos = (1 << len(a)) - 1
+    ultimo = 1 << (len(a) - 1)
+    positivos, negativos, distancia = todos, 0, len(a)
+    for letra in b:
+        iguales = mascaras.get(letra, 0)
+        vertical = iguales | negativos
+        horizontal = (((iguales & positivos) + positivos) ^ positivos) | iguales
+        suben = negativos | ~(horizontal | positivos)
+        bajan = positivos & horizontal
+        if suben & ultimo:
+            distancia += 1
+        elif bajan & ultimo:
+            distancia -= 1
+        suben = (suben << 1) | 1
+        bajan = bajan << 1
+        positivos = (bajan | ~(vertical | suben)) & todos
+        negativos = suben & vertical
+    return distancia
+
+def palabras_de_nombre(datos):
+    """Devuelve las palabras normalizadas del nombre y el apellido de un huésped activo (() si está inactivo)."""
+    if not datos.get("activo", False):
+        return ()
+    return tuple(dict.fromkeys(normalizar_texto(f"{datos.get('nombre', '')} {datos.get('apellido', '')}").split()))
+
+def insertar_en_arbol(arbol, palabra):
+    """Agrega una palabra al árbol BK si no estaba."""
+    if not arbol["palabras"]:
+        arbol["palabras"].append(palabra)
+        arbol["hijos"].append({})
+        return
+    nodo = 0
+    while True:
+        distancia = distancia_edicion(palabra, arbol["palabras"][nodo])
+        if distancia == 0:
+            return
+        hijo = arbol["hijos"][nodo].get(distancia)
+        if hijo is None:
+            arbol["hijos"][nodo][distancia] = len(arbol["palabras"])
+            arbol["palabras"].append(palabra)
+            arbol["hijos"].append({})
+            return
+        nodo = hijo
+
+def anotar_en_arbol(arbol, idh, datos):
+    """Agrega al árbol las palabras del nombre y el apellido de un huésped."""
+    palabras = palabras_de_nombre(datos)
+    arbol["por_id"][idh] = palabras
+    for palabra in palabras:
+        ids = arbol["ids_por_palabra"].get(palabra)
+        if ids is None:
+            ids = arbol["ids_por_palabra"][palabra] = set()
+            insertar_en_arbol(arbol, palabra)
+        ids.add(idh)
+
+def quitar_del_arbol(arbol, idh):
+    """Desvincula a un huésped de sus palabras (las palabras quedan en el árbol)."""
+    for palabra in arbol["por_id"].pop(idh, ()):
+        ids = arbol["ids_por_palabra"].get(palabra)
+        if ids is not None:
+            ids.discard(idh)
+            if not ids:
+                del arbol["ids_por_palabra"][palabra]
+
+def arbol_nombres_huespedes(huespedes):
+    """Devuelve el árbol BK de nombres y apellidos, armándolo si no corresponde a este diccionario."""
+    arbol = ARBOL_NOMBRES_HUESPEDES
+    if arbol["datos"] is huespedes and len(arbol["por_id"]) == len(huespedes):
+        return arbol
+    arbol["datos"], arbol["por_id"], arbol["ids_por_palabra"], arbol["palabras"], arbol["hijos"] = huespedes, {}, {}, [], []
+    for idh, datos in huespedes.items():
+        anotar_en_arbol(arbol, idh, datos)
+    ESTADISTICAS_ARBOL_NOMBRES["construcciones"] += 1
+    return arbol
+
+def actualizar_arbol_nombres(huespedes, idh):
+    """Pone al día el árbol después de dar de alta, modificar o dar de baja un huésped."""
+    arbol = ARBOL_NOMBRES_HUESPEDES
+    if arbol["datos"] is not huespedes:
+        return
+    quitar_del_arbol(arbol, idh)
+    if idh in huespedes:
+        anotar_en_arbol(arbol, idh, huespedes[idh])
+
+def descartar_arbol_nombres(datos):
+    """Descarta el árbol si estaba armado sobre ese diccionario (por ejemplo, al ponerlo al día)."""
+    if ARBOL_NOMBRES_HUESPEDES["datos"] is datos:
+        ARBOL_NOMBRES_HUESPEDES["datos"] = None
+
+def palabras_cercanas(arbol, palabra, distancia_maxima):
+    """Devuelve {palabra del árbol con huéspedes activos: distancia} de las que están a 'distancia_maxima' o menos."""
+    cercanas = {}
+    if not arbol["palabras"]:
+        return cercanas
+    pila = [0]
+    while pila:
+        nodo = pila.pop()
+        distancia = distancia_edicion(palabra, arbol["palabras"][nodo])
+        ESTADISTICAS_ARBOL_NOMBRES["comparaciones"] += 1
+        if distancia <= distancia_maxima and arbol["palabras"][nodo] in arbol["ids_por_palabra"]:
+            cercanas[arbol["palabras"][nodo]] = distancia
+        for distancia_hijo, hijo in arbol["hijos"][nodo].items():
+            if abs(distancia_hijo - distancia) <= distancia_maxima:
+                pila.append(hijo)
+    return cercanas
+
+def buscar_huespedes_aproximado(huespedes, termino, distancia_maxima=DISTANCIA_MAXIMA_BUSQUEDA, limite=MAX_RESULTADOS_BUSQUEDA):
+    """
+    Busca huéspedes activos con una palabra del nombre o apellido a 'distancia_maxima' ediciones o
+    menos de cada palabra del término. Devuelve ([(ID, distancia total)] de los 'limite' más parecidos, total).
+    """
+    palabras = list(dict.fromkeys(normalizar_texto(termino).split()))
+    if not palabras:
+        return [], 0
+    arbol = arbol_nombres_huespedes(huespedes)
+    ESTADISTICAS_ARBOL_NOMBRES["consultas"] += 1
+    distancias = None
+    for palabra in palabras:
+        mejores = {}
+        for cercana, distancia in palabras_cercanas(arbol, palabra, distancia_maxima).items():
+            for idh in arbol["ids_por_palabra"][cercana]:
+                if distancia < mejores.get(idh, distancia_maxima + 1):
+                    mejores[idh] = distancia
+        if distancias is None:
+            distancias = mejores
+        else:
+            distancias = {idh: distancias[idh] + distancia for idh, distancia in mejores.items() if idh in distancias}
+        if not distancias:
+            return [], 0
+    ordenados = heapq.nsmallest(limite, ((distancia, arbol["por_id"][idh], idh) for idh, distancia in distancias.items()))
+    return [(idh, distancia) for distancia, _, idh in ordenados], len(distancias)
+
+#----------------------------------------------------------------------------------------------
+# AUTOCOMPLETADO DE HUÉSPEDES Y HABITACIONES
+#----------------------------------------------------------------------------------------------
+# Al registrar una reserva, si el ID ingresado no es de un huésped o habitación activos, en lugar
+# de solo rechazarlo se sugieren los que empiezan con ese texto: de los huéspedes, por ID, apellido
+# o DNI; de las habitaciones, por ID o número. Por cada entidad se mantiene una lista ordenada de
+# pares (clave normalizada, ID) de los registros activos; los que empiezan con un prefijo están todos
+# seguidos, así que se ubican con búsqueda binaria (bisect) y se leen solo los primeros. La lista se
+# arma la primera vez que hace falta en la sesión y después se actualiza en cada alta, modificación
+# y baja insertando o quitando solo las claves de ese registro.
+CAMPOS_AUTOCOMPLETADO = {"huespedes": ("apellido", "documento"), "habitaciones": ("numero",)}
+AUTOCOMPLETADO = {}
+ESTADISTICAS_AUTOCOMPLETADO = {"construcciones": 0, "consultas": 0}
+
+def claves_autocompletado(entidad, id_registro, datos):
+    """Devuelve las claves normalizadas (ID y campos de la entidad) de un registro activo, o () si está inactivo."""
+    if not datos.get("activo", False):
+        return ()
+    valores = [id_registro] + [str(datos.get(campo, "")) for campo in CAMPOS_AUTOCOMPLETADO[entidad]]
+    return tuple(dict.fromkeys(" ".join(normalizar_texto(valor).split()) for valor in valores))
+
+def anotar_autocompletado(indice, entidad, id_registro, datos):
+    """Inserta en la lista ordenada las claves de un registro."""
+    claves = claves_autocompletado(entidad, id_registro, datos)
+    indice["por_id"][id_registro] = claves
+    for clave in claves:
+        bisect.insort(indice["claves"], (clave, id_registro))
+
+def quitar_autocompletado(indice, id_registro):
+    """Quita de la lista ordenada las claves con que estaba anotado un registro."""
+    for clave in indice["por_id"].pop(id_registro, ()):
+        posicion = bisect.bisect_left(indice["claves"], (clave, id_registro))
+        if posicion < len(indice["claves"]) and indice["claves"][posicion] == (clave, id_registro):
+            del indice["claves"][posicion]
+
+def indice_autocompletado(entidad, datos):
+    """Devuelve la lista de autocompletado de 'huespedes' o 'habitaciones' para un diccionario, armándola si hace falta."""
+    indice = AUTOCOMPLETADO.get(entidad)
+    if indice is not None and indice["datos"] is datos and len(indice["por_id"]) == len(datos):
+        return indice
+    indice = {"datos": datos, "por_id": {}, "claves": []}
+    for id_registro, registro in datos.items():
+        claves = claves_autocompletado(entidad, id_registro, registro)
+        indice["por_id"][id_registro] = claves
+        indice["claves"].extend((clave, id_registro) for clave in claves)
+    indice["claves"].sort()
+    AUTOCOMPLETADO[entidad] = indice
+    ESTADISTICAS_AUTOCOMPLETADO["construcciones"] += 1
+    return indice
+
+def actualizar_autocompletado(entidad, datos, id_registro):
+    """Pone al día la lista después de dar de alta, modificar o dar de baja un registro del diccionario."""
+    indice = AUTOCOMPLETADO.get(entidad)
+    if indice is None or indice["datos"] is not datos:
+        return
+    quitar_autocompletado(indice, id_registro)
+    if id_registro in datos:
+        anotar_autocompletado(indice, entidad, id_registro, datos[id_registro])
+
+def descartar_autocompletado(datos):
+    """Descarta las listas de autocompletado armadas sobre un diccionario (por ejemplo, al ponerlo al día)."""
+    for entidad in list(AUTOCOMPLETADO):
+        if AUTOCOMPLETADO[entidad]["datos"] is datos:
+            del AUTOCOMPLETADO[entidad]
+
+def sugerencias_autocompletado(entidad, datos, prefijo, limite=MAX_SUGERENCIAS_AUTOCOMPLETADO):
+    """Devuelve hasta 'limite' IDs de registros activos con ID, apellido, DNI o número que empieza con el prefijo."""
+    prefijo = " ".join(normalizar_texto(prefijo).split())
+    if not prefijo:
+        return []
+    claves = indice_autocompletado(entidad, datos)["claves"]
+    ESTADISTICAS_AUTOCOMPLETADO["consultas"] += 1
+    encontrados = {}
+    posicion = bisect.bisect_left(claves, (prefijo,))
+    while posicion < len(claves) and len(encontrados) < limite and claves[posicion][0].startswith(prefijo):
+        encontrados[claves[posicion][1]] = True
+        posicion += 1
+    return list(encontrados)
+
+def mostrar_sugerencias(entidad, archivo, texto):
+    """Muestra las sugerencias numeradas para un ID no encontrado y devuelve sus IDs ([] si no hay)."""
+    try:
+        datos = cargar_archivo(archivo)
+    except (OSError, ValueError):
+        return []
+    sugerencias = sugerencias_autocompletado(entidad, datos, texto)
+    if sugerencias:
+        print("💡 Sugerencias (escriba #n para elegir una):")
+    for numero, id_registro in enumerate(sugerencias, start=1):
+        d = datos[id_registro]
+        if entidad == "huespedes":
+            print(f"   #{numero} {id_registro:<6} | {d['apellido']}, {d['nombre']} | DNI {d['documento']}")
+        else:
+            print(f"   #{numero} {id_registro:<6} | N° {d['numero']} | {d['tipo']} | piso {d['piso']} | {d['estado']}")
+    return sugerencias
+
+def elegir_sugerencia(texto, sugerencias):
+    """Devuelve el ID de la sugerencia elegida con '#n', o el texto tal cual si no es una elección válida."""
+    if texto.startswith("#") and texto[1:].isdigit() and 1 <= int(texto[1:]) <= len(sugerencias):
+        return sugerencias[int(texto[1:]) - 1]
+    return texto
+
+#----------------------------------------------------------------------------------------------
+# FUNCIONES
+#----------------------------------------------------------------------------------------------
+def input_int(msg):
+    """Solicita un entero por consola, validando la entrada."""
+    while True:
+        try:
+            dato = input(msg)
+            if dato.lower() in ['cancelar', 'cancel', 'c']:
+                return None
+            if dato.isdigit():
+                return int(dato)
+            print("❌ Ingrese un número válido o 'cancelar' para salir.")
+        except KeyboardInterrupt:
+            print("\n❌ Operación cancelada por el usuario.")
+            return None
+
+def input_float(msg):
+    """Solicita un número flotante por consola, validando la entrada."""
+    while True:
+        try:
+            dato = input(msg).strip()
+            if dato.lower() in ['cancelar', 'cancel', 'c']:
+                return None
+            # Permite un punto decimal.
+            if dato.count('.') <= 1 and dato.replace('.', '', 1).isdigit():
+                valor = float(dato)
+                if valor >= 0:
+                    return valor
+                else:
+                    print("❌ No se permiten valores negativos.")
+            else:
+                print("❌ Ingrese un valor numérico positivo o 'cancelar' para salir.")
+        except KeyboardInterrupt:
+            print("\n❌ Operación cancelada por el usuario.")
+            return None
+
+def input_email(msg):
+    """Solicita un email por consola, validando su formato básico."""
+    while True:
+        email = input(msg).strip()
+        # Validación simple: contiene un '@' y al menos un '.' después del '@'.
+        partes = email.split('@')
+        if len(partes) == 2 and partes[0] and partes[1] and '.' in partes[1]:
+            return email
+        print("Ingrese un email válido.")
+
+def input_opciones(msg, opciones):
+    """Solicita una opción válida de un conjunto dado."""
+    while True:
+        try:
+            op = input(msg)
+            if op in opciones:
+                return op
+            print(f"❌ Opción inválida. Opciones válidas: {', '.join(opciones)}")
+        except KeyboardInterrupt:
+            print("\n❌ Operación cancelada por el usuario.")
+            return None
+
+def es_fecha_valida(dia, mes, anio):
+    """Chequea si una fecha es válida (ej: que no sea 31 de abril)."""
+    if not (1 <= mes <= 12):
+        return False
+    
+    dias_por_mes = [0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+    
+    # Manejo de año bisiesto
+    if (anio % 4 == 0 and anio % 100 != 0) or (anio % 400 == 0):
+        dias_por_mes[2] = 29
+        
+    if not (1 <= dia <= dias_por_mes[mes]):
+        return False
+        
+    return True
+
+def validar_email_regex(email):
+    """Valida el email usando una expresión regular estricta."""
+    if len(email) > 254:  # RFC 5321 limit
+        return False
+    return PATRON_EMAIL.match(email) is not None
+
+def validar_dni(dni):
+    """Valida que el DNI tenga entre 6 y 8 caracteres numéricos."""
+    if isinstance(dni, int):
+        if dni < 0:
+            return False
+        dni = str(dni)
+    elif isinstance(dni, str):
+        if dni.startswith('-'):
+            return False
+    else:
+        return False
+    
+    return dni.isdigit() and MIN_LENGTH_DNI <= len(dni) <= MAX_LENGTH_DNI
+
+def validar_telefono(telefono):
+    """Valida que el teléfono tenga el formato correcto."""
+    telefono_str = str(telefono)
+    # Permitir + solo al inicio, y solo si hay más de 7 dígitos después
+    if telefono_str.startswith('+'):
+        resto = telefono_str[1:]
+        if not (resto.isdigit() and MIN_LENGTH_TELEFONO <= len(resto) <= MAX_LENGTH_TELEFONO):
+            return False
+        if len(resto) > 15:  # Máximo 15 dígitos después del +
+            return False
+    else:
+        if not (telefono_str.isdigit() and MIN_LENGTH_TELEFONO <= len(telefono_str) <= MAX_LENGTH_TELEFONO):
+            return False
+        if len(telefono_str) > 15:  # Máximo 15 dígitos
+            return False
+    return True
+
+def validar_id_huesped(idh):
+    """Valida que el ID del huésped tenga entre 2 y 6 caracteres."""
+    if not (MIN_LENGTH_ID <= len(idh) <= MAX_LENGTH_ID):
+        return False
+    # Verificar que solo contenga letras y números
+    if not idh.isalnum():
+        return False
+    # Verificar que no sea solo números
+    if idh.isdigit():
+        return False
+    return True
+
+def validar_nombre_apellido(texto):
+    """Valida que el nombre o apellido tenga entre 2 y 20 caracteres y solo contenga letras y espacios."""
+    texto_limpio = texto.strip()
+    if not (MIN_LENGTH_NOMBRE <= len(texto_limpio) <= MAX_LENGTH_NOMBRE):
+        return False
+    # Verificar que solo contenga letras y espacios
+    for caracter in texto_limpio:
+        if not (caracter.isalpha() or caracter.isspace()):
+            return False
+    # Verificar que no sea solo espacios
+    if texto_limpio.replace(" ", "") == "":
+        return False
+    # Verificar que no tenga espacios múltiples consecutivos
+    if "  " in texto_limpio:
+        return False
+    # Verificar que no empiece o termine con espacio
+    if texto_limpio.startswith(" ") or texto_limpio.endswith(" "):
+        return False
+    return True
+
+def validar_unicidad_email_telefono(huespedes, email, telefono, id_excluir=None):
+    """Valida que el email y teléfono sean únicos entre huéspedes activos."""
+    idh = registro_con_clave("huespedes", huespedes, "email", email, id_excluir)
+    if idh is not None:
+        return False, f"Email '{email}' ya existe en huésped {idh}"
+    idh = registro_con_clave("huespedes", huespedes, "telefono", telefono, id_excluir)
+    if idh is not None:
+        return False, f"Teléfono '{telefono}' ya existe en huésped {idh}"
+    return True, ""
+
+def es_medio_pago_valido(medio):
+    """Valida que el medio de pago sea válido."""
+    return medio in MEDIOS_DE_PAGO
+
+def es_tipo_habitacion_valido(tipo):
+    """Valida que el tipo de habitación sea válido."""
+    return tipo in TIPOS_HABITACION
+
+def es_estado_habitacion_valido(estado):
+    """Valida que el estado de habitación sea válido."""
+    return estado in ESTADOS_HABITACION
+
+def input_id_huesped(msg):
+    """Solicita un ID de huésped válido por consola, validando la entrada."""
+    while True:
+        idh = input(msg).strip()
+        if validar_id_huesped(idh):
+            return idh
+        print("❌ ID inválido. Debe tener entre 2 y 6 caracteres.")
+
+def input_nombre_apellido(msg):
+    """Solicita un nombre o apellido válido por consola, validando la entrada."""
+    while True:
+        texto = input(msg).strip()
+        if validar_nombre_apellido(texto):
+            return texto
+        print("❌ Nombre/Apellido inválido. Debe tener entre 2 y 20 caracteres y solo contener letras.")
+
+def input_dni(msg):
+    """Solicita un DNI por consola, validando la entrada."""
+    while True:
+        dni = input(msg).strip()
+        if not dni.isdigit():
+            print("❌ DNI inválido. Debe contener solo dígitos numéricos.")
+        else:
+            dni = int(dni)
+            if dni < 0:
+                print("❌ DNI inválido. No puede ser negativo.")
+            elif dni > 99999999:
+                print("❌ DNI inválido. No puede exceder 99999999 (8 dígitos).")
+            elif validar_dni(dni):
+                return dni
+            else:
+                print("❌ DNI inválido. Debe tener entre 6 y 8 dígitos numéricos.")
+
+def input_telefono(msg):
+    """Solicita un teléfono válido por consola, validando la entrada."""
+    while True:
+        telefono = input(msg).strip()
+        if validar_telefono(telefono):
+            # Si tiene +, mantener como string, sino convertir a int
+            if telefono.startswith('+'):
+                return telefono
             else:
                 telefono_int = int(telefono)
                 if telefono_int >= 0:
@@ -336,27 +2785,52 @@ def input_medio_pago(msg):
 
 def normalizar_texto(texto):
     """Normaliza texto removiendo acentos y convirtiendo a minúsculas."""
-    mapeo_acentos = {
-        'á': 'a', 'é': 'e', 'í': 'i', 'ó': 'o', 'ú': 'u', 'ü': 'u', 'ñ': 'n',
-        'Á': 'A', 'É': 'E', 'Í': 'I', 'Ó': 'O', 'Ú': 'U', 'Ü': 'U', 'Ñ': 'N'
-    }
-    texto_normalizado = texto
-    for acento, sin_acento in mapeo_acentos.items():
-        texto_normalizado = texto_normalizado.replace(acento, sin_acento)
-    return texto_normalizado.lower()
+    return texto.translate(TABLA_SIN_ACENTOS).lower()
 
 def limpiar_espacios(texto):
     """Elimina espacios dobles y espacios iniciales/finales de un texto."""
     partes = texto.strip().split()
     return ' '.join(partes)
 
-def guardar_reservas(reservas, archivo=ARCHIVO_RESERVAS):
+def escribir_datos(datos, archivo, cambiados=None):
+    """
+    Guarda un diccionario en su archivo JSON (atómico, con backup incremental y bajo bloqueo) o en la
+    base SQLite, y lo deja registrado en el almacén. 'cambiados' son las claves de los registros que
+    esta terminal agregó, modificó o eliminó: si otra terminal guardó el archivo después de leerlo,
+    antes se aplican solo esos registros sobre la versión actual; también son los que van al backup.
+    Sin 'cambiados' el diccionario reemplaza al archivo completo (por ejemplo, al restaurarlo) y el
+    backup es completo. En la base SQLite se escriben igual solo las filas de 'cambiados'.
+    """
+    if usa_sqlite(archivo):
+        sqlite_guardar_tabla(TABLAS_SQLITE[archivo], datos, cambiados)
+        actualizar_almacen(archivo, datos)
+        return
+    tomar_bloqueo(f"guardar {archivo}")
+    try:
+        firma_columnar_previa = firma_columnar() if archivo == ARCHIVO_RESERVAS else None
+        if cambiados is not None:
+            for rid in rebasar_si_desactualizado(archivo, datos, cambiados):
+                print(f"❌ Reserva {rid} descartada: otra terminal reservó esa habitación en esas fechas.")
+        hacer_backup_incremental(archivo, datos, cambiados)
+        escribir_json_atomico(datos, archivo)
+        incrementar_version(archivo)
+        actualizar_almacen(archivo, datos)
+        anotar_cambios_columnar(firma_columnar_previa, cambiados)
+    finally:
+        soltar_bloqueo()
+
+def guardar_reservas(reservas, archivo=ARCHIVO_RESERVAS, cambiados=None):
+    if archivo_usa_diario(archivo):
+        # Reescribir el archivo completo deja obsoleto al diario: se lo vuelca antes de guardar.
+        # Si no se pudo volcar no se guarda: el diario se aplicaría encima del archivo nuevo.
+        if not compactar_diario():
+            return False
     try:
-        with open(archivo, mode='w', encoding='utf-8') as f:
-            json.dump(reservas, f, ensure_ascii=False, indent=4)
+        escribir_datos(reservas, archivo, cambiados)
         print(f"✅ Reservas guardadas exitosamente en {archivo}")
     except Exception as e:
         print(f"❌ Error al guardar reservas: {e}")
+        descartar_del_almacen(archivo)
         return False
     return True
 
@@ -373,13 +2847,13 @@ def exportar_informe_a_archivo(contenido, nombre_archivo):
         print(f"❌ Error al exportar informe: {e}")
         return False
 
-def guardar_huespedes(huespedes, archivo="huespedes.json"):
+def guardar_huespedes(huespedes, archivo="huespedes.json", cambiados=None):
     try:
-        with open(archivo, mode='w', encoding='utf-8') as f:
-            json.dump(huespedes, f, ensure_ascii=False, indent=4)
+        escribir_datos(huespedes, archivo, cambiados)
         print(f"✅ Huéspedes guardados exitosamente en {archivo}")
     except Exception as e:
         print(f"❌ Error al guardar huéspedes: {e}")
+        descartar_del_almacen(archivo)
         return False
     return True
 
@@ -387,8 +2861,7 @@ def alta_huesped(huespedes_archivo=ARCHIVO_HUESPEDES):
     """Da de alta un huésped nuevo, persistiendo en archivo JSON."""
     print("\n--- Alta de huésped ---")
     try:
-        with open(huespedes_archivo, mode='r', encoding='utf-8') as f:
-            huespedes = json.load(f)
+        huespedes = cargar_archivo(huespedes_archivo)
     except FileNotFoundError:
         huespedes = {}
     except OSError as detalle:
@@ -511,15 +2984,15 @@ def alta_huesped(huespedes_archivo=ARCHIVO_HUESPEDES):
         "mediosDePago": medios
     }
     
-    guardar_huespedes(huespedes)
+    guardar_huespedes(huespedes, cambiados=[idh])
+    actualizar_indices("huespedes", huespedes, idh)
     print(f"✅ Huésped {nombre} {apellido} agregado correctamente.")
 
 def modificar_huesped(huespedes_archivo=ARCHIVO_HUESPEDES):
     """Permite modificar todos los datos de un huésped activo, persistiendo en archivo JSON."""
     print("\n--- Modificar huésped ---")
     try:
-        with open(huespedes_archivo, mode='r', encoding='utf-8') as f:
-            huespedes = json.load(f)
+        huespedes = cargar_archivo(huespedes_archivo)
     except FileNotFoundError:
         print("❌ El archivo de huéspedes no existe. No hay datos para modificar.")
         return
@@ -594,10 +3067,14 @@ def modificar_huesped(huespedes_archivo=ARCHIVO_HUESPEDES):
                     else:
                         print("❌ Teléfono inválido. Debe tener entre 7 y 15 dígitos numéricos.")
         
-        # Validar unicidad de email y teléfono después de las modificaciones
+        # Validar unicidad de DNI, email y teléfono después de las modificaciones
         valido, error = validar_unicidad_email_telefono(huespedes, huespedes[idh]["email"], huespedes[idh]["telefono"], idh)
+        if valido and not validar_dni_unico(huespedes, huespedes[idh]["documento"], idh):
+            valido, error = False, f"DNI '{huespedes[idh]['documento']}' ya existe en otro huésped activo"
         if not valido:
             print(f"❌ {error}")
+            # Los cambios no se guardan: se descarta la copia en memoria para releer el archivo
+            descartar_del_almacen(huespedes_archivo)
             return
         
         mp_actual = ', '.join(huespedes[idh]["mediosDePago"])
@@ -641,7 +3118,8 @@ def modificar_huesped(huespedes_archivo=ARCHIVO_HUESPEDES):
                     huespedes[idh]["mediosDePago"] = medios_validos
                     break
         
-        guardar_huespedes(huespedes)
+        guardar_huespedes(huespedes, cambiados=[idh])
+        actualizar_indices("huespedes", huespedes, idh)
         print("✅ Huésped modificado correctamente.")
     else:
         print("❌ No existe un huésped activo con ese ID.")
@@ -652,10 +3130,7 @@ def eliminar_huesped():
     
     # Cargar datos actualizados desde archivos JSON
     try:
-        with open(ARCHIVO_HUESPEDES, 'r', encoding='utf-8') as f:
-            huespedes = json.load(f)
-        with open(ARCHIVO_RESERVAS, 'r', encoding='utf-8') as f:
-            reservas = json.load(f)
+        huespedes = cargar_archivo(ARCHIVO_HUESPEDES)
     except (FileNotFoundError, OSError) as detalle:
         print("❌ Error al intentar abrir archivo(s):", detalle)
         return
@@ -676,18 +3151,17 @@ def eliminar_huesped():
     print(f"   Email: {huespedes[idh]['email']}")
     print(f"   Teléfono: {huespedes[idh]['telefono']}")
     
-    # Verificar reservas activas o futuras
-    reservas_activas = []
-    for rid, datos in reservas.items():
-        if datos["idhuesped"] == idh:
-            # Si la reserva es futura o activa (no finalizada)
-            if not datos.get("finalizada", False):
-                reservas_activas.append(rid)
+    # Verificar reservas activas o futuras (no finalizadas); las reservas se recorren sin cargarlas
+    try:
+        reservas_activas = reservas_activas_de(None, "idhuesped", idh)
+    except (OSError, ValueError) as detalle:
+        print("❌ Error al intentar abrir archivo(s):", detalle)
+        return
     
     if reservas_activas:
         print(f"\n❌ No se puede dar de baja: el huésped tiene {len(reservas_activas)} reservas activas o futuras:")
-        for rid in reservas_activas:
-            print(f"   - Reserva {rid}: {reservas[rid]['fechaEntrada']} a {reservas[rid]['fechaSalida']}")
+        for rid, datos in reservas_activas.items():
+            print(f"   - Reserva {rid}: {datos['fechaEntrada']} a {datos['fechaSalida']}")
         return
     
     confirm = input("\n⚠️  ¿Confirma la baja lógica del huésped? (s/n): ").strip().lower()
@@ -697,14 +3171,14 @@ def eliminar_huesped():
     else:
         print("❌ Operación cancelada.")
     
-    guardar_huespedes(huespedes)
+    guardar_huespedes(huespedes, cambiados=[idh] if confirm == "s" else [])
+    actualizar_indices("huespedes", huespedes, idh)
 
 def listar_huespedes_activos(huespedes_archivo="huespedes.json"):
     """Lista todos los huéspedes activos leyendo desde archivo JSON, con formato tabular alineado."""
     print("\n--- Lista de huéspedes activos ---")
     try:
-        with open(huespedes_archivo, mode='r', encoding='utf-8') as f:
-            huespedes = json.load(f)
+        huespedes = cargar_archivo(huespedes_archivo)
     except FileNotFoundError:
         print("❌ El archivo de huéspedes no existe. No hay datos para mostrar.")
         return
@@ -725,26 +3199,24 @@ def listar_huespedes_activos(huespedes_archivo="huespedes.json"):
     print("-" * len(encabezado))
 
 def buscar_huespedes(huespedes_archivo="huespedes.json"):
-    print("\n--- Buscar huésped por nombre o apellido ---")
+    print("\n--- Buscar huésped por nombre, apellido, DNI o email ---")
     try:
-        with open(huespedes_archivo, mode='r', encoding='utf-8') as f:
-            huespedes = json.load(f)
+        huespedes = cargar_archivo(huespedes_archivo)
     except FileNotFoundError:
         print("❌ El archivo de huéspedes no existe. No hay datos para buscar.")
         return
     except OSError as detalle:
         print("❌ Error al intentar abrir archivo(s):", detalle, "¿Existe el archivo y tiene formato JSON válido?")
         return
-    termino = input("Ingrese nombre o apellido a buscar: ").strip()
-    termino_normalizado = normalizar_texto(termino)
-    encontrados = []
-    for idh, d in huespedes.items():
-        if d["activo"]:
-            nombre_normalizado = normalizar_texto(d["nombre"])
-            apellido_normalizado = normalizar_texto(d["apellido"])
-            if (termino_normalizado in nombre_normalizado or 
-                termino_normalizado in apellido_normalizado):
-                encontrados.append((idh, d))
+    termino = input("Ingrese nombre, apellido, DNI o email a buscar: ").strip()
+    ids, total = buscar_huespedes_por_texto(huespedes, termino)
+    if not ids:
+        # Sin coincidencias: se buscan nombres y apellidos parecidos por si hay un error de tipeo
+        aproximados, total = buscar_huespedes_aproximado(huespedes, termino)
+        ids = [idh for idh, _ in aproximados]
+        if ids:
+            print(f"🔤 No hay coincidencias exactas; huéspedes con nombre o apellido parecido (hasta {DISTANCIA_MAXIMA_BUSQUEDA} letras distintas por palabra):")
+    encontrados = [(idh, huespedes[idh]) for idh in ids]
     # Usar el mismo formato de tabla que listar_huespedes_activos
     encabezado = f"{'ID':<4} | {'Nombre':<12} | {'Apellido':<12} | {'DNI':<9} | {'Email':<35} | {'Teléfono':<12} | {'Pago':<15}"
     print("-" * len(encabezado))
@@ -754,19 +3226,26 @@ def buscar_huespedes(huespedes_archivo="huespedes.json"):
         for idh, datos in encontrados:
             print(f"{idh:<4} | {datos['nombre']:<12} | {datos['apellido']:<12} | {str(datos['documento']):<9} | {datos['email']:<35} | {str(datos['telefono']):<12} | {', '.join(datos['mediosDePago']):<15}")
     else:
-        print("No se encontraron huéspedes con ese nombre o apellido.")
+        print("No se encontraron huéspedes con esos datos.")
     print("-" * len(encabezado))
+    if total > len(encontrados):
+        print(f"Se muestran los {len(encontrados)} mejores de {total} resultados; refine la búsqueda para ver otros.")
 
 #----------------------------------------------------------------------------------------------
 # CRUD HABITACIONES
 #----------------------------------------------------------------------------------------------
-def guardar_habitaciones(habitaciones, archivo="habitaciones.json"):
+def guardar_habitaciones(habitaciones, archivo="habitaciones.json", cambiados=None):
+    if archivo_usa_diario(archivo):
+        # Reescribir el archivo completo deja obsoleto al diario: se lo vuelca antes de guardar.
+        # Si no se pudo volcar no se guarda: el diario se aplicaría encima del archivo nuevo.
+        if not compactar_diario():
+            return False
     try:
-        with open(archivo, mode='w', encoding='utf-8') as f:
-            json.dump(habitaciones, f, ensure_ascii=False, indent=4)
+        escribir_datos(habitaciones, archivo, cambiados)
         print(f"✅ Habitaciones guardadas exitosamente en {archivo}")
     except Exception as e:
         print(f"❌ Error al guardar habitaciones: {e}")
+        descartar_del_almacen(archivo)
         return False
     return True
 
@@ -774,8 +3253,7 @@ def alta_habitacion(habitaciones_archivo=ARCHIVO_HABITACIONES):
     """Da de alta una habitación nueva, persistiendo en archivo JSON."""
     print("\n--- Alta de habitación ---")
     try:
-        with open(habitaciones_archivo, mode='r', encoding='utf-8') as f:
-            habitaciones = json.load(f)
+        habitaciones = cargar_archivo(habitaciones_archivo)
     except FileNotFoundError:
         habitaciones = {}
     except OSError as detalle:
@@ -829,7 +3307,7 @@ def alta_habitacion(habitaciones_archivo=ARCHIVO_HABITACIONES):
     while descripcion is None:
         descripcion_input = input("Descripción: ").strip()
         if MIN_LENGTH_DESCRIPCION <= len(descripcion_input) <= MAX_LENGTH_DESCRIPCION:
-            if re.fullmatch(r'[a-zA-Z0-9,. ]+', descripcion_input):
+            if PATRON_TEXTO_HABITACION.fullmatch(descripcion_input):
                 if "  " not in descripcion_input:
                     if not (descripcion_input.startswith(" ") or descripcion_input.endswith(" ")):
                         descripcion = limpiar_espacios(descripcion_input)
@@ -899,7 +3377,7 @@ def alta_habitacion(habitaciones_archivo=ARCHIVO_HABITACIONES):
                     # Verificar que cada servicio no contenga caracteres problemáticos
                     servicios_validos = True
                     for servicio in servicios_lista:
-                        if not re.fullmatch(r'[a-zA-Z0-9,. ]+', servicio):
+                        if not PATRON_TEXTO_HABITACION.fullmatch(servicio):
                             print(f"❌ Servicio '{servicio}' inválido. Solo puede contener letras, números, comas, puntos y espacios.")
                             servicios_validos = False
                             break
@@ -928,15 +3406,15 @@ def alta_habitacion(habitaciones_archivo=ARCHIVO_HABITACIONES):
         "serviciosIncluidos": serviciosIncluidos
     }
     
-    guardar_habitaciones(habitaciones)
+    guardar_habitaciones(habitaciones, cambiados=[idh])
+    actualizar_indices("habitaciones", habitaciones, idh)
     print(f"✅ Habitación {numero} agregada correctamente.")
 
 def modificar_habitacion(habitaciones_archivo="habitaciones.json"):
     """Permite modificar todos los datos de una habitación (activa o inactiva), persistiendo en archivo JSON."""
     print("\n--- Modificar habitación ---")
     try:
-        with open(habitaciones_archivo, mode='r', encoding='utf-8') as f:
-            habitaciones = json.load(f)
+        habitaciones = cargar_archivo(habitaciones_archivo)
     except FileNotFoundError:
         print("❌ El archivo de habitaciones no existe. No hay datos para modificar.")
         return
@@ -975,10 +3453,12 @@ def modificar_habitacion(habitaciones_archivo="habitaciones.json"):
                     if nuevo_input.isdigit() and 1 <= len(nuevo_input) <= 4:
                         nuevo_val = int(nuevo_input)
                         if nuevo_val >= 0:
-                            if nuevo_val <= 9999:
-                                nuevo = nuevo_val
-                            else:
+                            if nuevo_val > 9999:
                                 print("❌ Número de habitación inválido. No puede exceder 9999 (4 dígitos).")
+                            elif not validar_numero_habitacion_unico(habitaciones, nuevo_val, idh):
+                                print("❌ Ya existe otra habitación activa con ese número.")
+                            else:
+                                nuevo = nuevo_val
                         else:
                             print("❌ Número de habitación inválido. No puede ser negativo.")
                     else:
@@ -995,7 +3475,7 @@ def modificar_habitacion(habitaciones_archivo="habitaciones.json"):
                 
                 elif campo == "descripcion":
                     if 5 <= len(nuevo_input) <= 25:
-                        if re.fullmatch(r'[a-zA-Z0-9,. ]+', nuevo_input):
+                        if PATRON_TEXTO_HABITACION.fullmatch(nuevo_input):
                             nuevo = nuevo_input
                         else:
                             print("❌ Descripción inválida. Solo puede contener letras, números, comas, puntos y espacios.")
@@ -1049,289 +3529,1712 @@ def modificar_habitacion(habitaciones_archivo="habitaciones.json"):
                     nuevo = limpiar_espacios(str(nuevo))
                 habitaciones[idh][campo] = nuevo
         
-        guardar_habitaciones(habitaciones)
+        # Una habitación reactivada puede tener el número de otra que se dio de alta mientras estaba inactiva
+        if not validar_numero_habitacion_unico(habitaciones, habitaciones[idh]["numero"], idh):
+            print(f"❌ Ya existe otra habitación activa con el número {habitaciones[idh]['numero']}. No se guardaron los cambios.")
+            descartar_del_almacen(habitaciones_archivo)
+            return
+        guardar_habitaciones(habitaciones, cambiados=[idh])
+        actualizar_indices("habitaciones", habitaciones, idh)
         print("✅ Habitación modificada correctamente.")
     else:
         print("❌ No existe una habitación con ese ID.")
 
-def eliminar_habitacion():
-    """Realiza la baja lógica de una habitación solo si no tiene reservas activas o futuras."""
-    print("\n--- Eliminar (baja lógica) habitación ---")
-    
-    # Cargar datos actualizados desde archivos JSON
+def eliminar_habitacion():
+    """Realiza la baja lógica de una habitación solo si no tiene reservas activas o futuras."""
+    print("\n--- Eliminar (baja lógica) habitación ---")
+    
+    # Cargar datos actualizados desde archivos JSON
+    try:
+        habitaciones = cargar_archivo(ARCHIVO_HABITACIONES)
+    except (FileNotFoundError, OSError) as detalle:
+        print("❌ Error al intentar abrir archivo(s):", detalle)
+        return
+    
+    idh = input("ID habitación a eliminar: ").strip()
+    if idh not in habitaciones:
+        print("❌ No existe una habitación con ese ID.")
+        return
+    if not habitaciones[idh]["activo"]:
+        print("❌ La habitación ya está inactiva.")
+        return
+    
+    # Mostrar datos de la habitación antes de eliminar
+    print(f"\n📋 Datos de la habitación a eliminar:")
+    print(f"   ID: {idh}")
+    print(f"   Número: {habitaciones[idh]['numero']}")
+    print(f"   Tipo: {habitaciones[idh]['tipo']}")
+    print(f"   Descripción: {habitaciones[idh]['descripcion']}")
+    print(f"   Piso: {habitaciones[idh]['piso']}")
+    print(f"   Estado: {habitaciones[idh]['estado']}")
+    print(f"   Precio por noche: ${habitaciones[idh]['precioNoche']:.2f}")
+    print(f"   Servicios incluidos: {habitaciones[idh]['serviciosIncluidos']}")
+    
+    # Verificar reservas activas o futuras: alcanza con encontrar la primera
+    try:
+        reservas_activas = reservas_activas_de(None, "idhabitacion", idh, limite=1)
+    except (OSError, ValueError) as detalle:
+        print("❌ Error al intentar abrir archivo(s):", detalle)
+        return
+    if reservas_activas:
+        print("❌ No se puede dar de baja: la habitación tiene reservas activas o futuras.")
+        for rid, datos in reservas_activas.items():
+            print(f"   - Reserva {rid}: {datos['fechaEntrada']} a {datos['fechaSalida']}")
+        print("⚠️  Todas las habitaciones generadas por defecto tienen reservas activas.\n   Para probar la función de eliminar habitación, cree una nueva sin reservas desde el sistema principal.")
+        return
+    confirm = input("¿Confirma la baja lógica de la habitación? (s/n): ").strip().lower()
+    if confirm == "s":
+        habitaciones[idh]["activo"] = False
+        print("❌ Habitación dada de baja lógicamente.")
+    else:
+        print("❌ Operación cancelada.")
+    guardar_habitaciones(habitaciones, cambiados=[idh] if confirm == "s" else [])
+    actualizar_indices("habitaciones", habitaciones, idh)
+
+def listar_habitaciones_activas(habitaciones_archivo="habitaciones.json"):
+    """Lista todas las habitaciones activas leyendo desde archivo JSON, con formato tabular alineado."""
+    print("\n--- Lista de habitaciones activas ---")
+    try:
+        habitaciones = cargar_archivo(habitaciones_archivo)
+    except FileNotFoundError:
+        print("❌ El archivo de habitaciones no existe. No hay datos para mostrar.")
+        return
+    except OSError as detalle:
+        print("❌ Error al intentar abrir archivo(s):", detalle, "¿Existe el archivo y tiene formato JSON válido?")
+        return
+    encabezado = f"{'ID':<12} | {'Nro':<8} | {'Tipo':<10} | {'Piso':<4} | {'Estado':<12} | {'Precio':<10} | {'Servicios':<20}"
+    print("-" * len(encabezado))
+    print(encabezado)
+    print("-" * len(encabezado))
+    hay_activas = False
+    for idh, datos in habitaciones.items():
+        if datos["activo"]:
+            print(f"{idh:<12} | {str(datos['numero']):<8} | {datos['tipo']:<10} | {str(datos['piso']):<4} | {datos['estado']:<12} | ${datos['precioNoche']:<9.2f} | {datos['serviciosIncluidos']:<20}")
+            hay_activas = True
+    if not hay_activas:
+        print("❌ No hay habitaciones activas.")
+    print("-" * len(encabezado))
+
+def buscar_habitaciones(habitaciones_archivo="habitaciones.json"):
+    print("\n--- Buscar habitación por tipo o estado ---")
+    try:
+        habitaciones = cargar_archivo(habitaciones_archivo)
+    except FileNotFoundError:
+        print("❌ El archivo de habitaciones no existe. No hay datos para buscar.")
+        return
+    except OSError as detalle:
+        print("❌ Error al intentar abrir archivo(s):", detalle, "¿Existe el archivo y tiene formato JSON válido?")
+        return
+    termino = input("Ingrese tipo o estado a buscar: ").strip().lower()
+    encontrados = [ (idh, d) for idh, d in habitaciones.items() if d["activo"] and (termino in d["tipo"].lower() or termino in d["estado"].lower()) ]
+    if encontrados:
+        encabezado = f"{'ID':<12} | {'Nro':<8} | {'Tipo':<10} | {'Piso':<4} | {'Estado':<12} | {'Precio':<10} | {'Servicios':<20}"
+        print("-" * len(encabezado))
+        print(encabezado)
+        print("-" * len(encabezado))
+        for idh, datos in encontrados:
+            print(f"{idh:<12} | {str(datos['numero']):<8} | {datos['tipo']:<10} | {str(datos['piso']):<4} | {datos['estado']:<12} | ${datos['precioNoche']:<9.2f} | {datos['serviciosIncluidos']:<20}")
+        print("-" * len(encabezado))
+    else:
+        print("❌ No se encontraron habitaciones con ese tipo o estado.")
+
+#----------------------------------------------------------------------------------------------
+# CONSULTAS DE RESERVAS
+#----------------------------------------------------------------------------------------------
+# Con el motor JSON las reservas de un huésped o habitación salen de los índices por ID; con
+# SQLite se resuelven con una consulta sobre las columnas indexadas y el diccionario recibido
+# no se usa (puede ser None).
+def reservas_activas_de(reservas, campo, valor, limite=None):
+    """
+    Devuelve {id: reserva} con las reservas no finalizadas de un huésped o habitación ("idhuesped"/"idhabitacion"),
+    como mucho 'limite' (en memoria, las más próximas primero). Con reservas None y el motor JSON, el archivo se
+    recorre sin cargarlo si no está en memoria.
+    """
+    if usa_sqlite(ARCHIVO_RESERVAS):
+        consulta = f"{campo} = ? AND finalizada = 0" + ("" if limite is None else f" LIMIT {int(limite)}")
+        return sqlite_consultar_reservas(consulta, (valor,))
+    if reservas is None:
+        reservas = datos_en_almacen(ARCHIVO_RESERVAS)
+        if reservas is None:
+            return buscar_reservas_activas_en_disco(campo, valor, limite)
+    return reservas_activas_indexadas(reservas, campo, valor, limite)
+
+def reservas_del_anio(reservas, anio):
+    """Devuelve los pares (id, reserva) con noches en el año indicado (AAAA); con JSON sin particiones, todas."""
+    if usa_sqlite(ARCHIVO_RESERVAS):
+        inicio = datetime.date(anio, 1, 1).toordinal()
+        fin = datetime.date(anio + 1, 1, 1).toordinal()
+        return sqlite_consultar_reservas("entrada >= ? AND entrada < ? AND salida > ?", (inicio - MAX_NOCHES_RESERVA, fin, inicio)).items()
+    if reservas_particionadas():
+        return cargar_particion_reservas(str(anio)).items()
+    return iterar_pares_reservas(reservas)
+
+def reservas_del_mes_operacion(reservas, mes):
+    """Devuelve los pares (id, reserva) operados en el mes indicado (MM); con JSON, todas las reservas."""
+    if usa_sqlite(ARCHIVO_RESERVAS):
+        return sqlite_consultar_reservas("substr(fechaHoraOperacion, 6, 2) = ?", (mes,)).items()
+    return iterar_pares_reservas(reservas)
+
+def reservas_del_rango(reservas, inicio, fin):
+    """Devuelve los pares (id, reserva) que pueden tener noches entre los números de día inicio y fin."""
+    if usa_sqlite(ARCHIVO_RESERVAS):
+        return sqlite_consultar_reservas("entrada >= ? AND entrada < ? AND salida > ?", (inicio - MAX_NOCHES_RESERVA, fin, inicio)).items()
+    if reservas_particionadas():
+        return reservas_de_la_estadia(inicio, fin).items()
+    return iterar_pares_reservas(reservas)
+
+def contar_reservas_por_huesped(reservas, ids_huespedes):
+    """Devuelve {idhuesped: cantidad de reservas} para los huéspedes indicados."""
+    conteo = {idh: 0 for idh in ids_huespedes}
+    if usa_sqlite(ARCHIVO_RESERVAS):
+        filas = obtener_conexion_sqlite().execute("SELECT idhuesped, COUNT(*) FROM reservas GROUP BY idhuesped")
+        for idh, cantidad in filas:
+            if idh in conteo:
+                conteo[idh] = cantidad
+        return conteo
+    if isinstance(reservas, dict):
+        for idh in conteo:
+            conteo[idh] = cantidad_de_reservas_indexadas(reservas, "idhuesped", idh)
+        return conteo
+    for _, datos in iterar_pares_reservas(reservas):
+        h = datos["idhuesped"]
+        if h in conteo:
+            conteo[h] += 1
+    return conteo
+
+#----------------------------------------------------------------------------------------------
+# ÍNDICE DE INTERVALOS POR HABITACIÓN
+#----------------------------------------------------------------------------------------------
+# Para saber si una habitación está libre no hace falta recorrer todas las reservas del hotel:
+# por cada habitación se guardan sus estadías como números de día (entrada, salida) ordenados
+# por entrada, junto con la salida máxima acumulada. Las estadías que empiezan antes de la
+# salida pedida son un prefijo de la lista (bisect) y alguna se solapa si la mayor de sus salidas
+# es posterior a la entrada pedida: la consulta es O(log k) en las k reservas de la habitación.
+# Cada habitación lleva además su calendario de ocupación: un entero usado como mapa de bits con
+# un bit por noche de 2025 a 2027 (encendido = ocupada). Saber si está libre en un rango es un
+# AND con la máscara del rango, que Python resuelve por palabras de máquina.
+# El índice se arma la primera vez que se consulta un diccionario de reservas y se mantiene al
+# agregar reservas. Igual que cargar_archivo, se valida con la firma: vale para ese diccionario
+# mientras el almacén lo tenga registrado con la misma firma que cuando se armó. Un guardado cambia
+# la firma, así que quien agregó reservas con indexar_reserva antes de guardarlas traslada el
+# índice a la firma nueva (sellar_indices_reservas); cualquier otro cambio lo vuelve a armar.
+# Con VERIFICAR_INDICE_INTERVALOS cada respuesta se compara con el recorrido
+# completo de las reservas (el método anterior) y las diferencias se informan.
+INDICE_INTERVALOS = {"datos": None, "firma": None, "ids": set(), "habitaciones": {}}
+PRIMER_DIA_CALENDARIO = datetime.date(2000 + ANIO_MIN, 1, 1).toordinal()
+DIAS_CALENDARIO = datetime.date(2000 + ANIO_MAX + 1, 1, 1).toordinal() - PRIMER_DIA_CALENDARIO
+ESTADISTICAS_INTERVALOS = {"construcciones": 0, "consultas": 0, "verificaciones": 0, "discrepancias": 0}
+
+def descartar_indice_intervalos():
+    """Descarta el índice de intervalos para que la próxima consulta lo vuelva a armar."""
+    INDICE_INTERVALOS["datos"] = None
+    INDICE_INTERVALOS["ids"] = set()
+    INDICE_INTERVALOS["habitaciones"] = {}
+
+def firma_indices_reservas(reservas):
+    """Devuelve la firma con que el almacén tiene registrado un diccionario de reservas (None si no es el del almacén)."""
+    entrada = ALMACEN.get(ARCHIVO_RESERVAS)
+    if entrada is None or entrada["datos"] is not reservas:
+        return None
+    return entrada["firma"]
+
+def indice_al_dia(indice, reservas):
+    """Indica si un índice de reservas se armó sobre ese diccionario con la firma que tiene ahora en el almacén."""
+    return indice["datos"] is reservas and indice["firma"] == firma_indices_reservas(reservas)
+
+def sellar_indices_reservas(reservas, firma_previa):
+    """
+    Después de guardar reservas ya agregadas con indexar_reserva, los índices que estaban al día con
+    'firma_previa' (la firma antes de guardar) pasan a valer para la firma nueva del almacén.
+    """
+    firma = firma_indices_reservas(reservas)
+    for indice in (INDICE_INTERVALOS, INDICE_POR_ID, INDICE_SALIDAS):
+        if indice["datos"] is reservas and indice["firma"] == firma_previa:
+            indice["firma"] = firma
+
+def intervalo_de_reserva(datos):
+    """Devuelve (entrada, salida) de una reserva como números de día, o None si sus fechas no son válidas."""
+    entrada = fecha_a_ordinal(datos["fechaEntrada"])
+    salida = fecha_a_ordinal(datos["fechaSalida"])
+    if entrada is None or salida is None:
+        return None
+    return entrada, salida
+
+def mascara_de_noches(entrada, salida):
+    """Devuelve el mapa de bits de las noches entre entrada y salida (números de día) que caen en el calendario."""
+    desde = max(entrada, PRIMER_DIA_CALENDARIO) - PRIMER_DIA_CALENDARIO
+    hasta = min(salida, PRIMER_DIA_CALENDARIO + DIAS_CALENDARIO) - PRIMER_DIA_CALENDARIO
+    if hasta <= desde:
+        return 0
+    return ((1 << (hasta - desde)) - 1) << desde
+
+def recalcular_maximos(habitacion, desde):
+    """Recalcula la salida máxima acumulada de una habitación a partir de una posición."""
+    fines = habitacion["fines"]
+    maximos = habitacion["maximos"]
+    for pos in range(desde, len(fines)):
+        maximos[pos] = fines[pos] if pos == 0 else max(maximos[pos - 1], fines[pos])
+
+def indice_intervalos(reservas):
+    """Devuelve el índice {habitación: estadías ordenadas} de un diccionario de reservas, armándolo si hace falta."""
+    if indice_al_dia(INDICE_INTERVALOS, reservas):
+        return INDICE_INTERVALOS["habitaciones"]
+    intervalos = {}
+    for datos in reservas.values():
+        intervalo = intervalo_de_reserva(datos)
+        if intervalo is not None:
+            intervalos.setdefault(datos["idhabitacion"], []).append(intervalo)
+    habitaciones = {}
+    for id_hab, estadias in intervalos.items():
+        estadias.sort()
+        habitacion = {"inicios": [estadia[0] for estadia in estadias], "fines": [estadia[1] for estadia in estadias],
+                      "maximos": [0] * len(estadias), "ocupacion": 0}
+        recalcular_maximos(habitacion, 0)
+        for entrada, salida in estadias:
+            habitacion["ocupacion"] |= mascara_de_noches(entrada, salida)
+        habitaciones[id_hab] = habitacion
+    INDICE_INTERVALOS["datos"] = reservas
+    INDICE_INTERVALOS["firma"] = firma_indices_reservas(reservas)
+    INDICE_INTERVALOS["ids"] = set(reservas)
+    INDICE_INTERVALOS["habitaciones"] = habitaciones
+    ESTADISTICAS_INTERVALOS["construcciones"] += 1
+    return habitaciones
+
+def indexar_reserva(reservas, rid):
+    """Agrega a los índices de reservas una reserva recién insertada en el diccionario de reservas."""
+    indexar_reserva_por_id(reservas, rid)
+    indexar_salida_de_reserva(reservas, rid)
+    if INDICE_INTERVALOS["datos"] is not reservas:
+        return
+    if rid in INDICE_INTERVALOS["ids"]:
+        # Cambiaron las fechas de una reserva ya indexada: se vuelve a armar en la próxima consulta
+        descartar_indice_intervalos()
+        return
+    INDICE_INTERVALOS["ids"].add(rid)
+    intervalo = intervalo_de_reserva(reservas[rid])
+    if intervalo is None:
+        return
+    habitacion = INDICE_INTERVALOS["habitaciones"].setdefault(
+        reservas[rid]["idhabitacion"], {"inicios": [], "fines": [], "maximos": [], "ocupacion": 0})
+    pos = bisect.bisect_right(habitacion["inicios"], intervalo[0])
+    habitacion["inicios"].insert(pos, intervalo[0])
+    habitacion["fines"].insert(pos, intervalo[1])
+    habitacion["maximos"].insert(pos, 0)
+    recalcular_maximos(habitacion, pos)
+    habitacion["ocupacion"] |= mascara_de_noches(intervalo[0], intervalo[1])
+
+def trasladar_indice_intervalos(origen, destino):
+    """Después de copiar 'origen' en 'destino', el índice armado para 'origen' pasa a ser el de 'destino'."""
+    trasladar_indice_por_id(origen, destino)
+    trasladar_indice_salidas(origen, destino)
+    if INDICE_INTERVALOS["datos"] is origen:
+        INDICE_INTERVALOS["datos"] = destino
+    elif INDICE_INTERVALOS["datos"] is destino:
+        descartar_indice_intervalos()
+
+def habitacion_ocupada_en(reservas, id_hab, inicio, fin):
+    """Indica con el índice de intervalos si una habitación tiene alguna estadía que se solape con [inicio, fin)."""
+    ESTADISTICAS_INTERVALOS["consultas"] += 1
+    habitacion = indice_intervalos(reservas).get(id_hab)
+    if habitacion is None:
+        return False
+    anteriores = bisect.bisect_left(habitacion["inicios"], fin)
+    return anteriores > 0 and habitacion["maximos"][anteriores - 1] > inicio
+
+def reservas_de_la_estadia(entrada, salida):
+    """Con reservas particionadas, devuelve {id: reserva} de las particiones de los años de una estadía."""
+    ultima_noche = max(entrada, salida - 1)
+    return reservas_de_los_anios(datetime.date.fromordinal(entrada).year, datetime.date.fromordinal(ultima_noche).year)
+
+def habitacion_reservable(datos, tipo=None):
+    """Indica si una habitación se puede reservar: activa, fuera de mantenimiento y del tipo pedido (si se pide)."""
+    return datos["activo"] and datos["estado"] != "Mantenimiento" and (tipo is None or datos["tipo"] == tipo)
+
+def habitaciones_libres(reservas, habitaciones, entrada, salida, tipo=None):
+    """
+    Devuelve los IDs de las habitaciones activas y fuera de mantenimiento (solo del tipo indicado, si se
+    indica) que no tienen ninguna noche ocupada entre entrada y salida (números de día). Con el motor JSON se compara el
+    calendario de cada habitación con la máscara del rango; con SQLite las habitaciones ocupadas
+    salen de una consulta indexada. Con reservas particionadas por año se pasa None.
+    """
+    if usa_sqlite(ARCHIVO_RESERVAS):
+        filas = obtener_conexion_sqlite().execute(
+            "SELECT DISTINCT idhabitacion FROM reservas WHERE entrada >= ? AND entrada < ? AND salida > ?",
+            (entrada - MAX_NOCHES_RESERVA, salida, entrada))
+        ocupadas = {fila[0] for fila in filas}
+        return [id_hab for id_hab, datos in habitaciones.items()
+                if habitacion_reservable(datos, tipo) and id_hab not in ocupadas]
+    if reservas is None:
+        reservas = reservas_de_la_estadia(entrada, salida)
+    indice = indice_intervalos(reservas)
+    mascara = mascara_de_noches(entrada, salida)
+    libres = []
+    for id_hab, datos in habitaciones.items():
+        if habitacion_reservable(datos, tipo):
+            habitacion = indice.get(id_hab)
+            if habitacion is None or not habitacion["ocupacion"] & mascara:
+                libres.append(id_hab)
+    return libres
+
+#----------------------------------------------------------------------------------------------
+# ÍNDICES DE RESERVAS POR HUÉSPED Y POR HABITACIÓN
+#----------------------------------------------------------------------------------------------
+# Las bajas de huéspedes y habitaciones y el informe de reservas por huésped necesitan las
+# reservas de un ID puntual; en lugar de recorrer todas las reservas del hotel se mantiene un
+# índice invertido por cada campo: {ID: {"reservas": [ids de reserva], "activas": [(entrada, id)]}}.
+# "activas" está ordenada por entrada, así que su primer elemento es la estadía en curso o la
+# próxima (el puntero a la siguiente estadía) y preguntar si hay alguna activa es O(1).
+# Finalizar una reserva no obliga a tocar el índice: al consultar se revisa cada candidata en el
+# diccionario y las que ya terminaron o desaparecieron se quitan de la lista en la misma pasada.
+# Se arma, se valida con la firma del almacén y se invalida junto con el índice de intervalos.
+INDICE_POR_ID = {"datos": None, "firma": None, "ids": set(), "idhuesped": {}, "idhabitacion": {}}
+CAMPOS_INDICE_POR_ID = ("idhuesped", "idhabitacion")
+ESTADISTICAS_INDICE_POR_ID = {"construcciones": 0, "consultas": 0, "depuradas": 0}
+
+def descartar_indice_por_id():
+    """Descarta los índices por huésped y por habitación para que la próxima consulta los vuelva a armar."""
+    INDICE_POR_ID["datos"] = None
+    INDICE_POR_ID["ids"] = set()
+    for campo in CAMPOS_INDICE_POR_ID:
+        INDICE_POR_ID[campo] = {}
+
+def anotar_en_indice_por_id(rid, datos):
+    """Agrega una reserva a las listas de su huésped y de su habitación (y a las activas si no está finalizada)."""
+    entrada = fecha_a_ordinal(datos["fechaEntrada"]) or 0
+    for campo in CAMPOS_INDICE_POR_ID:
+        lista = INDICE_POR_ID[campo].setdefault(datos[campo], {"reservas": [], "activas": []})
+        lista["reservas"].append(rid)
+        if not datos.get("finalizada", False):
+            bisect.insort(lista["activas"], (entrada, rid))
+
+def indice_por_id(reservas, campo):
+    """Devuelve el índice {ID: reservas} del campo indicado para un diccionario de reservas, armándolo si hace falta."""
+    if not indice_al_dia(INDICE_POR_ID, reservas):
+        descartar_indice_por_id()
+        for rid, datos in reservas.items():
+            anotar_en_indice_por_id(rid, datos)
+        INDICE_POR_ID["datos"] = reservas
+        INDICE_POR_ID["firma"] = firma_indices_reservas(reservas)
+        INDICE_POR_ID["ids"] = set(reservas)
+        ESTADISTICAS_INDICE_POR_ID["construcciones"] += 1
+    return INDICE_POR_ID[campo]
+
+def indexar_reserva_por_id(reservas, rid):
+    """Agrega a los índices por huésped y por habitación una reserva recién insertada en el diccionario."""
+    if INDICE_POR_ID["datos"] is not reservas:
+        return
+    if rid in INDICE_POR_ID["ids"]:
+        # Una reserva ya indexada cambió: se vuelve a armar en la próxima consulta
+        descartar_indice_por_id()
+        return
+    INDICE_POR_ID["ids"].add(rid)
+    anotar_en_indice_por_id(rid, reservas[rid])
+
+def trasladar_indice_por_id(origen, destino):
+    """Después de copiar 'origen' en 'destino', los índices armados para 'origen' pasan a ser los de 'destino'."""
+    if INDICE_POR_ID["datos"] is origen:
+        INDICE_POR_ID["datos"] = destino
+    elif INDICE_POR_ID["datos"] is destino:
+        descartar_indice_por_id()
+
+def reservas_activas_indexadas(reservas, campo, valor, limite=None):
+    """
+    Devuelve {id: reserva} con las reservas no finalizadas de un huésped o habitación en orden de
+    entrada, como mucho 'limite'. Las candidatas que ya no están activas se quitan del índice.
+    """
+    ESTADISTICAS_INDICE_POR_ID["consultas"] += 1
+    lista = indice_por_id(reservas, campo).get(valor)
+    if lista is None:
+        return {}
+    encontradas = {}
+    vigentes = []
+    activas = lista["activas"]
+    for pos, (entrada, rid) in enumerate(activas):
+        datos = reservas.get(rid)
+        if datos is None or not es_reserva_activa_de(datos, campo, valor):
+            ESTADISTICAS_INDICE_POR_ID["depuradas"] += 1
+            continue
+        vigentes.append((entrada, rid))
+        encontradas[rid] = datos
+        if limite is not None and len(encontradas) >= limite:
+            vigentes.extend(activas[pos + 1:])
+            break
+    lista["activas"] = vigentes
+    return encontradas
+
+def cantidad_de_reservas_indexadas(reservas, campo, valor):
+    """Devuelve cuántas reservas (finalizadas o no) tiene un huésped o habitación según el índice."""
+    lista = indice_por_id(reservas, campo).get(valor)
+    return 0 if lista is None else len(lista["reservas"])
+
+#----------------------------------------------------------------------------------------------
+# CONCILIACIÓN DIARIA DE RESERVAS Y HABITACIONES
+#----------------------------------------------------------------------------------------------
+# El estado "Ocupada"/"Disponible" de una habitación describe el día de hoy y una reserva queda
+# finalizada cuando llega su fecha de salida. La conciliación pone ambos al día: las reservas no
+# finalizadas se guardan en un índice ordenado por salida (número de día), así que las que ya
+# terminaron son un prefijo de la lista (bisect) y se sacan del índice al finalizarlas; el estado
+# de cada habitación sale del índice de intervalos (¿alguna estadía cubre la noche de hoy?).
+# Las habitaciones en "Mantenimiento" no se tocan. Solo se guardan los registros que cambiaron
+# (con el motor JSON, como líneas del diario). Se ejecuta al iniciar, cada
+# MINUTOS_ENTRE_CONCILIACIONES desde el menú principal y a pedido desde Mantenimiento.
+INDICE_SALIDAS = {"datos": None, "firma": None, "ids": set(), "salidas": []}
+ESTADO_CONCILIACION = {"ultima": None, "ejecuciones": 0, "finalizadas": 0, "habitaciones": 0}
+
+def descartar_indice_salidas():
+    """Descarta el índice de salidas para que la próxima conciliación lo vuelva a armar."""
+    INDICE_SALIDAS["datos"] = None
+    INDICE_SALIDAS["ids"] = set()
+    INDICE_SALIDAS["salidas"] = []
+
+def salida_pendiente(datos):
+    """Devuelve la salida (número de día) de una reserva no finalizada, o None si está finalizada o no tiene fecha válida."""
+    if datos.get("finalizada", False):
+        return None
+    return fecha_a_ordinal(datos["fechaSalida"])
+
+def indice_salidas(reservas):
+    """Devuelve la lista ordenada [(salida, id)] de las reservas no finalizadas, armándola si hace falta."""
+    if indice_al_dia(INDICE_SALIDAS, reservas):
+        return INDICE_SALIDAS["salidas"]
+    salidas = []
+    for rid, datos in reservas.items():
+        salida = salida_pendiente(datos)
+        if salida is not None:
+            salidas.append((salida, rid))
+    salidas.sort()
+    INDICE_SALIDAS["datos"] = reservas
+    INDICE_SALIDAS["firma"] = firma_indices_reservas(reservas)
+    INDICE_SALIDAS["ids"] = set(reservas)
+    INDICE_SALIDAS["salidas"] = salidas
+    return salidas
+
+def indexar_salida_de_reserva(reservas, rid):
+    """Agrega al índice de salidas una reserva recién insertada en el diccionario de reservas."""
+    if INDICE_SALIDAS["datos"] is not reservas:
+        return
+    if rid in INDICE_SALIDAS["ids"]:
+        descartar_indice_salidas()
+        return
+    INDICE_SALIDAS["ids"].add(rid)
+    salida = salida_pendiente(reservas[rid])
+    if salida is not None:
+        bisect.insort(INDICE_SALIDAS["salidas"], (salida, rid))
+
+def trasladar_indice_salidas(origen, destino):
+    """Después de copiar 'origen' en 'destino', el índice de salidas de 'origen' pasa a ser el de 'destino'."""
+    if INDICE_SALIDAS["datos"] is origen:
+        INDICE_SALIDAS["datos"] = destino
+    elif INDICE_SALIDAS["datos"] is destino:
+        descartar_indice_salidas()
+
+def reserva_en_curso(datos, hoy=None):
+    """Indica si la estadía de una reserva incluye la noche de hoy (o del número de día indicado)."""
+    if hoy is None:
+        hoy = datetime.date.today().toordinal()
+    entrada = fecha_a_ordinal(datos["fechaEntrada"])
+    salida = fecha_a_ordinal(datos["fechaSalida"])
+    return entrada is not None and salida is not None and entrada <= hoy < salida
+
+def conciliar_datos(reservas, habitaciones, hoy):
+    """
+    Finaliza las reservas cuya salida es hoy o anterior y ajusta el estado de las habitaciones
+    activas según tengan o no una estadía esta noche. Devuelve (reservas finalizadas, habitaciones cambiadas).
+    """
+    salidas = indice_salidas(reservas)
+    # Las reservas con salida <= hoy son las primeras de la lista
+    vencidas = bisect.bisect_left(salidas, (hoy + 1,))
+    finalizadas = []
+    for _, rid in salidas[:vencidas]:
+        datos = reservas.get(rid)
+        if datos is not None and not datos.get("finalizada", False):
+            datos["finalizada"] = True
+            finalizadas.append(rid)
+    del salidas[:vencidas]
+    cambiadas = []
+    for id_hab, datos in habitaciones.items():
+        if datos["activo"] and datos["estado"] in ("Disponible", "Ocupada"):
+            estado = "Ocupada" if habitacion_ocupada_en(reservas, id_hab, hoy, hoy + 1) else "Disponible"
+            if datos["estado"] != estado:
+                datos["estado"] = estado
+                cambiadas.append(id_hab)
+    return finalizadas, cambiadas
+
+def conciliar_reservas(informar=True):
+    """
+    Ejecuta la conciliación sobre los archivos en uso con el bloqueo tomado y guarda solo lo que
+    cambió. Devuelve (reservas finalizadas, habitaciones cambiadas), o None si no se pudo hacer.
+    """
+    ESTADO_CONCILIACION["ultima"] = time.monotonic()
+    try:
+        tomar_bloqueo("conciliar reservas")
+    except (OSError, TimeoutError) as e:
+        print(f"❌ No se pudo conciliar: {e}")
+        return None
+    try:
+        inicio = time.perf_counter()
+        try:
+            reservas = cargar_archivo(ARCHIVO_RESERVAS)
+            habitaciones = cargar_archivo(ARCHIVO_HABITACIONES)
+        except FileNotFoundError:
+            if informar:
+                print("❌ Faltan los archivos de reservas o habitaciones. No hay datos para conciliar.")
+            return None
+        except (OSError, ValueError) as detalle:
+            print("❌ Error al intentar abrir archivo(s):", detalle, "¿Existe el archivo y tiene formato JSON válido?")
+            return None
+        firma_previa = firma_indices_reservas(reservas)
+        finalizadas, cambiadas = conciliar_datos(reservas, habitaciones, datetime.date.today().toordinal())
+        if usa_sqlite(ARCHIVO_RESERVAS):
+            if not sqlite_registrar_reservas(reservas, habitaciones, finalizadas, cambiadas):
+                return None
+            actualizar_almacen(ARCHIVO_RESERVAS, reservas)
+            actualizar_almacen(ARCHIVO_HABITACIONES, habitaciones)
+        elif finalizadas or cambiadas:
+            # Igual que al registrar una reserva: se agregan líneas al diario en lugar de reescribir los archivos
+            registros = [{"tipo": "reserva", "id": rid, "datos": reservas[rid]} for rid in finalizadas]
+            registros += [{"tipo": "estado_habitacion", "id": id_hab, "estado": habitaciones[id_hab]["estado"]} for id_hab in cambiadas]
+            try:
+                anotar_en_diario(registros)
+            except (OSError, TimeoutError) as e:
+                print(f"❌ Error al escribir el diario de reservas: {e}")
+                descartar_del_almacen(ARCHIVO_RESERVAS)
+                descartar_del_almacen(ARCHIVO_HABITACIONES)
+                return None
+            actualizar_almacen(ARCHIVO_RESERVAS, reservas)
+            actualizar_almacen(ARCHIVO_HABITACIONES, habitaciones)
+            if ESTADO_DIARIO["registros"] >= MAX_REGISTROS_DIARIO:
+                compactar_diario()
+        # La conciliación ya sacó del índice de salidas las reservas que finalizó
+        sellar_indices_reservas(reservas, firma_previa)
+        demora = time.perf_counter() - inicio
+    finally:
+        soltar_bloqueo()
+    ESTADO_CONCILIACION["ejecuciones"] += 1
+    ESTADO_CONCILIACION["finalizadas"] += len(finalizadas)
+    ESTADO_CONCILIACION["habitaciones"] += len(cambiadas)
+    if informar or finalizadas or cambiadas:
+        print(f"🔄 Conciliación: {len(finalizadas)} reservas finalizadas, {len(cambiadas)} habitaciones cambiaron de estado "
+              f"({demora * 1000:.1f} ms)")
+    return finalizadas, cambiadas
+
+def conciliar_si_corresponde():
+    """Vuelve a conciliar si pasaron MINUTOS_ENTRE_CONCILIACIONES desde la última vez."""
+    ultima = ESTADO_CONCILIACION["ultima"]
+    if ultima is None or time.monotonic() - ultima >= MINUTOS_ENTRE_CONCILIACIONES * 60:
+        conciliar_reservas(informar=False)
+
+#----------------------------------------------------------------------------------------------
+# TRANSACCIONES - RESERVAS
+#----------------------------------------------------------------------------------------------
+def solapa_reserva(reservas, id_hab, entrada, salida):
+    """
+    Revisa si una habitación ya está reservada en un rango de fechas (números de día, la salida
+    no se cuenta). Compara la nueva reserva con las existentes para evitar solapamientos.
+    Devuelve True si se solapa, False si está libre. Con reservas particionadas por año se
+    pasa None y se leen solo las particiones de los años de la nueva estadía. Se responde con el
+    índice de intervalos de la habitación, sin recorrer las demás reservas.
+    """
+    if usa_sqlite(ARCHIVO_RESERVAS):
+        fila = obtener_conexion_sqlite().execute(
+            "SELECT 1 FROM reservas WHERE idhabitacion = ? AND entrada < ? AND salida > ? LIMIT 1",
+            (id_hab, salida, entrada)).fetchone()
+        return fila is not None
+    if reservas is None:
+        # Reservas particionadas: solo se leen los años de las noches de la nueva estadía
+        reservas = reservas_de_la_estadia(entrada, salida)
+    ocupada = habitacion_ocupada_en(reservas, id_hab, entrada, salida)
+    if VERIFICAR_INDICE_INTERVALOS:
+        ESTADISTICAS_INTERVALOS["verificaciones"] += 1
+        exhaustiva = solapa_reserva_exhaustiva(reservas, id_hab, entrada, salida)
+        if exhaustiva != ocupada:
+            ESTADISTICAS_INTERVALOS["discrepancias"] += 1
+            print(f"⚠️  El índice de intervalos respondió distinto que el recorrido completo para {id_hab}; se usa el recorrido.")
+            descartar_indice_intervalos()
+            return exhaustiva
+    return ocupada
+
+def solapa_reserva_exhaustiva(reservas, id_hab, entrada, salida):
+    """
+    Verificación de solapamiento recorriendo todas las reservas y decodificando cada fecha, como
+    se hacía antes del índice de intervalos; se conserva para contrastar sus respuestas.
+    """
+    fecha_inicio_nueva = datetime.datetime.fromordinal(entrada)
+    fecha_fin_nueva = datetime.datetime.fromordinal(salida)
+    for datos in reservas.values():
+        if datos["idhabitacion"] == id_hab:
+            fe_existente_str = datos["fechaEntrada"]
+            fs_existente_str = datos["fechaSalida"]
+            if len(fe_existente_str) == 6 and len(fs_existente_str) == 6:
+                try:
+                    dia_e, mes_e, anio_e = int(fe_existente_str[:2]), int(fe_existente_str[2:4]), int(fe_existente_str[4:6])
+                    dia_s, mes_s, anio_s = int(fs_existente_str[:2]), int(fs_existente_str[2:4]), int(fs_existente_str[4:6])
+                    # Validar que las fechas existan realmente
+                    if es_fecha_valida(dia_e, mes_e, 2000 + anio_e) and es_fecha_valida(dia_s, mes_s, 2000 + anio_s):
+                        inicio_existente = datetime.datetime(2000 + anio_e, mes_e, dia_e)
+                        fin_existente = datetime.datetime(2000 + anio_s, mes_s, dia_s)
+                        if fecha_inicio_nueva < fin_existente and fecha_fin_nueva > inicio_existente:
+                            return True
+                except (ValueError, IndexError):
+                    # Saltar reservas con fechas mal formateadas
+                    pass
+    return False
+
+def revalidar_reserva(reservas, idhabitacion, entrada, salida, reservas_archivo, habitaciones_archivo):
+    """
+    Con el bloqueo tomado, vuelve a verificar una reserva antes de guardarla. La habitación se
+    vuelve a leer (solo ella) para confirmar que sigue activa. Si otra terminal guardó reservas
+    después de leerlas, se ponen al día (en el lugar) y se repite el control de solapamiento.
+    Con SQLite el solapamiento se consulta siempre contra la base, y con reservas particionadas
+    (None) contra las particiones de la estadía, que se vuelven a leer solo si cambiaron en disco.
+    Devuelve False si la reserva ya no es posible.
+    """
+    habitacion = obtener_registro(habitaciones_archivo, idhabitacion)
+    if habitacion is None or not habitacion["activo"]:
+        print("❌ Otra terminal dio de baja la habitación. La reserva no se registró.")
+        return False
+    desactualizado = esta_desactualizado(reservas_archivo, reservas)
+    if reservas is not None and not desactualizado and not usa_sqlite(reservas_archivo):
+        return True
+    if desactualizado:
+        rebasar_si_desactualizado(reservas_archivo, reservas, [])
+    if solapa_reserva(None if reservas_particionadas() else reservas, idhabitacion, entrada, salida):
+        print("❌ Otra terminal reservó la habitación en esas fechas. La reserva no se registró.")
+        ESTADISTICAS_BLOQUEO["reservas_rechazadas"] += 1
+        anotar_monitoreo_bloqueo("registrar reserva", "reserva rechazada por solapamiento", 0.0, 0)
+        return False
+    return True
+
+def registrar_reserva(reservas_archivo=ARCHIVO_RESERVAS, huespedes_archivo=ARCHIVO_HUESPEDES, habitaciones_archivo=ARCHIVO_HABITACIONES):
+    """Registra una nueva reserva, persistiendo en archivo JSON. Del huésped y la habitación se lee solo su registro."""
+    print("\n--- Registrar reserva ---")
+    # Con reservas particionadas la reserva va al diario y no se carga el conjunto completo:
+    # se consultan solo las particiones de los años de la estadía
+    particionadas = (reservas_particionadas() and reservas_archivo == ARCHIVO_RESERVAS
+                     and habitaciones_archivo == ARCHIVO_HABITACIONES and os.path.exists(reservas_archivo))
     try:
-        with open("habitaciones.json", 'r', encoding='utf-8') as f:
-            habitaciones = json.load(f)
-        with open("reservas.json", 'r', encoding='utf-8') as f:
-            reservas = json.load(f)
-    except (FileNotFoundError, OSError) as detalle:
-        print("❌ Error al intentar abrir archivo(s):", detalle)
+        reservas = None if particionadas else cargar_archivo(reservas_archivo)
+    except FileNotFoundError:
+        reservas = {}
+    except OSError as detalle:
+        print("❌ Error al intentar abrir archivo(s):", detalle, "¿Existe el archivo y tiene formato JSON válido?")
+        return
+    # Huéspedes y habitaciones no se cargan completos: se lee solo el registro de cada ID ingresado
+    if not usa_sqlite(huespedes_archivo) and not os.path.exists(huespedes_archivo):
+        print("❌ El archivo de huéspedes no existe. No hay datos para mostrar.")
+        return
+    if not usa_sqlite(habitaciones_archivo) and not os.path.exists(habitaciones_archivo):
+        print("❌ El archivo de habitaciones no existe. No hay datos para mostrar.")
         return
     
-    idh = input("ID habitación a eliminar: ").strip()
-    if idh not in habitaciones:
-        print("❌ No existe una habitación con ese ID.")
+    # ID huésped (si no existe, se sugieren los que empiezan con lo ingresado)
+    idh = None
+    sugerencias = []
+    while idh is None:
+        idh_input = elegir_sugerencia(input("ID huésped: ").strip(), sugerencias)
+        try:
+            huesped = obtener_registro(huespedes_archivo, idh_input)
+        except (OSError, ValueError) as detalle:
+            print("❌ Error al intentar abrir archivo(s):", detalle, "¿Existe el archivo y tiene formato JSON válido?")
+            return
+        if huesped is not None and huesped["activo"]:
+            idh = idh_input
+        else:
+            print("❌ ID de huésped inválido o inactivo.")
+            sugerencias = mostrar_sugerencias("huespedes", huespedes_archivo, idh_input)
+    
+    # ID habitación (también se puede empezar a escribir el número)
+    idhabitacion = None
+    sugerencias = []
+    while idhabitacion is None:
+        idhabitacion_input = elegir_sugerencia(input("ID habitación: ").strip(), sugerencias)
+        try:
+            habitacion = obtener_registro(habitaciones_archivo, idhabitacion_input)
+        except (OSError, ValueError) as detalle:
+            print("❌ Error al intentar abrir archivo(s):", detalle, "¿Existe el archivo y tiene formato JSON válido?")
+            return
+        if habitacion is not None and habitacion["activo"]:
+            # El estado describe solo el día de hoy: una habitación ocupada se puede reservar para otras fechas
+            if habitacion["estado"] != "Mantenimiento":
+                idhabitacion = idhabitacion_input
+            else:
+                print("❌ La habitación está en mantenimiento.")
+        else:
+            print("❌ ID de habitación inválido o inactivo.")
+            sugerencias = mostrar_sugerencias("habitaciones", habitaciones_archivo, idhabitacion_input)
+    
+    # Fecha entrada
+    fechaEntrada = None
+    while fechaEntrada is None:
+        fechaEntrada_input = input("Fecha entrada (DDMMAA): ").strip()
+        if validar_fecha(fechaEntrada_input):
+            fechaEntrada = fechaEntrada_input
+        else:
+            print("❌ Fecha inválida. Use formato DDMMAA (ej: 150125 para 15/01/25).")
+    
+    # Fecha salida
+    fechaSalida = None
+    while fechaSalida is None:
+        fechaSalida_input = input("Fecha salida (DDMMAA): ").strip()
+        if validar_fecha(fechaSalida_input):
+            if fecha_salida_posterior(fechaEntrada, fechaSalida_input):
+                fechaSalida = fechaSalida_input
+            else:
+                print("❌ La fecha de salida debe ser posterior a la de entrada.")
+        else:
+            print("❌ Fecha inválida. Use formato DDMMAA (ej: 160125 para 16/01/25).")
+    
+    # Calcular cantidad de noches automáticamente (las fechas ya validadas están en la tabla)
+    entrada = fecha_a_ordinal(fechaEntrada)
+    salida = fecha_a_ordinal(fechaSalida)
+    noches = salida - entrada
+    if noches <= 0:
+        print("❌ La fecha de salida debe ser posterior a la de entrada.")
         return
-    if not habitaciones[idh]["activo"]:
-        print("❌ La habitación ya está inactiva.")
+    if noches > MAX_NOCHES_RESERVA:
+        print(f"❌ No se permiten reservas de más de {MAX_NOCHES_RESERVA} noches.")
         return
+    print(f"🛏️  Cantidad de noches calculada: {noches}")
     
-    # Mostrar datos de la habitación antes de eliminar
-    print(f"\n📋 Datos de la habitación a eliminar:")
-    print(f"   ID: {idh}")
-    print(f"   Número: {habitaciones[idh]['numero']}")
-    print(f"   Tipo: {habitaciones[idh]['tipo']}")
-    print(f"   Descripción: {habitaciones[idh]['descripcion']}")
-    print(f"   Piso: {habitaciones[idh]['piso']}")
-    print(f"   Estado: {habitaciones[idh]['estado']}")
-    print(f"   Precio por noche: ${habitaciones[idh]['precioNoche']:.2f}")
-    print(f"   Servicios incluidos: {habitaciones[idh]['serviciosIncluidos']}")
+    if solapa_reserva(reservas, idhabitacion, entrada, salida):
+        print("❌ La habitación ya está reservada en esas fechas.")
+        return
     
-    # Verificar reservas activas o futuras
-    tiene_reservas = False
-    for rid, datos in reservas.items():
-        if datos["idhabitacion"] == idh:
-            if not datos.get("finalizada", False):
-                tiene_reservas = True
-                break
-    if tiene_reservas:
-        print("❌ No se puede dar de baja: la habitación tiene reservas activas o futuras.")
-        print("⚠️  Todas las habitaciones generadas por defecto tienen reservas activas.\n   Para probar la función de eliminar habitación, cree una nueva sin reservas desde el sistema principal.")
+    # Descuento
+    descuento = None
+    while descuento is None:
+        descuento_input = input("Descuento: ").strip()
+        if descuento_input.isdigit():
+            descuento_val = int(descuento_input)
+            if 0 <= descuento_val <= 99:
+                descuento = descuento_val
+            else:
+                print("❌ El descuento debe estar entre 0 y 99.")
+        else:
+            print("❌ Ingrese un valor numérico entero para el descuento.")
+    
+    # Calcular precio final
+    precio_noche = habitacion["precioNoche"]
+    precio_final = precio_noche * noches * (1 - descuento / 100)
+    
+    # Generar fecha y hora de operación
+    fecha_hora_operacion = datetime.datetime.now().strftime("%Y.%m.%d - %H:%M:%S")
+    
+    # Desde acá hasta persistir se mantiene el bloqueo: si otra terminal guardó mientras se
+    # ingresaban los datos, se vuelve a verificar la reserva sobre los datos actuales
+    try:
+        tomar_bloqueo("registrar reserva")
+    except (OSError, TimeoutError) as e:
+        print(f"❌ No se pudo registrar la reserva: {e}")
         return
-    confirm = input("¿Confirma la baja lógica de la habitación? (s/n): ").strip().lower()
-    if confirm == "s":
-        habitaciones[idh]["activo"] = False
-        print("❌ Habitación dada de baja lógicamente.")
-    else:
-        print("❌ Operación cancelada.")
-    guardar_habitaciones(habitaciones)
+    try:
+        if not revalidar_reserva(reservas, idhabitacion, entrada, salida, reservas_archivo, habitaciones_archivo):
+            return
+        # El ID se asigna recién ahora, con el bloqueo tomado y las reservas al día
+        rid = generar_id_reserva(reservas)
+        if rid is None:
+            return
+        if particionadas:
+            # Si la estadía es de un solo año, la reserva se agrega a su partición en memoria
+            reservas = reservas_de_la_estadia(entrada, salida)
+        reservas[rid] = {
+            "idhuesped": idh,
+            "idhabitacion": idhabitacion,
+            "fechaEntrada": fechaEntrada,
+            "fechaSalida": fechaSalida,
+            "cantidadNoches": noches,
+            "descuento": descuento,
+            "precioNoche": precio_noche,
+            "precioFinal": precio_final,
+            "fechaHoraOperacion": fecha_hora_operacion
+        }
+        indexar_reserva(reservas, rid)
+        
+        # Actualizar estado de habitación (el registro recién releído bajo el bloqueo): queda ocupada
+        # si la estadía incluye la noche de hoy (entrada <= hoy < salida, también si empezó antes);
+        # las futuras las marca la conciliación cuando llega su fecha
+        habitacion = obtener_registro(habitaciones_archivo, idhabitacion)
+        if reserva_en_curso(reservas[rid]):
+            habitacion["estado"] = "Ocupada"
+        firma_indices_previa = firma_indices_reservas(reservas)
+        if usa_sqlite(reservas_archivo):
+            if not sqlite_registrar_reserva(reservas, {idhabitacion: habitacion}, rid, idhabitacion):
+                return
+        elif reservas_archivo == ARCHIVO_RESERVAS and habitaciones_archivo == ARCHIVO_HABITACIONES and os.path.exists(reservas_archivo):
+            # Se agregan dos líneas al diario en lugar de reescribir ambos archivos completos
+            if not registrar_reserva_en_diario(reservas, rid, idhabitacion, habitacion["estado"]):
+                return
+        else:
+            # Para reescribir el archivo de habitaciones completo sí hace falta cargarlo
+            habitaciones = cargar_archivo(habitaciones_archivo)
+            habitaciones[idhabitacion]["estado"] = habitacion["estado"]
+            guardar_reservas(reservas, reservas_archivo, [rid])
+            guardar_habitaciones(habitaciones, habitaciones_archivo, [idhabitacion])
+        sellar_indices_reservas(reservas, firma_indices_previa)
+    finally:
+        soltar_bloqueo()
+    print(f"✅ Reserva {rid} registrada correctamente. Precio final: ${precio_final:.2f}")
 
-def listar_habitaciones_activas(habitaciones_archivo="habitaciones.json"):
-    """Lista todas las habitaciones activas leyendo desde archivo JSON, con formato tabular alineado."""
-    print("\n--- Lista de habitaciones activas ---")
+def listar_reservas(reservas, huespedes, habitaciones):
+    """Muestra una lista con todas las reservas que se hicieron, con formato tabular alineado y una sola línea por reserva."""
+    print("\n--- Lista de reservas ---")
+    if isinstance(reservas, dict) and not reservas:
+        print("❌ No hay reservas registradas.")
+        return
+    encabezado = f"{'ID':<12} | {'Fecha/Hora':<24} | {'Huésped':<18} | {'Habitación':<10} | {'Entrada':<8} | {'Salida':<8} | {'Noches':<6} | {'Desc.':<5} | {'Precio':<12}"
+    print("-" * len(encabezado))
+    print(encabezado)
+    print("-" * len(encabezado))
+    hay = False
+    for rid, datos in iterar_pares_reservas(reservas):
+        hay = True
+        h = huespedes.get(datos["idhuesped"], {"nombre": "-", "apellido": "-"})
+        hab = habitaciones.get(datos["idhabitacion"], {"numero": "-", "precioNoche": 0})
+        
+        # Calcular precio final si no existe o es 0
+        precio_final = datos.get("precioFinal", 0)
+        if precio_final == 0 and "precioNoche" in hab:
+            precio_final = hab["precioNoche"] * datos["cantidadNoches"] * (1 - datos["descuento"]/100)
+        
+        print(f"{rid:<12} | {datos['fechaHoraOperacion']:<24} | {(h['nombre'] + ' ' + h['apellido']):<18} | {str(hab['numero']):<10} | {datos['fechaEntrada']:<8} | {datos['fechaSalida']:<8} | {str(datos['cantidadNoches']):<6} | {str(datos['descuento']):<5} | ${precio_final:<11.2f}")
+    if not hay:
+        print("❌ No hay reservas registradas.")
+    print("-" * len(encabezado))
+
+def buscar_disponibilidad(reservas_archivo=ARCHIVO_RESERVAS, habitaciones_archivo=ARCHIVO_HABITACIONES):
+    """Muestra las habitaciones activas libres en un rango de fechas, opcionalmente de un solo tipo."""
+    print("\n--- Buscar habitaciones disponibles ---")
     try:
-        with open(habitaciones_archivo, mode='r', encoding='utf-8') as f:
-            habitaciones = json.load(f)
+        # Con SQLite o reservas particionadas no hace falta cargar todas las reservas
+        reservas = None if usa_sqlite(reservas_archivo) or reservas_particionadas() else cargar_archivo(reservas_archivo)
+        habitaciones = cargar_archivo(habitaciones_archivo)
     except FileNotFoundError:
-        print("❌ El archivo de habitaciones no existe. No hay datos para mostrar.")
+        print("❌ El archivo de habitaciones o de reservas no existe. No hay datos para buscar.")
         return
-    except OSError as detalle:
+    except (OSError, ValueError) as detalle:
         print("❌ Error al intentar abrir archivo(s):", detalle, "¿Existe el archivo y tiene formato JSON válido?")
         return
+    
+    fechaEntrada = None
+    while fechaEntrada is None:
+        fechaEntrada_input = input("Fecha entrada (DDMMAA): ").strip()
+        if validar_fecha(fechaEntrada_input):
+            fechaEntrada = fechaEntrada_input
+        else:
+            print("❌ Fecha inválida. Use formato DDMMAA (ej: 150125 para 15/01/25).")
+    fechaSalida = None
+    while fechaSalida is None:
+        fechaSalida_input = input("Fecha salida (DDMMAA): ").strip()
+        if not validar_fecha(fechaSalida_input):
+            print("❌ Fecha inválida. Use formato DDMMAA (ej: 160125 para 16/01/25).")
+        elif not fecha_salida_posterior(fechaEntrada, fechaSalida_input):
+            print("❌ La fecha de salida debe ser posterior a la de entrada.")
+        else:
+            fechaSalida = fechaSalida_input
+    tipo = None
+    tipos_normalizados = [normalizar_texto(t) for t in TIPOS_HABITACION]
+    while tipo is None:
+        tipo_input = normalizar_texto(input(f"Tipo ({', '.join(TIPOS_HABITACION)}; Enter para todos): ").strip())
+        if not tipo_input:
+            break
+        if tipo_input in tipos_normalizados:
+            tipo = TIPOS_HABITACION[tipos_normalizados.index(tipo_input)]
+        else:
+            print(f"❌ Tipo inválido. Opciones válidas: {', '.join(TIPOS_HABITACION)}.")
+    
+    inicio = time.perf_counter()
+    libres = habitaciones_libres(reservas, habitaciones, fecha_a_ordinal(fechaEntrada), fecha_a_ordinal(fechaSalida), tipo)
+    demora = (time.perf_counter() - inicio) * 1000
+    if not libres:
+        print("❌ No hay habitaciones disponibles en esas fechas.")
+        return
     encabezado = f"{'ID':<12} | {'Nro':<8} | {'Tipo':<10} | {'Piso':<4} | {'Estado':<12} | {'Precio':<10} | {'Servicios':<20}"
     print("-" * len(encabezado))
     print(encabezado)
     print("-" * len(encabezado))
-    hay_activas = False
-    for idh, datos in habitaciones.items():
-        if datos["activo"]:
-            print(f"{idh:<12} | {str(datos['numero']):<8} | {datos['tipo']:<10} | {str(datos['piso']):<4} | {datos['estado']:<12} | ${datos['precioNoche']:<9.2f} | {datos['serviciosIncluidos']:<20}")
-            hay_activas = True
-    if not hay_activas:
-        print("❌ No hay habitaciones activas.")
+    for idh in libres:
+        datos = habitaciones[idh]
+        print(f"{idh:<12} | {str(datos['numero']):<8} | {datos['tipo']:<10} | {str(datos['piso']):<4} | {datos['estado']:<12} | ${datos['precioNoche']:<9.2f} | {datos['serviciosIncluidos']:<20}")
     print("-" * len(encabezado))
+    print(f"✅ {len(libres)} habitaciones libres del {fechaEntrada} al {fechaSalida} (búsqueda: {demora:.2f} ms)")
 
-def buscar_habitaciones(habitaciones_archivo="habitaciones.json"):
-    print("\n--- Buscar habitación por tipo o estado ---")
+#----------------------------------------------------------------------------------------------
+# IMPORTACIÓN MASIVA DE RESERVAS
+#----------------------------------------------------------------------------------------------
+# Las reservas de grupos o de otros canales llegan en archivos CSV (con encabezado) o JSON Lines
+# con los campos idhuesped, idhabitacion, fechaEntrada, fechaSalida y descuento. Cada fila se
+# valida con las mismas reglas que registrar_reserva; los solapamientos se consultan en el índice
+# de intervalos en memoria, que incluye las filas ya aceptadas del mismo archivo. Todo se hace con
+# el bloqueo tomado y los archivos se escriben una sola vez al final.
+CAMPOS_IMPORTACION = ["idhuesped", "idhabitacion", "fechaEntrada", "fechaSalida", "descuento"]
+
+def leer_filas_importacion(ruta):
+    """Devuelve [(número de línea, fila)] de un archivo CSV o JSON Lines; una línea JSON inválida queda con fila None."""
+    filas = []
+    with open(ruta, mode='r', encoding='utf-8', newline='') as f:
+        if ruta.lower().endswith(".csv"):
+            lector = csv.DictReader(f)
+            for fila in lector:
+                filas.append((lector.line_num, fila))
+            return filas
+        for numero, linea in enumerate(f, start=1):
+            linea = linea.strip()
+            if not linea:
+                continue
+            try:
+                fila = json.loads(linea)
+            except json.JSONDecodeError:
+                fila = None
+            filas.append((numero, fila if isinstance(fila, dict) else None))
+    return filas
+
+def validar_fila_importacion(fila, reservas, huespedes, habitaciones):
+    """
+    Valida una fila a importar. Devuelve (datos de la reserva, None) si se acepta o (None, motivo)
+    si se rechaza. Los solapamientos se consultan en el índice de intervalos de 'reservas'.
+    """
+    if fila is None:
+        return None, "línea con formato JSON inválido"
+    valores = {campo: str(fila.get(campo) if fila.get(campo) is not None else "").strip() for campo in CAMPOS_IMPORTACION}
+    faltantes = [campo for campo in CAMPOS_IMPORTACION[:4] if not valores[campo]]
+    if faltantes:
+        return None, f"faltan campos: {', '.join(faltantes)}"
+    idh, idhabitacion = valores["idhuesped"], valores["idhabitacion"]
+    if idh not in huespedes or not huespedes[idh]["activo"]:
+        return None, f"huésped {idh} inexistente o inactivo"
+    if idhabitacion not in habitaciones or not habitaciones[idhabitacion]["activo"]:
+        return None, f"habitación {idhabitacion} inexistente o inactiva"
+    # Igual que en el alta manual: el estado solo impide reservar una habitación en mantenimiento
+    if habitaciones[idhabitacion]["estado"] == "Mantenimiento":
+        return None, f"habitación {idhabitacion} en mantenimiento"
+    if not validar_fecha(valores["fechaEntrada"]):
+        return None, f"fecha de entrada inválida ({valores['fechaEntrada']})"
+    if not validar_fecha(valores["fechaSalida"]):
+        return None, f"fecha de salida inválida ({valores['fechaSalida']})"
+    if not fecha_salida_posterior(valores["fechaEntrada"], valores["fechaSalida"]):
+        return None, "la fecha de salida debe ser posterior a la de entrada"
+    entrada = fecha_a_ordinal(valores["fechaEntrada"])
+    salida = fecha_a_ordinal(valores["fechaSalida"])
+    noches = salida - entrada
+    if noches > MAX_NOCHES_RESERVA:
+        return None, f"más de {MAX_NOCHES_RESERVA} noches"
+    descuento = valores["descuento"] or "0"
+    if not descuento.isdigit() or not 0 <= int(descuento) <= 99:
+        return None, f"descuento inválido ({descuento}); debe ser un entero entre 0 y 99"
+    if habitacion_ocupada_en(reservas, idhabitacion, entrada, salida):
+        return None, f"la habitación {idhabitacion} ya está reservada en esas fechas"
+    precio_noche = habitaciones[idhabitacion]["precioNoche"]
+    return {
+        "idhuesped": idh,
+        "idhabitacion": idhabitacion,
+        "fechaEntrada": valores["fechaEntrada"],
+        "fechaSalida": valores["fechaSalida"],
+        "cantidadNoches": noches,
+        "descuento": int(descuento),
+        "precioNoche": precio_noche,
+        "precioFinal": precio_noche * noches * (1 - int(descuento) / 100)
+    }, None
+
+def importar_reservas(ruta, reservas_archivo=ARCHIVO_RESERVAS, huespedes_archivo=ARCHIVO_HUESPEDES, habitaciones_archivo=ARCHIVO_HABITACIONES):
+    """
+    Importa las reservas de un archivo CSV o JSON Lines. Devuelve las líneas del informe por fila
+    (aceptada con su ID o rechazada con el motivo), o None si no se pudo hacer la importación.
+    """
     try:
-        with open(habitaciones_archivo, mode='r', encoding='utf-8') as f:
-            habitaciones = json.load(f)
-    except FileNotFoundError:
-        print("❌ El archivo de habitaciones no existe. No hay datos para buscar.")
+        filas = leer_filas_importacion(ruta)
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        print(f"❌ No se pudo leer {ruta}: {e}")
+        return None
+    return registrar_reservas_en_lote(filas, reservas_archivo, huespedes_archivo, habitaciones_archivo)
+
+def registrar_reservas_en_lote(filas, reservas_archivo=ARCHIVO_RESERVAS, huespedes_archivo=ARCHIVO_HUESPEDES, habitaciones_archivo=ARCHIVO_HABITACIONES):
+    """
+    Valida y registra las filas [(número de línea, fila)] con el bloqueo tomado y escribe los archivos
+    una sola vez. Devuelve las líneas del informe por fila, o None si no se pudo registrar el lote.
+    """
+    try:
+        tomar_bloqueo("importar reservas")
+    except (OSError, TimeoutError) as e:
+        print(f"❌ No se pudo importar: {e}")
+        return None
+    try:
+        inicio = time.perf_counter()
+        # Con el diario pendiente volcado, cada archivo se escribe una sola vez al final
+        if not compactar_diario():
+            return None
+        try:
+            reservas = cargar_archivo(reservas_archivo)
+        except FileNotFoundError:
+            reservas = {}
+        try:
+            huespedes = cargar_archivo(huespedes_archivo)
+            habitaciones = cargar_archivo(habitaciones_archivo)
+        except FileNotFoundError:
+            print("❌ Faltan los archivos de huéspedes o habitaciones. No se puede importar.")
+            return None
+        except (OSError, ValueError) as detalle:
+            print("❌ Error al intentar abrir archivo(s):", detalle, "¿Existe el archivo y tiene formato JSON válido?")
+            return None
+        
+        fecha_hora_operacion = datetime.datetime.now().strftime("%Y.%m.%d - %H:%M:%S")
+        informe = []
+        aceptadas = []
+        # El bloqueo se mantiene todo el lote: el contador de IDs se lee una vez y se guarda al final
+        try:
+            secuencia = leer_secuencia_reservas()
+        except (OSError, ValueError) as e:
+            print(f"❌ Error con el contador de IDs de reserva ({ARCHIVO_SECUENCIA_RESERVAS}): {e}")
+            return None
+        for numero, fila in filas:
+            datos, motivo = validar_fila_importacion(fila, reservas, huespedes, habitaciones)
+            if datos is None:
+                informe.append(f"{numero:>7} | ❌ Rechazada | {motivo}")
+                continue
+            rid, secuencia = siguiente_id_reserva(reservas, secuencia)
+            if rid is None:
+                informe.append(f"{numero:>7} | ❌ Rechazada | no quedan IDs de reserva disponibles")
+                continue
+            datos["fechaHoraOperacion"] = fecha_hora_operacion
+            reservas[rid] = datos
+            # Las filas siguientes del mismo archivo ya ven esta reserva en el índice
+            indexar_reserva(reservas, rid)
+            aceptadas.append(rid)
+            informe.append(f"{numero:>7} | ✅ Aceptada  | {rid} - habitación {datos['idhabitacion']} del {datos['fechaEntrada']} al {datos['fechaSalida']}")
+        
+        if aceptadas:
+            try:
+                guardar_secuencia_reservas(secuencia)
+            except OSError as e:
+                print(f"❌ Error con el contador de IDs de reserva ({ARCHIVO_SECUENCIA_RESERVAS}): {e}")
+                return None
+            # Solo pasan a ocupadas las habitaciones disponibles con una estadía importada que incluye
+            # la noche de hoy (entrada <= hoy < salida, también si empezó antes)
+            ids_habitaciones = sorted({reservas[rid]["idhabitacion"] for rid in aceptadas
+                                       if reserva_en_curso(reservas[rid]) and habitaciones[reservas[rid]["idhabitacion"]]["estado"] == "Disponible"})
+            for idhabitacion in ids_habitaciones:
+                habitaciones[idhabitacion]["estado"] = "Ocupada"
+            firma_indices_previa = firma_indices_reservas(reservas)
+            if usa_sqlite(reservas_archivo):
+                if not sqlite_registrar_reservas(reservas, habitaciones, aceptadas, ids_habitaciones):
+                    return None
+                actualizar_almacen(reservas_archivo, reservas)
+                actualizar_almacen(habitaciones_archivo, habitaciones)
+            elif (not guardar_reservas(reservas, reservas_archivo, aceptadas)
+                  or not guardar_habitaciones(habitaciones, habitaciones_archivo, ids_habitaciones)):
+                return None
+            sellar_indices_reservas(reservas, firma_indices_previa)
+        demora = time.perf_counter() - inicio
+    finally:
+        soltar_bloqueo()
+    
+    print(f"📋 {len(filas)} filas: {len(aceptadas)} aceptadas, {len(filas) - len(aceptadas)} rechazadas")
+    print(f"⏱️ {demora:.2f} s ({len(filas) / demora if demora > 0 else 0:.0f} filas/segundo)")
+    return informe
+
+def menu_importar_reservas():
+    """Pide el archivo a importar, importa sus reservas y muestra el resultado de cada fila."""
+    print("\n--- Importar reservas desde archivo ---")
+    print(f"💡 CSV con encabezado o JSON Lines, con los campos: {', '.join(CAMPOS_IMPORTACION)}")
+    ruta = input("Ruta del archivo (.csv o .jsonl): ").strip()
+    if not ruta:
+        print("❌ Operación cancelada.")
         return
-    except OSError as detalle:
-        print("❌ Error al intentar abrir archivo(s):", detalle, "¿Existe el archivo y tiene formato JSON válido?")
+    informe = importar_reservas(ruta)
+    if informe is None:
         return
-    termino = input("Ingrese tipo o estado a buscar: ").strip().lower()
-    encontrados = [ (idh, d) for idh, d in habitaciones.items() if d["activo"] and (termino in d["tipo"].lower() or termino in d["estado"].lower()) ]
-    if encontrados:
-        encabezado = f"{'ID':<12} | {'Nro':<8} | {'Tipo':<10} | {'Piso':<4} | {'Estado':<12} | {'Precio':<10} | {'Servicios':<20}"
-        print("-" * len(encabezado))
-        print(encabezado)
-        print("-" * len(encabezado))
-        for idh, datos in encontrados:
-            print(f"{idh:<12} | {str(datos['numero']):<8} | {datos['tipo']:<10} | {str(datos['piso']):<4} | {datos['estado']:<12} | ${datos['precioNoche']:<9.2f} | {datos['serviciosIncluidos']:<20}")
-        print("-" * len(encabezado))
-    else:
-        print("❌ No se encontraron habitaciones con ese tipo o estado.")
+    encabezado = f"{'Línea':>7} | {'Resultado':<11} | Detalle"
+    contenido = "\n".join([f"Importación de {ruta}", "-" * 70, encabezado, "-" * 70] + informe + ["-" * 70])
+    print(contenido)
+    if input("¿Desea exportar el informe a un archivo? (s/n): ").strip().lower() == "s":
+        exportar_informe_a_archivo(contenido + "\n", "importacion_reservas")
 
 #----------------------------------------------------------------------------------------------
-# TRANSACCIONES - RESERVAS
+# ASIGNACIÓN AUTOMÁTICA DE HABITACIONES
 #----------------------------------------------------------------------------------------------
-def solapa_reserva(reservas, id_hab, fecha_inicio_nueva, fecha_fin_nueva):
+# Las solicitudes de un grupo piden un tipo de habitación y unas fechas, sin habitación fija. Se
+# ubican por tipo y en orden de salida (la que se libera antes, primero), cada una en la habitación
+# libre que queda con el hueco más chico desde su estadía anterior. Con habitaciones vacías este
+# criterio ubica la mayor cantidad posible de solicitudes; con reservas previas es una heurística.
+# La disponibilidad se consulta en el calendario de bits de cada habitación (índice de intervalos)
+# sobre una copia, de modo que la asignación no toca las reservas hasta que se confirma.
+CAMPOS_SOLICITUD = ["idhuesped", "tipo", "fechaEntrada", "fechaSalida", "descuento"]
+
+def validar_solicitud(fila, huespedes):
+    """Valida una solicitud sin habitación. Devuelve ((idhuesped, tipo, entrada, salida), None) o (None, motivo)."""
+    if fila is None:
+        return None, "línea con formato JSON inválido"
+    valores = {campo: str(fila.get(campo) if fila.get(campo) is not None else "").strip() for campo in CAMPOS_SOLICITUD}
+    faltantes = [campo for campo in CAMPOS_SOLICITUD[:4] if not valores[campo]]
+    if faltantes:
+        return None, f"faltan campos: {', '.join(faltantes)}"
+    idh = valores["idhuesped"]
+    if idh not in huespedes or not huespedes[idh]["activo"]:
+        return None, f"huésped {idh} inexistente o inactivo"
+    tipos_normalizados = [normalizar_texto(t) for t in TIPOS_HABITACION]
+    if normalizar_texto(valores["tipo"]) not in tipos_normalizados:
+        return None, f"tipo inválido ({valores['tipo']})"
+    tipo = TIPOS_HABITACION[tipos_normalizados.index(normalizar_texto(valores["tipo"]))]
+    if not validar_fecha(valores["fechaEntrada"]) or not validar_fecha(valores["fechaSalida"]):
+        return None, "fecha inválida"
+    if not fecha_salida_posterior(valores["fechaEntrada"], valores["fechaSalida"]):
+        return None, "la fecha de salida debe ser posterior a la de entrada"
+    entrada = fecha_a_ordinal(valores["fechaEntrada"])
+    salida = fecha_a_ordinal(valores["fechaSalida"])
+    if salida - entrada > MAX_NOCHES_RESERVA:
+        return None, f"más de {MAX_NOCHES_RESERVA} noches"
+    return (idh, tipo, entrada, salida), None
+
+def asignar_habitaciones(solicitudes, reservas, habitaciones):
     """
-    Revisa si una habitación ya está reservada en un rango de fechas.
-    Compara la nueva reserva con las existentes para evitar solapamientos.
-    Devuelve True si se solapa, False si está libre.
+    Ubica las solicitudes {clave: (idhuesped, tipo, entrada, salida)} (números de día) en habitaciones
+    activas de su tipo, fuera de mantenimiento y libres según 'reservas' y las solicitudes ya ubicadas.
+    Devuelve {clave: idhabitacion}.
     """
-    for datos in reservas.values():
-        if datos["idhabitacion"] == id_hab:
-            fe_existente_str = datos["fechaEntrada"]
-            fs_existente_str = datos["fechaSalida"]
-            if len(fe_existente_str) == 6 and len(fs_existente_str) == 6:
-                try:
-                    dia_e, mes_e, anio_e = int(fe_existente_str[:2]), int(fe_existente_str[2:4]), int(fe_existente_str[4:6])
-                    dia_s, mes_s, anio_s = int(fs_existente_str[:2]), int(fs_existente_str[2:4]), int(fs_existente_str[4:6])
-                    # Validar que las fechas existan realmente
-                    if es_fecha_valida(dia_e, mes_e, 2000 + anio_e) and es_fecha_valida(dia_s, mes_s, 2000 + anio_s):
-                        inicio_existente = datetime.datetime(2000 + anio_e, mes_e, dia_e)
-                        fin_existente = datetime.datetime(2000 + anio_s, mes_s, dia_s)
-                        if fecha_inicio_nueva < fin_existente and fecha_fin_nueva > inicio_existente:
-                            return True
-                except (ValueError, IndexError):
-                    # Saltar reservas con fechas mal formateadas
-                    pass
-    return False
+    indice = indice_intervalos(reservas)
+    calendarios = {}
+    for idh, datos in habitaciones.items():
+        if datos["activo"] and datos["estado"] != "Mantenimiento":
+            habitacion = indice.get(idh)
+            calendarios.setdefault(datos["tipo"], {})[idh] = habitacion["ocupacion"] if habitacion else 0
+    asignadas = {}
+    for salida, entrada, clave in sorted((datos[3], datos[2], clave) for clave, datos in solicitudes.items()):
+        mascara = mascara_de_noches(entrada, salida)
+        anteriores = mascara_de_noches(PRIMER_DIA_CALENDARIO, entrada)
+        # El fin de la última estadía anterior es el largo en bits de las noches ocupadas antes de la entrada
+        mejor, fin_mejor = None, -1
+        candidatas = calendarios.get(solicitudes[clave][1], {})
+        for idh, ocupacion in candidatas.items():
+            if not ocupacion & mascara:
+                fin_previo = (ocupacion & anteriores).bit_length()
+                if fin_previo > fin_mejor:
+                    mejor, fin_mejor = idh, fin_previo
+                    if fin_previo == entrada - PRIMER_DIA_CALENDARIO:
+                        break  # sin hueco: no hay una mejor
+        if mejor is not None:
+            candidatas[mejor] |= mascara
+            asignadas[clave] = mejor
+    return asignadas
 
-def registrar_reserva(reservas_archivo=ARCHIVO_RESERVAS, huespedes_archivo=ARCHIVO_HUESPEDES, habitaciones_archivo=ARCHIVO_HABITACIONES):
-    """Registra una nueva reserva, persistiendo en archivo JSON."""
-    print("\n--- Registrar reserva ---")
-    try:
-        with open(reservas_archivo, mode='r', encoding='utf-8') as f:
-            reservas = json.load(f)
-    except FileNotFoundError:
-        reservas = {}
-    except OSError as detalle:
-        print("❌ Error al intentar abrir archivo(s):", detalle, "¿Existe el archivo y tiene formato JSON válido?")
-        return
-    try:
-        with open(huespedes_archivo, mode='r', encoding='utf-8') as f:
-            huespedes = json.load(f)
-    except FileNotFoundError:
-        print("❌ El archivo de huéspedes no existe. No hay datos para mostrar.")
+def menu_asignar_habitaciones():
+    """Asigna habitaciones a las solicitudes de un archivo, muestra el resultado y permite registrar las ubicadas."""
+    print("\n--- Asignar habitaciones a solicitudes ---")
+    print(f"💡 CSV con encabezado o JSON Lines, con los campos: {', '.join(CAMPOS_SOLICITUD)}")
+    ruta = input("Ruta del archivo (.csv o .jsonl): ").strip()
+    if not ruta:
+        print("❌ Operación cancelada.")
         return
     try:
-        with open(habitaciones_archivo, mode='r', encoding='utf-8') as f:
-            habitaciones = json.load(f)
-    except FileNotFoundError:
-        print("❌ El archivo de habitaciones no existe. No hay datos para mostrar.")
+        filas = leer_filas_importacion(ruta)
+        huespedes = cargar_archivo(ARCHIVO_HUESPEDES)
+        habitaciones = cargar_archivo(ARCHIVO_HABITACIONES)
+        reservas = cargar_archivo(ARCHIVO_RESERVAS)
+    except FileNotFoundError as e:
+        print(f"❌ No se encontró el archivo: {e.filename}")
         return
-    except OSError as detalle:
-        print("❌ Error al intentar abrir archivo(s):", detalle, "¿Existe el archivo y tiene formato JSON válido?")
+    except (OSError, ValueError, csv.Error) as e:
+        print(f"❌ Error al leer los datos: {e}")
         return
     
-    # ID reserva
-    rid = generar_id_reserva(reservas)
-    
-    # ID huésped
-    idh = None
-    while idh is None:
-        idh_input = input("ID huésped: ").strip()
-        if idh_input in huespedes and huespedes[idh_input]["activo"]:
-            idh = idh_input
+    inicio = time.perf_counter()
+    solicitudes = {}
+    motivos = {}
+    for numero, fila in filas:
+        datos, motivo = validar_solicitud(fila, huespedes)
+        if datos is None:
+            motivos[numero] = motivo
         else:
-            print("❌ ID de huésped inválido o inactivo.")
+            solicitudes[numero] = datos
+    asignadas = asignar_habitaciones(solicitudes, reservas, habitaciones)
+    demora = time.perf_counter() - inicio
     
-    # ID habitación
-    idhabitacion = None
-    while idhabitacion is None:
-        idhabitacion_input = input("ID habitación: ").strip()
-        if idhabitacion_input in habitaciones and habitaciones[idhabitacion_input]["activo"]:
-            if habitaciones[idhabitacion_input]["estado"] == "Disponible":
-                idhabitacion = idhabitacion_input
-            else:
-                print("❌ La habitación no está disponible.")
-        else:
-            print("❌ ID de habitación inválido o inactivo.")
+    encabezado = f"{'Línea':>7} | {'Huésped':<8} | {'Tipo':<10} | {'Entrada':<8} | {'Salida':<8} | Habitación"
+    print("-" * 78)
+    print(encabezado)
+    print("-" * 78)
+    for numero, fila in filas:
+        if numero in motivos:
+            print(f"{numero:>7} | ❌ {motivos[numero]}")
+            continue
+        idh, tipo, entrada, salida = solicitudes[numero]
+        destino = asignadas.get(numero, "❌ sin lugar")
+        fecha_entrada = datetime.date.fromordinal(entrada).strftime("%d%m%y")
+        fecha_salida = datetime.date.fromordinal(salida).strftime("%d%m%y")
+        print(f"{numero:>7} | {idh:<8} | {tipo:<10} | {fecha_entrada:<8} | {fecha_salida:<8} | {destino}")
+    print("-" * 78)
+    for tipo in TIPOS_HABITACION:
+        pedidas = sum(1 for datos in solicitudes.values() if datos[1] == tipo)
+        if pedidas:
+            ubicadas = sum(1 for clave in asignadas if solicitudes[clave][1] == tipo)
+            print(f"   {tipo:<10}: {ubicadas} de {pedidas} solicitudes ubicadas")
+    print(f"📋 {len(asignadas)} ubicadas, {len(solicitudes) - len(asignadas)} sin lugar y {len(motivos)} inválidas ({demora:.2f} s)")
+    if not asignadas:
+        return
     
-    # Fecha entrada
-    fechaEntrada = None
-    while fechaEntrada is None:
-        fechaEntrada_input = input("Fecha entrada (DDMMAA): ").strip()
-        if validar_fecha(fechaEntrada_input):
-            fechaEntrada = fechaEntrada_input
-        else:
-            print("❌ Fecha inválida. Use formato DDMMAA (ej: 150125 para 15/01/25).")
+    if input("¿Desea registrar las reservas asignadas? (s/n): ").strip().lower() != "s":
+        print("❌ Operación cancelada.")
+        return
+    # Se registran como una importación: bajo el bloqueo se vuelve a validar cada fila
+    lote = []
+    for numero, fila in filas:
+        if numero in asignadas:
+            idh, tipo, entrada, salida = solicitudes[numero]
+            lote.append((numero, {"idhuesped": idh, "idhabitacion": asignadas[numero],
+                                  "fechaEntrada": datetime.date.fromordinal(entrada).strftime("%d%m%y"),
+                                  "fechaSalida": datetime.date.fromordinal(salida).strftime("%d%m%y"),
+                                  "descuento": fila.get("descuento")}))
+    informe = registrar_reservas_en_lote(lote)
+    if informe is not None:
+        for linea in informe:
+            if "❌" in linea:
+                print(linea)
+
+#----------------------------------------------------------------------------------------------
+# VALIDACIÓN MASIVA DE HUÉSPEDES Y HABITACIONES
+#----------------------------------------------------------------------------------------------
+# Un archivo de huéspedes o habitaciones (JSON con el formato de huespedes.json/habitaciones.json,
+# JSON Lines o CSV con una columna "id") se valida completo con las mismas reglas que las altas por
+# consola, sin pedir nada por teclado. Cada registro se revisa de forma independiente, así que con
+# muchos registros la lista se corta en fragmentos que se validan en paralelo en varios procesos
+# (ProcessPoolExecutor); los IDs y valores únicos repetidos se buscan después en una sola pasada.
+# El resultado es un informe con un renglón por registro con errores: línea, ID y la lista de
+# errores, cada uno con el campo y el motivo.
+def registro_activo_a_validar(datos):
+    """Indica si un registro leído de un archivo está activo (sin el campo "activo", se toma como activo)."""
+    return str(datos.get("activo", True)).strip().lower() not in ("false", "0", "no")
+
+def validar_campos_huesped(datos):
+    """Valida los campos de un huésped con las reglas del alta; devuelve [(campo, motivo)]."""
+    errores = []
+    for campo in ("nombre", "apellido"):
+        valor = datos.get(campo)
+        if not isinstance(valor, str) or not validar_nombre_apellido(valor):
+            errores.append((campo, f"debe tener entre {MIN_LENGTH_NOMBRE} y {MAX_LENGTH_NOMBRE} caracteres, solo letras y espacios simples"))
+    documento = datos.get("documento")
+    if isinstance(documento, str):
+        documento = documento.strip()
+    if isinstance(documento, bool) or not validar_dni(documento):
+        errores.append(("documento", f"debe tener entre {MIN_LENGTH_DNI} y {MAX_LENGTH_DNI} dígitos"))
+    email = datos.get("email")
+    if not isinstance(email, str) or not validar_email_regex(email.strip()):
+        errores.append(("email", "formato de email inválido"))
+    telefono = datos.get("telefono")
+    if telefono is None or isinstance(telefono, (bool, float)) or not validar_telefono(str(telefono).strip()):
+        errores.append(("telefono", f"debe tener entre {MIN_LENGTH_TELEFONO} y {MAX_LENGTH_TELEFONO} dígitos (con + opcional al inicio)"))
+    medios = datos.get("mediosDePago")
+    if isinstance(medios, str):
+        medios = [medio.strip() for medio in medios.split(",")]
+    if not isinstance(medios, list) or not medios:
+        errores.append(("mediosDePago", "debe indicar al menos un medio de pago"))
+    else:
+        invalidos = [str(medio) for medio in medios if medio not in MEDIOS_DE_PAGO]
+        if invalidos:
+            errores.append(("mediosDePago", f"medios no válidos: {', '.join(invalidos)}"))
+        elif len(medios) != len(set(medios)):
+            errores.append(("mediosDePago", "hay medios de pago repetidos"))
+    return errores
+
+def validar_campos_habitacion(datos):
+    """Valida los campos de una habitación con las reglas del alta; devuelve [(campo, motivo)]."""
+    errores = []
+    numero = str(datos.get("numero", "")).strip()
+    if not (numero.isdigit() and MIN_LENGTH_NUMERO_HAB <= len(numero) <= MAX_LENGTH_NUMERO_HAB):
+        errores.append(("numero", f"debe tener entre {MIN_LENGTH_NUMERO_HAB} y {MAX_LENGTH_NUMERO_HAB} dígitos"))
+    if datos.get("tipo") not in TIPOS_HABITACION:
+        errores.append(("tipo", f"debe ser uno de: {', '.join(TIPOS_HABITACION)}"))
+    descripcion = datos.get("descripcion")
+    if not (isinstance(descripcion, str) and MIN_LENGTH_DESCRIPCION <= len(descripcion) <= MAX_LENGTH_DESCRIPCION
+            and PATRON_TEXTO_HABITACION.fullmatch(descripcion) and limpiar_espacios(descripcion) == descripcion):
+        errores.append(("descripcion", f"entre {MIN_LENGTH_DESCRIPCION} y {MAX_LENGTH_DESCRIPCION} caracteres: letras, números, comas, puntos y espacios simples"))
+    precio = datos.get("precioNoche")
+    texto_precio = str(precio).strip()
+    if isinstance(precio, bool) or not texto_precio.replace('.', '', 1).isdigit():
+        errores.append(("precioNoche", "debe ser un número no negativo"))
+    elif float(texto_precio) > 10000:
+        errores.append(("precioNoche", "no puede exceder $10,000 por noche"))
+    piso = str(datos.get("piso", "")).strip()
+    if not (piso.isdigit() and MIN_LENGTH_PISO <= len(piso) <= MAX_LENGTH_PISO and int(piso) <= 100):
+        errores.append(("piso", "debe ser un número entre 0 y 100"))
+    if datos.get("estado") not in ESTADOS_HABITACION:
+        errores.append(("estado", f"debe ser uno de: {', '.join(ESTADOS_HABITACION)}"))
+    servicios = datos.get("serviciosIncluidos")
+    if not isinstance(servicios, str) or not MIN_LENGTH_SERVICIOS <= len(servicios) <= MAX_LENGTH_SERVICIOS:
+        errores.append(("serviciosIncluidos", f"debe tener entre {MIN_LENGTH_SERVICIOS} y {MAX_LENGTH_SERVICIOS} caracteres"))
+    else:
+        lista = [servicio.strip() for servicio in servicios.split(",")]
+        if "" in lista or not all(PATRON_TEXTO_HABITACION.fullmatch(servicio) and "  " not in servicio for servicio in lista):
+            errores.append(("serviciosIncluidos", "servicios separados por coma, sin vacíos: letras, números, puntos y espacios simples"))
+        elif len(lista) != len(set(lista)):
+            errores.append(("serviciosIncluidos", "hay servicios repetidos"))
+    return errores
+
+def validar_fragmento(entidad, registros):
+    """
+    Valida una lista [(línea, ID, datos)] de huéspedes o habitaciones y devuelve [(línea, ID, [(campo, motivo)])]
+    solo de los registros con errores. Es la tarea que corre cada proceso de la validación en paralelo.
+    """
+    validar_id = validar_id_huesped if entidad == "huespedes" else validar_id_habitacion
+    validar_campos = validar_campos_huesped if entidad == "huespedes" else validar_campos_habitacion
+    resultado = []
+    for numero, id_registro, datos in registros:
+        if not isinstance(datos, dict):
+            resultado.append((numero, id_registro, [("registro", "no es un objeto JSON válido")]))
+            continue
+        errores = []
+        if not validar_id(id_registro):
+            errores.append(("id", f"entre {MIN_LENGTH_ID} y {MAX_LENGTH_ID} letras o números, no solo números"))
+        try:
+            errores += validar_campos(datos)
+        except (TypeError, ValueError, AttributeError) as e:
+            errores.append(("registro", f"valores con tipos inválidos ({e})"))
+        if errores:
+            resultado.append((numero, id_registro, errores))
+    return resultado
+
+def validar_en_procesos(entidad, registros):
+    """
+    Valida los registros de a fragmentos en varios procesos si son muchos; si no, o si no se pueden
+    crear procesos, en este. Devuelve (resultados de validar_fragmento, cantidad de procesos usados).
+    """
+    fragmentos = [registros[desde:desde + REGISTROS_POR_FRAGMENTO] for desde in range(0, len(registros), REGISTROS_POR_FRAGMENTO)]
+    procesos = min(os.cpu_count() or 1, len(fragmentos))
+    if len(registros) < MIN_REGISTROS_VALIDACION_PARALELA or procesos < 2:
+        return validar_fragmento(entidad, registros), 1
+    resultado = []
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            for parcial in ejecutor.map(validar_fragmento, [entidad] * len(fragmentos), fragmentos):
+                resultado.extend(parcial)
+    except (OSError, concurrent.futures.BrokenExecutor) as e:
+        print(f"⚠️  No se pudieron usar varios procesos ({e}); se valida en este proceso.")
+        return validar_fragmento(entidad, registros), 1
+    return resultado, procesos
+
+def validar_registros_en_lote(entidad, registros, existentes=None):
+    """
+    Valida [(línea, ID, datos)] de "huespedes" o "habitaciones": cada campo con las reglas del alta,
+    IDs y valores únicos repetidos dentro del archivo y, si se pasan los datos 'existentes', IDs ya
+    usados y valores únicos de registros activos. Devuelve (informe, procesos): el informe es una lista
+    ordenada por línea de {"linea", "id", "errores": [{"campo", "motivo"}]}, solo con los registros con errores.
+    """
+    resultado, procesos = validar_en_procesos(entidad, registros)
+    errores_por_linea = {numero: (id_registro, errores) for numero, id_registro, errores in resultado}
     
-    # Fecha salida
-    fechaSalida = None
-    while fechaSalida is None:
-        fechaSalida_input = input("Fecha salida (DDMMAA): ").strip()
-        if validar_fecha(fechaSalida_input):
-            if fecha_salida_posterior(fechaEntrada, fechaSalida_input):
-                fechaSalida = fechaSalida_input
-            else:
-                print("❌ La fecha de salida debe ser posterior a la de entrada.")
+    # IDs y valores únicos repetidos: una sola pasada sobre todo el archivo
+    primera_linea = {}
+    vistos = {campo: {} for campo in CAMPOS_UNICOS[entidad]}
+    for numero, id_registro, datos in registros:
+        if not isinstance(datos, dict):
+            continue
+        nuevos = []
+        if id_registro in primera_linea:
+            nuevos.append(("id", f"repetido (línea {primera_linea[id_registro]})"))
         else:
-            print("❌ Fecha inválida. Use formato DDMMAA (ej: 160125 para 16/01/25).")
+            primera_linea[id_registro] = numero
+            if existentes is not None and id_registro in existentes:
+                nuevos.append(("id", "ya existe en los datos actuales"))
+        if registro_activo_a_validar(datos):
+            for campo in CAMPOS_UNICOS[entidad]:
+                if campo not in datos:
+                    continue
+                clave = clave_unica(campo, datos[campo])
+                anterior = vistos[campo].setdefault(clave, (numero, id_registro))
+                if anterior[0] != numero:
+                    nuevos.append((campo, f"repetido con {anterior[1]} (línea {anterior[0]})"))
+                elif existentes is not None:
+                    otro = registro_con_clave(entidad, existentes, campo, datos[campo], id_registro)
+                    if otro is not None:
+                        nuevos.append((campo, f"ya lo usa {otro} en los datos actuales"))
+        if nuevos:
+            errores_por_linea.setdefault(numero, (id_registro, []))[1].extend(nuevos)
     
-    # Calcular cantidad de noches automáticamente
+    informe = [{"linea": numero, "id": id_registro, "errores": [{"campo": campo, "motivo": motivo} for campo, motivo in errores]}
+               for numero, (id_registro, errores) in sorted(errores_por_linea.items())]
+    return informe, procesos
+
+def leer_registros_a_validar(ruta):
+    """
+    Devuelve [(línea, ID, datos)] de un archivo de huéspedes o habitaciones: JSON {ID: datos} (la
+    "línea" es la posición del registro), JSON Lines o CSV con el ID en el campo "id".
+    """
+    if ruta.lower().endswith(".json"):
+        with open(ruta, mode='r', encoding='utf-8') as f:
+            datos = json.load(f)
+        if not isinstance(datos, dict):
+            raise ValueError("el archivo JSON debe ser un objeto {ID: registro}")
+        return [(numero, str(id_registro), registro) for numero, (id_registro, registro) in enumerate(datos.items(), start=1)]
+    registros = []
+    for numero, fila in leer_filas_importacion(ruta):
+        id_registro = "" if fila is None else str(fila.get("id") or "").strip()
+        registros.append((numero, id_registro, fila))
+    return registros
+
+def menu_validar_registros():
+    """Pide un archivo de huéspedes o habitaciones, lo valida completo y muestra el informe de errores."""
+    print("\n--- Validar archivo de huéspedes o habitaciones ---")
+    print("[1] Huéspedes")
+    print("[2] Habitaciones")
+    entidad = "huespedes" if input_opciones("Opción: ", ["1", "2"]) == "1" else "habitaciones"
+    ruta = input("Ruta del archivo (.json, .jsonl o .csv): ").strip()
+    if not ruta:
+        print("❌ Operación cancelada.")
+        return
     try:
-        dia_e, mes_e, anio_e = int(fechaEntrada[:2]), int(fechaEntrada[2:4]), int(fechaEntrada[4:6])
-        dia_s, mes_s, anio_s = int(fechaSalida[:2]), int(fechaSalida[2:4]), int(fechaSalida[4:6])
-        fecha_e = datetime.datetime(2000 + anio_e, mes_e, dia_e)
-        fecha_s = datetime.datetime(2000 + anio_s, mes_s, dia_s)
-        noches = (fecha_s - fecha_e).days
-        if noches <= 0:
-            print("❌ La fecha de salida debe ser posterior a la de entrada.")
-            return
-        if noches > 30:
-            print("❌ No se permiten reservas de más de 30 noches.")
-            return
-        print(f"🛏️  Cantidad de noches calculada: {noches}")
-    except Exception as e:
-        print(f"❌ Error al calcular la cantidad de noches: {e}")
+        registros = leer_registros_a_validar(ruta)
+    except (OSError, ValueError, UnicodeDecodeError, csv.Error) as e:
+        print(f"❌ No se pudo leer el archivo: {e}")
         return
+    existentes = None
+    if input("¿Comparar también con los datos actuales (IDs y valores únicos ya usados)? (s/n): ").strip().lower() == "s":
+        try:
+            existentes = cargar_archivo(ARCHIVO_HUESPEDES if entidad == "huespedes" else ARCHIVO_HABITACIONES)
+        except FileNotFoundError:
+            existentes = {}
+        except (OSError, ValueError) as detalle:
+            print("❌ Error al intentar abrir archivo(s):", detalle, "¿Existe el archivo y tiene formato JSON válido?")
+            return
+    inicio = time.perf_counter()
+    informe, procesos = validar_registros_en_lote(entidad, registros, existentes)
+    demora = time.perf_counter() - inicio
     
-    # Descuento
-    descuento = None
-    while descuento is None:
-        descuento_input = input("Descuento: ").strip()
-        if descuento_input.isdigit():
-            descuento_val = int(descuento_input)
-            if 0 <= descuento_val <= 99:
-                descuento = descuento_val
-            else:
-                print("❌ El descuento debe estar entre 0 y 99.")
-        else:
-            print("❌ Ingrese un valor numérico entero para el descuento.")
-    
-    # Calcular precio final
-    precio_noche = habitaciones[idhabitacion]["precioNoche"]
-    precio_final = precio_noche * noches * (1 - descuento / 100)
-    
-    # Generar fecha y hora de operación
-    fecha_hora_operacion = datetime.datetime.now().strftime("%Y.%m.%d - %H:%M:%S")
+    lineas = [f"Validación de {ruta} ({entidad})", "-" * 90, f"{'Línea':>7} | {'ID':<8} | {'Campo':<18} | Motivo", "-" * 90]
+    for registro in informe:
+        for error in registro["errores"]:
+            lineas.append(f"{registro['linea']:>7} | {registro['id']:<8} | {error['campo']:<18} | {error['motivo']}")
+    lineas.append("-" * 90)
+    cantidad_errores = sum(len(registro["errores"]) for registro in informe)
+    if informe:
+        # En pantalla solo el comienzo; el informe completo se puede exportar
+        print("\n".join(lineas[:54]))
+        if len(lineas) > 54:
+            print(f"... ({len(lineas) - 54} líneas más)")
+    print(f"📋 {len(registros)} registros: {len(registros) - len(informe)} válidos, {len(informe)} con errores ({cantidad_errores} errores)")
+    print(f"⏱️ {demora:.2f} s ({len(registros) / demora if demora > 0 else 0:.0f} registros/segundo, {procesos} procesos)")
+    if informe and input("¿Desea exportar el informe a un archivo? (s/n): ").strip().lower() == "s":
+        exportar_informe_a_archivo("\n".join(lineas) + "\n", f"validacion_{entidad}")
+
+#----------------------------------------------------------------------------------------------
+# VERIFICACIÓN DE INTEGRIDAD
+#----------------------------------------------------------------------------------------------
+# Revisa los archivos en uso con los mismos criterios que el script de conversión: que cada reserva
+# apunte a un huésped y una habitación existentes, que sus fechas existan y que no haya dos
+# estadías solapadas en una misma habitación. Los solapamientos se buscan agrupando por habitación
+# y barriendo las estadías ordenadas por entrada, sin comparar cada reserva con todas las demás.
+def detectar_solapamientos(reservas, intervalos):
+    """
+    Devuelve los pares (rid1, rid2), con rid1 < rid2, de reservas de una misma habitación cuyas estadías
+    (intervalos {id: (entrada, salida)} en números de día) se solapan. Agrupa por habitación, ordena por
+    entrada y barre las estadías manteniendo las abiertas en un heap por salida: O(n log n) más los conflictos.
+    """
+    por_habitacion = {}
+    for rid, (inicio, fin) in intervalos.items():
+        por_habitacion.setdefault(reservas[rid]["idhabitacion"], []).append((inicio, rid, fin))
+    pares = set()
+    for estadias in por_habitacion.values():
+        abiertas = []  # (salida, id, entrada) de las estadías que siguen abiertas
+        for inicio, rid, fin in sorted(estadias):
+            while abiertas and abiertas[0][0] <= inicio:
+                heapq.heappop(abiertas)
+            for otra_fin, otra, otra_inicio in abiertas:
+                if fin > otra_inicio:
+                    pares.add((min(rid, otra), max(rid, otra)))
+            heapq.heappush(abiertas, (fin, rid, inicio))
+    posicion = {rid: i for i, rid in enumerate(reservas)}
+    return [(rid1, rid2) for _, _, rid1, rid2 in sorted((posicion[rid1], posicion[rid2], rid1, rid2) for rid1, rid2 in pares)]
+
+def verificar_integridad_datos(huespedes_archivo=ARCHIVO_HUESPEDES, habitaciones_archivo=ARCHIVO_HABITACIONES, reservas_archivo=ARCHIVO_RESERVAS):
+    """Audita los datos en uso: referencias de cada reserva, fechas, solapamientos por habitación y valores únicos repetidos."""
+    print("\n🔍 Verificando integridad de los datos...")
+    try:
+        huespedes = cargar_archivo(huespedes_archivo)
+        habitaciones = cargar_archivo(habitaciones_archivo)
+        reservas = cargar_archivo(reservas_archivo)
+    except FileNotFoundError:
+        print("❌ Falta alguno de los archivos de datos. No hay nada para verificar.")
+        return False
+    except (OSError, ValueError) as detalle:
+        print("❌ Error al intentar abrir archivo(s):", detalle, "¿Existe el archivo y tiene formato JSON válido?")
+        return False
     
-    reservas[rid] = {
-        "idhuesped": idh,
-        "idhabitacion": idhabitacion,
-        "fechaEntrada": fechaEntrada,
-        "fechaSalida": fechaSalida,
-        "cantidadNoches": noches,
-        "descuento": descuento,
-        "precioNoche": precio_noche,
-        "precioFinal": precio_final,
-        "fechaHoraOperacion": fecha_hora_operacion
-    }
+    inicio = time.perf_counter()
+    errores = []
+    intervalos = {}
+    for rid, reserva in reservas.items():
+        # Un huésped o una habitación dados de baja solo son un error si la reserva sigue vigente
+        if reserva["idhuesped"] not in huespedes:
+            errores.append(f"Reserva {rid}: Huésped {reserva['idhuesped']} no existe")
+        elif not huespedes[reserva["idhuesped"]]["activo"] and not reserva.get("finalizada", False):
+            errores.append(f"Reserva {rid}: Huésped {reserva['idhuesped']} está inactivo y la reserva no finalizó")
+        if reserva["idhabitacion"] not in habitaciones:
+            errores.append(f"Reserva {rid}: Habitación {reserva['idhabitacion']} no existe")
+        elif not habitaciones[reserva["idhabitacion"]]["activo"] and not reserva.get("finalizada", False):
+            errores.append(f"Reserva {rid}: Habitación {reserva['idhabitacion']} está inactiva y la reserva no finalizó")
+        entrada, salida = fecha_a_ordinal(reserva["fechaEntrada"]), fecha_a_ordinal(reserva["fechaSalida"])
+        if None in (entrada, salida):
+            errores.append(f"Reserva {rid}: fecha inexistente ({reserva['fechaEntrada']}-{reserva['fechaSalida']})")
+            continue
+        if salida <= entrada:
+            errores.append(f"Reserva {rid}: la salida ({reserva['fechaSalida']}) no es posterior a la entrada ({reserva['fechaEntrada']})")
+        intervalos[rid] = (entrada, salida)
+    # Los valores únicos repetidos entre registros activos se buscan en una sola pasada
+    for entidad, datos, etiqueta in (("huespedes", huespedes, "Huéspedes activos"), ("habitaciones", habitaciones, "Habitaciones activas")):
+        for campo, valor, ids in claves_repetidas(entidad, datos):
+            errores.append(f"{etiqueta} con el mismo {campo} ({valor}): {', '.join(ids)}")
+    for rid1, rid2 in detectar_solapamientos(reservas, intervalos):
+        reserva1, reserva2 = reservas[rid1], reservas[rid2]
+        errores.append(f"Solapamiento detectado: Reserva {rid1} ({reserva1['fechaEntrada']}-{reserva1['fechaSalida']}) "
+                       f"y {rid2} ({reserva2['fechaEntrada']}-{reserva2['fechaSalida']}) en habitación {reserva1['idhabitacion']}")
+    demora = (time.perf_counter() - inicio) * 1000
     
-    # Actualizar estado de habitación
-    habitaciones[idhabitacion]["estado"] = "Ocupada"
-    guardar_reservas(reservas)
-    guardar_habitaciones(habitaciones)
-    print(f"✅ Reserva {rid} registrada correctamente. Precio final: ${precio_final:.2f}")
+    print(f"📋 Revisadas {len(reservas)} reservas, {len(huespedes)} huéspedes y {len(habitaciones)} habitaciones en {demora:.1f} ms")
+    if errores:
+        print(f"❌ Se encontraron {len(errores)} errores de integridad:")
+        for error in errores:
+            print(f"  - {error}")
+        return False
+    print("✅ Integridad referencial validada correctamente")
+    return True
 
-def listar_reservas(reservas, huespedes, habitaciones):
-    """Muestra una lista con todas las reservas que se hicieron, con formato tabular alineado y una sola línea por reserva."""
-    print("\n--- Lista de reservas ---")
-    if not reservas:
-        print("❌ No hay reservas registradas.")
-        return
-    encabezado = f"{'ID':<12} | {'Fecha/Hora':<24} | {'Huésped':<18} | {'Habitación':<10} | {'Entrada':<8} | {'Salida':<8} | {'Noches':<6} | {'Desc.':<5} | {'Precio':<12}"
-    print("-" * len(encabezado))
-    print(encabezado)
-    print("-" * len(encabezado))
-    for rid, datos in reservas.items():
-        h = huespedes.get(datos["idhuesped"], {"nombre": "-", "apellido": "-"})
-        hab = habitaciones.get(datos["idhabitacion"], {"numero": "-", "precioNoche": 0})
-        
-        # Calcular precio final si no existe o es 0
-        precio_final = datos.get("precioFinal", 0)
-        if precio_final == 0 and "precioNoche" in hab:
-            precio_final = hab["precioNoche"] * datos["cantidadNoches"] * (1 - datos["descuento"]/100)
-        
-        print(f"{rid:<12} | {datos['fechaHoraOperacion']:<24} | {(h['nombre'] + ' ' + h['apellido']):<18} | {str(hab['numero']):<10} | {datos['fechaEntrada']:<8} | {datos['fechaSalida']:<8} | {str(datos['cantidadNoches']):<6} | {str(datos['descuento']):<5} | ${precio_final:<11.2f}")
-    print("-" * len(encabezado))
+#----------------------------------------------------------------------------------------------
+# MOTOR DE OCUPACIÓN
+#----------------------------------------------------------------------------------------------
+# La planificación necesita saber, noche por noche, cuántas habitaciones de cada tipo y de cada piso
+# quedan libres. Las reservas se vuelcan una sola vez en una matriz habitaciones × días (ocupada o
+# libre) y todas las consultas operan sobre la matriz completa. Con NumPy la matriz se arma con
+# arreglos de diferencias y suma acumulada, y las consultas son operaciones sobre filas y columnas;
+# sin NumPy cada fila es un bytearray y las mismas consultas se resuelven con listas.
+def matriz_ocupacion(pares_reservas, habitaciones, desde, dias):
+    """
+    Arma la matriz de ocupación de las habitaciones activas para 'dias' noches desde el número de día
+    'desde'. Devuelve (ids de habitación en el orden de las filas, matriz): con NumPy un arreglo
+    booleano (True = ocupada); sin NumPy una lista de bytearray (1 = ocupada).
+    """
+    ids = [idh for idh, datos in habitaciones.items() if datos["activo"]]
+    fila_de = {idh: fila for fila, idh in enumerate(ids)}
+    filas, inicios, fines = [], [], []
+    for _, datos in pares_reservas:
+        fila = fila_de.get(datos["idhabitacion"])
+        entrada = fecha_a_ordinal(datos["fechaEntrada"])
+        salida = fecha_a_ordinal(datos["fechaSalida"])
+        if fila is None or entrada is None or salida is None:
+            continue
+        inicio, fin = max(entrada - desde, 0), min(salida - desde, dias)
+        if inicio < fin:
+            filas.append(fila)
+            inicios.append(inicio)
+            fines.append(fin)
+    if numpy is not None:
+        # +1 al entrar y -1 al salir en cada fila; la suma acumulada da las estadías de cada noche
+        diferencias = numpy.zeros((len(ids), dias + 1), dtype=numpy.int32)
+        filas = numpy.array(filas, dtype=numpy.intp)
+        numpy.add.at(diferencias, (filas, numpy.array(inicios, dtype=numpy.intp)), 1)
+        numpy.add.at(diferencias, (filas, numpy.array(fines, dtype=numpy.intp)), -1)
+        return ids, numpy.cumsum(diferencias, axis=1)[:, :dias] > 0
+    matriz = [bytearray(dias) for _ in ids]
+    for fila, inicio, fin in zip(filas, inicios, fines):
+        matriz[fila][inicio:fin] = b"\x01" * (fin - inicio)
+    return ids, matriz
+
+def libres_por_grupo(ids, matriz, habitaciones, campo, dias):
+    """Devuelve {valor del campo ('tipo', 'piso'): [habitaciones libres en cada noche]} de la matriz de ocupación."""
+    grupos = {}
+    for fila, idh in enumerate(ids):
+        grupos.setdefault(habitaciones[idh][campo], []).append(fila)
+    if numpy is not None:
+        # Una fila de pertenencia por grupo: el producto con la matriz de libres suma todas las columnas a la vez
+        pertenencia = numpy.zeros((len(grupos), len(ids)), dtype=numpy.int32)
+        for posicion, filas in enumerate(grupos.values()):
+            pertenencia[posicion, filas] = 1
+        libres = pertenencia @ (~matriz).astype(numpy.int32)
+        return {valor: libres[posicion].tolist() for posicion, valor in enumerate(grupos)}
+    resultado = {}
+    for valor, filas in grupos.items():
+        ocupadas = [sum(columna) for columna in zip(*(matriz[fila] for fila in filas))] if dias else []
+        resultado[valor] = [len(filas) - cantidad for cantidad in ocupadas]
+    return resultado
+
+def rachas_libres_mas_largas(ids, matriz, dias):
+    """Devuelve {idhabitacion: (noches, primera noche)} de la racha libre más larga de cada habitación; (0, None) si no tiene."""
+    rachas = {}
+    if numpy is not None:
+        # Se rodea cada fila de noches ocupadas: los cambios ocupada→libre y libre→ocupada marcan las rachas
+        libres = numpy.zeros((len(ids), dias + 2), dtype=numpy.int8)
+        libres[:, 1:-1] = ~matriz
+        cambios = numpy.diff(libres, axis=1)
+        filas, comienzos = numpy.nonzero(cambios == 1)
+        _, finales = numpy.nonzero(cambios == -1)
+        largos = finales - comienzos
+        mayores = numpy.zeros(len(ids), dtype=numpy.int64)
+        numpy.maximum.at(mayores, filas, largos)
+        # Las rachas salen ordenadas por fila y columna: la primera de largo máximo de cada fila
+        es_mayor = largos == mayores[filas]
+        filas_mayor, primeras = numpy.unique(filas[es_mayor], return_index=True)
+        desde = dict(zip(filas_mayor.tolist(), comienzos[es_mayor][primeras].tolist()))
+        for fila, idh in enumerate(ids):
+            rachas[idh] = (int(mayores[fila]), desde.get(fila))
+        return rachas
+    for fila, idh in enumerate(ids):
+        mayor, desde, posicion = 0, None, 0
+        for tramo in bytes(matriz[fila]).split(b"\x01"):
+            if len(tramo) > mayor:
+                mayor, desde = len(tramo), posicion
+            posicion += len(tramo) + 1
+        rachas[idh] = (mayor, desde)
+    return rachas
+
+#----------------------------------------------------------------------------------------------
+# SERIE DIARIA DE OCUPACIÓN
+#----------------------------------------------------------------------------------------------
+# La ocupación y la facturación de cada noche se calculan con arreglos de diferencias: cada estadía
+# suma en el día de entrada y resta en el de salida, y la suma acumulada da el valor de cada noche.
+# Así el costo es proporcional a las reservas más los días, sin recorrer cada estadía noche por
+# noche. Los montos se acumulan como enteros en diezmilésimos de peso (precio en centavos por
+# porcentaje pagado), de modo que sumar y restar no introduce errores de redondeo. Los resúmenes
+# mensuales por habitación se obtienen de la misma serie, sin volver a recorrer las reservas.
+UNIDADES_POR_PESO = 10000
+
+def monto_noche_en_unidades(precio_noche, descuento):
+    """Devuelve lo facturado por una noche con el descuento aplicado, como entero en diezmilésimos de peso."""
+    return int(round(precio_noche * 100) * (100 - descuento))
+
+def serie_ocupacion(pares_reservas, habitaciones, desde, dias):
+    """
+    Arma la serie diaria de las habitaciones activas para 'dias' noches desde el número de día 'desde'.
+    Devuelve {"activas", "vendidas": [habitaciones ocupadas por noche], "ingresos": [diezmilésimos por noche],
+    "habitaciones": {id: {"noches": diferencias, "montos": diferencias}}} con los arreglos de diferencias
+    de cada habitación que tiene reservas, para derivar los totales mensuales.
+    """
+    activas = {idh for idh, datos in habitaciones.items() if datos["activo"]}
+    vendidas = [0] * (dias + 1)
+    ingresos = [0] * (dias + 1)
+    por_habitacion = {}
+    for _, datos in pares_reservas:
+        hab_id = datos["idhabitacion"]
+        entrada = fecha_a_ordinal(datos["fechaEntrada"])
+        salida = fecha_a_ordinal(datos["fechaSalida"])
+        if hab_id not in activas or entrada is None or salida is None:
+            continue
+        inicio, fin = max(entrada - desde, 0), min(salida - desde, dias)
+        if inicio >= fin:
+            continue
+        valor = monto_noche_en_unidades(habitaciones[hab_id]["precioNoche"], datos["descuento"]) if "precioNoche" in habitaciones[hab_id] else 0
+        diferencias = por_habitacion.get(hab_id)
+        if diferencias is None:
+            diferencias = por_habitacion[hab_id] = {"noches": [0] * (dias + 1), "montos": [0] * (dias + 1)}
+        for serie, cantidad in ((vendidas, 1), (ingresos, valor), (diferencias["noches"], 1), (diferencias["montos"], valor)):
+            serie[inicio] += cantidad
+            serie[fin] -= cantidad
+    return {"activas": len(activas), "vendidas": list(itertools.accumulate(vendidas[:dias])),
+            "ingresos": list(itertools.accumulate(ingresos[:dias])), "habitaciones": por_habitacion}
+
+def sumar_serie_por_mes(serie, inicios, matriz, campo):
+    """Suma a la matriz {habitación: {mes: valor}} los totales por mes ('noches' o 'montos') de una serie que empieza en inicios[0]."""
+    for hab_id, diferencias in serie["habitaciones"].items():
+        if hab_id not in matriz:
+            continue
+        # Suma acumulada de la suma acumulada: el total hasta cada día, y cada mes es una resta
+        totales = [0] + list(itertools.accumulate(itertools.accumulate(diferencias[campo][:-1])))
+        for mes in range(1, 13):
+            matriz[hab_id][mes] += totales[inicios[mes] - inicios[0]] - totales[inicios[mes - 1] - inicios[0]]
 
 #----------------------------------------------------------------------------------------------
 # INFORMES
@@ -1346,7 +5249,7 @@ def informe_tabular_mes(reservas, huespedes, habitaciones):
     print("-" * len(encabezado))
     print(encabezado)
     print("-" * len(encabezado))
-    for rid, datos in reservas.items():
+    for rid, datos in reservas_del_mes_operacion(reservas, mes_actual):
         fecha = datos['fechaHoraOperacion']
         if fecha[5:7] == mes_actual:
             h = huespedes.get(datos["idhuesped"], {"nombre": "-", "apellido": "-"})
@@ -1372,43 +5275,12 @@ def informe_matriz_cantidades(reservas, habitaciones):
         for hab_id, datos in habitaciones.items() if datos["activo"]
     }
     
-    for datos in reservas.values():
-        hab_id = datos["idhabitacion"]
-        if hab_id in matriz:
-            # Usar fechas de entrada y salida reales, no fecha de operación
-            fecha_entrada = datos["fechaEntrada"]
-            fecha_salida = datos["fechaSalida"]
-            
-            if len(fecha_entrada) == 6 and len(fecha_salida) == 6:
-                try:
-                    # Extraer fechas
-                    dia_ent = int(fecha_entrada[:2])
-                    mes_ent = int(fecha_entrada[2:4])
-                    anio_ent = int(fecha_entrada[4:6])
-                    
-                    dia_sal = int(fecha_salida[:2])
-                    mes_sal = int(fecha_salida[2:4])
-                    anio_sal = int(fecha_salida[4:6])
-                    
-                    # Solo procesar si la reserva está en el año solicitado
-                    if (2000 + anio_ent) == anio or (2000 + anio_sal) == anio:
-                        fecha_ent = datetime.datetime(2000 + anio_ent, mes_ent, dia_ent)
-                        fecha_sal = datetime.datetime(2000 + anio_sal, mes_sal, dia_sal)
-                        
-                        # Distribuir las noches por mes
-                        fecha_actual = fecha_ent
-                        while fecha_actual < fecha_sal:
-                            mes_actual = fecha_actual.month
-                            anio_actual = fecha_actual.year
-                            
-                            # Solo contar si está en el año solicitado
-                            if anio_actual == anio:
-                                matriz[hab_id][mes_actual] += 1
-                            
-                            fecha_actual += datetime.timedelta(days=1)
-                except (ValueError, IndexError):
-                    # Si hay error al procesar fechas, continuar con la siguiente reserva
-                    pass
+    # Con el almacén columnar no hace falta recorrer las reservas ni decodificar sus fechas; si no,
+    # las noches de cada mes salen de la serie diaria del año (fechas de estadía, no de operación)
+    if not acumular_matriz_columnar(reservas, habitaciones, anio, matriz, False):
+        inicios = inicios_de_mes(anio)
+        serie = serie_ocupacion(reservas_del_anio(reservas, anio), habitaciones, inicios[0], inicios[12] - inicios[0])
+        sumar_serie_por_mes(serie, inicios, matriz, "noches")
     
     encabezado = f"{'Habitación':<12} |" + ''.join([f" {nombre:>6} |" for nombre in nombres_mes])
     print("-" * len(encabezado))
@@ -1429,53 +5301,18 @@ def informe_matriz_montos(reservas, habitaciones):
         return
     anio = 2000 + int(anio_str)
     nombres_mes = ['Ene','Feb','Mar','Abr','May','Jun','Jul','Ago','Sep','Oct','Nov','Dic']
+    # Montos en diezmilésimos de peso (enteros exactos); se muestran en pesos al imprimir
     matriz = {
-        hab_id: {mes: 0.0 for mes in range(1, 13)} 
+        hab_id: {mes: 0 for mes in range(1, 13)} 
         for hab_id, datos in habitaciones.items() if datos["activo"]
     }
     
-    for datos in reservas.values():
-        hab_id = datos["idhabitacion"]
-        if hab_id in matriz and "precioNoche" in habitaciones[hab_id]:
-            # Usar fechas de entrada y salida reales, no fecha de operación
-            fecha_entrada = datos["fechaEntrada"]
-            fecha_salida = datos["fechaSalida"]
-            
-            if len(fecha_entrada) == 6 and len(fecha_salida) == 6:
-                try:
-                    # Extraer fechas
-                    dia_ent = int(fecha_entrada[:2])
-                    mes_ent = int(fecha_entrada[2:4])
-                    anio_ent = int(fecha_entrada[4:6])
-                    
-                    dia_sal = int(fecha_salida[:2])
-                    mes_sal = int(fecha_salida[2:4])
-                    anio_sal = int(fecha_salida[4:6])
-                    
-                    # Solo procesar si la reserva está en el año solicitado
-                    if (2000 + anio_ent) == anio or (2000 + anio_sal) == anio:
-                        fecha_ent = datetime.datetime(2000 + anio_ent, mes_ent, dia_ent)
-                        fecha_sal = datetime.datetime(2000 + anio_sal, mes_sal, dia_sal)
-                        
-                        # Calcular precio por noche con descuento
-                        precio_noche = habitaciones[hab_id]["precioNoche"]
-                        descuento = datos["descuento"]
-                        precio_con_descuento = precio_noche * (1 - descuento/100)
-                        
-                        # Distribuir las noches por mes
-                        fecha_actual = fecha_ent
-                        while fecha_actual < fecha_sal:
-                            mes_actual = fecha_actual.month
-                            anio_actual = fecha_actual.year
-                            
-                            # Solo contar si está en el año solicitado
-                            if anio_actual == anio:
-                                matriz[hab_id][mes_actual] += precio_con_descuento
-                            
-                            fecha_actual += datetime.timedelta(days=1)
-                except (ValueError, IndexError):
-                    # Si hay error al procesar fechas, continuar con la siguiente reserva
-                    pass
+    # Con el almacén columnar no hace falta recorrer las reservas ni decodificar sus fechas; si no,
+    # lo facturado en cada mes sale de la serie diaria del año (precio por noche con descuento)
+    if not acumular_matriz_columnar(reservas, habitaciones, anio, matriz, True):
+        inicios = inicios_de_mes(anio)
+        serie = serie_ocupacion(reservas_del_anio(reservas, anio), habitaciones, inicios[0], inicios[12] - inicios[0])
+        sumar_serie_por_mes(serie, inicios, matriz, "montos")
     
     encabezado = f"{'Hab':<8}|" + ''.join([f"{nombre:>8}|" for nombre in nombres_mes])
     print("-" * len(encabezado))
@@ -1483,18 +5320,14 @@ def informe_matriz_montos(reservas, habitaciones):
     print("-" * len(encabezado))
     for hab_id, meses in matriz.items():
         num_hab = habitaciones.get(hab_id, {}).get('numero', hab_id)
-        linea = f"{str(num_hab):<8}|" + ''.join([f"${int(meses[mes]):7}|" for mes in range(1, 13)])
+        linea = f"{str(num_hab):<8}|" + ''.join([f"${meses[mes] // UNIDADES_POR_PESO:7}|" for mes in range(1, 13)])
         print(linea)
     print("-" * len(encabezado))
 
 def informe_a_eleccion(reservas, huespedes, habitaciones):
     """Informe a elección: cantidad de reservas por huésped activo, con formato tabular alineado."""
     print("\n--- Informe: Cantidad de reservas por huésped activo ---")
-    conteo = {idh: 0 for idh, datos in huespedes.items() if datos["activo"]}
-    for datos in reservas.values():
-        h = datos["idhuesped"]
-        if h in conteo:
-            conteo[h] += 1
+    conteo = contar_reservas_por_huesped(reservas, [idh for idh, datos in huespedes.items() if datos["activo"]])
     encabezado = f"{'ID':<5} {'Nombre':<20} {'Reservas':<8}"
     print("-" * len(encabezado))
     print(encabezado)
@@ -1504,9 +5337,94 @@ def informe_a_eleccion(reservas, huespedes, habitaciones):
         print(f"{idh:<5} {nombre:<20} {cant:<8}")
     print("-" * len(encabezado))
 
+def informe_disponibilidad(reservas, habitaciones):
+    """Informe de planificación: habitaciones libres por tipo y por piso en cada noche de los próximos días y racha libre más larga."""
+    print(f"\n--- Disponibilidad de los próximos {DIAS_PLANIFICACION} días ---")
+    hoy = datetime.date.today()
+    desde = hoy.toordinal()
+    inicio = time.perf_counter()
+    ids, matriz = matriz_ocupacion(reservas_del_rango(reservas, desde, desde + DIAS_PLANIFICACION), habitaciones, desde, DIAS_PLANIFICACION)
+    if not ids:
+        print("❌ No hay habitaciones activas.")
+        return
+    por_tipo = libres_por_grupo(ids, matriz, habitaciones, "tipo", DIAS_PLANIFICACION)
+    por_piso = libres_por_grupo(ids, matriz, habitaciones, "piso", DIAS_PLANIFICACION)
+    rachas = rachas_libres_mas_largas(ids, matriz, DIAS_PLANIFICACION)
+    demora = (time.perf_counter() - inicio) * 1000
+    
+    tipos = [tipo for tipo in TIPOS_HABITACION if tipo in por_tipo]
+    pisos = sorted(por_piso)
+    encabezado = f"{'Fecha':<8} |" + ''.join([f" {tipo:>8} |" for tipo in tipos]) + ''.join([f" {'Piso ' + str(piso):>7} |" for piso in pisos])
+    print("-" * len(encabezado))
+    print(encabezado)
+    print("-" * len(encabezado))
+    for dia in range(DIAS_PLANIFICACION):
+        fecha = (hoy + datetime.timedelta(days=dia)).strftime("%d%m%y")
+        print(f"{fecha:<8} |" + ''.join([f" {por_tipo[tipo][dia]:8} |" for tipo in tipos]) + ''.join([f" {por_piso[piso][dia]:7} |" for piso in pisos]))
+    print("-" * len(encabezado))
+    
+    print("\nRacha libre más larga por habitación:")
+    encabezado = f"{'ID':<12} | {'Nro':<8} | {'Tipo':<10} | {'Noches':>6} | {'Desde':<8} | {'Hasta':<8}"
+    print("-" * len(encabezado))
+    print(encabezado)
+    print("-" * len(encabezado))
+    for idh in ids:
+        noches, primera = rachas[idh]
+        if primera is None:
+            fecha_desde, fecha_hasta = "-", "-"
+        else:
+            fecha_desde = (hoy + datetime.timedelta(days=primera)).strftime("%d%m%y")
+            fecha_hasta = (hoy + datetime.timedelta(days=primera + noches)).strftime("%d%m%y")
+        print(f"{idh:<12} | {str(habitaciones[idh]['numero']):<8} | {habitaciones[idh]['tipo']:<10} | {noches:>6} | {fecha_desde:<8} | {fecha_hasta:<8}")
+    print("-" * len(encabezado))
+    motor = "NumPy" if numpy is not None else "Python (sin NumPy)"
+    print(f"📋 {len(ids)} habitaciones × {DIAS_PLANIFICACION} noches calculadas con {motor} en {demora:.1f} ms")
+
+def informe_serie_diaria(reservas, habitaciones):
+    """Informe de ocupación diaria del hotel: habitaciones vendidas, porcentaje de ocupación e ingresos de cada noche del año."""
+    print("\n--- Serie diaria de ocupación e ingresos ---")
+    anio_str = input("Ingrese el año para el informe (AA, ej: 25, 26, 27): ").strip()
+    if not (anio_str.isdigit() and len(anio_str) == 2 and anio_str in ["25", "26", "27"]):
+        print("❌ Año inválido. Solo se permiten 25, 26 o 27.")
+        return
+    anio = 2000 + int(anio_str)
+    inicios = inicios_de_mes(anio)
+    dias = inicios[12] - inicios[0]
+    inicio = time.perf_counter()
+    serie = serie_ocupacion(reservas_del_anio(reservas, anio), habitaciones, inicios[0], dias)
+    demora = (time.perf_counter() - inicio) * 1000
+    if serie["activas"] == 0:
+        print("❌ No hay habitaciones activas.")
+        return
+    
+    encabezado = f"{'Fecha':<8} | {'Vendidas':>8} | {'Ocupación':>9} | {'Ingresos':>14}"
+    lineas = [f"Ocupación diaria del año {anio} ({serie['activas']} habitaciones activas)", "-" * len(encabezado), encabezado, "-" * len(encabezado)]
+    for dia in range(dias):
+        fecha = datetime.date.fromordinal(inicios[0] + dia).strftime("%d%m%y")
+        ocupacion = serie["vendidas"][dia] * 100 / serie["activas"]
+        ingresos = serie["ingresos"][dia] / UNIDADES_POR_PESO
+        lineas.append(f"{fecha:<8} | {serie['vendidas'][dia]:8} | {ocupacion:8.1f}% | ${ingresos:13.2f}")
+    lineas.append("-" * len(encabezado))
+    vendidas = sum(serie["vendidas"])
+    ocupacion = vendidas * 100 / (serie["activas"] * dias)
+    lineas.append(f"{'Total':<8} | {vendidas:8} | {ocupacion:8.1f}% | ${sum(serie['ingresos']) / UNIDADES_POR_PESO:13.2f}")
+    lineas.append("-" * len(encabezado))
+    contenido = "\n".join(lineas)
+    print(contenido)
+    print(f"📋 {dias} noches calculadas en {demora:.1f} ms")
+    
+    if input("¿Desea exportar el informe a un archivo? (s/n): ").strip().lower() == "s":
+        exportar_informe_a_archivo(contenido + "\n", f"ocupacion_diaria_{anio}")
+
 def migrar_reservas_ddmmaa(reservas):
-    """Agrega el año '25' a las fechas de reservas antiguas en formato DDMM y elimina reservas con fechas inválidas."""
-    for datos in reservas.values():
+    """
+    Agrega el año '25' a las fechas de reservas antiguas en formato DDMM y elimina reservas con fechas
+    inválidas. Si algo cambió, descarta los índices armados sobre las reservas y guarda los cambios.
+    """
+    migradas = []
+    for rid, datos in reservas.items():
+        if len(datos["fechaEntrada"]) == 4 or len(datos["fechaSalida"]) == 4:
+            migradas.append(rid)
         if len(datos["fechaEntrada"]) == 4:
             datos["fechaEntrada"] += "25"
         if len(datos["fechaSalida"]) == 4:
@@ -1516,24 +5434,9 @@ def migrar_reservas_ddmmaa(reservas):
     reservas_invalidas = []
     for rid, datos in reservas.items():
         fecha_invalida = False
-        try:
-            # Validar fecha de entrada
-            if len(datos["fechaEntrada"]) == 6:
-                dia = int(datos["fechaEntrada"][:2])
-                mes = int(datos["fechaEntrada"][2:4])
-                anio = int(datos["fechaEntrada"][4:6])
-                if not es_fecha_valida(dia, mes, 2000 + anio):
-                    fecha_invalida = True
-            
-            # Validar fecha de salida
-            if len(datos["fechaSalida"]) == 6 and not fecha_invalida:
-                dia = int(datos["fechaSalida"][:2])
-                mes = int(datos["fechaSalida"][2:4])
-                anio = int(datos["fechaSalida"][4:6])
-                if not es_fecha_valida(dia, mes, 2000 + anio):
-                    fecha_invalida = True
-        except (ValueError, IndexError):
-            fecha_invalida = True
+        for campo in ("fechaEntrada", "fechaSalida"):
+            if len(datos[campo]) == 6 and fecha_a_ordinal(datos[campo]) is None:
+                fecha_invalida = True
         
         if fecha_invalida:
             reservas_invalidas.append(rid)
@@ -1545,44 +5448,23 @@ def migrar_reservas_ddmmaa(reservas):
     
     if reservas_invalidas:
         print(f"⚠️  Se removieron {len(reservas_invalidas)} reservas con fechas inválidas después de la migración.")
+    if migradas or reservas_invalidas:
+        # Las reservas se cambiaron en el lugar: sus índices ya no corresponden, y al guardarlas
+        # se ponen al día el almacén, los backups y (por la firma del archivo) el almacén columnar
+        descartar_indices(reservas)
+        guardar_reservas(reservas, ARCHIVO_RESERVAS, sorted(set(migradas + reservas_invalidas)))
     return reservas
 
 def validar_fecha(fecha_str):
     """Valida que la fecha tenga formato DDMMAA y sea válida."""
-    if len(fecha_str) != 6:
-        return False
-    
-    try:
-        dia = int(fecha_str[:2])
-        mes = int(fecha_str[2:4])
-        anio = int(fecha_str[4:6])
-        
-        # Validar que el año esté en el rango permitido
-        if anio not in [25, 26, 27]:
-            return False
-        
-        # Validar que la fecha sea válida
-        return es_fecha_valida(dia, mes, 2000 + anio)
-    except ValueError:
-        return False
+    # La tabla de fechas contiene exactamente las fechas válidas de los años permitidos (25 a 27)
+    return fecha_str in ORDINALES_DDMMAA
 
 def fecha_salida_posterior(fecha_entrada, fecha_salida):
     """Valida que la fecha de salida sea posterior a la de entrada."""
-    try:
-        dia_ent = int(fecha_entrada[:2])
-        mes_ent = int(fecha_entrada[2:4])
-        anio_ent = int(fecha_entrada[4:6])
-        
-        dia_sal = int(fecha_salida[:2])
-        mes_sal = int(fecha_salida[2:4])
-        anio_sal = int(fecha_salida[4:6])
-        
-        fecha_ent = datetime.datetime(2000 + anio_ent, mes_ent, dia_ent)
-        fecha_sal = datetime.datetime(2000 + anio_sal, mes_sal, dia_sal)
-        
-        return fecha_sal > fecha_ent
-    except ValueError:
-        return False
+    entrada = fecha_a_ordinal(fecha_entrada)
+    salida = fecha_a_ordinal(fecha_salida)
+    return entrada is not None and salida is not None and salida > entrada
 
 #----------------------------------------------------------------------------------------------
 # MENÚS
@@ -1612,6 +5494,10 @@ def mostrar_ayuda_huespedes():
     print("│ • Las eliminaciones son lógicas (no se borran físicamente)   │")
     print("│ • Se puede reactivar huéspedes inactivos al modificarlos     │")
     print("│ • Los medios de pago se normalizan automáticamente           │")
+    print("│ • Buscar acepta nombre, apellido, DNI o email (o una parte), │")
+    print("│   sin distinguir acentos; los mejores resultados primero     │")
+    print("│ • Si no hay coincidencias, muestra nombres y apellidos       │")
+    print("│   parecidos (errores de tipeo: Fernandes → Fernández)        │")
     print("└──────────────────────────────────────────────────────────────┘")
     print("\n" + "=" * 70)
     print("✅ Para más información, consulte la documentación del sistema")
@@ -1634,7 +5520,7 @@ def menu_huespedes():
         elif sub == "2":
             modificar_huesped()
         elif sub == "3":
-            eliminar_huesped()
+            ejecutar_midiendo_lectura("eliminar_huesped", eliminar_huesped)
         elif sub == "4":
             listar_huespedes_activos()
         elif sub == "5":
@@ -1691,7 +5577,7 @@ def menu_habitaciones():
         elif sub == "2":
             modificar_habitacion()
         elif sub == "3":
-            eliminar_habitacion()
+            ejecutar_midiendo_lectura("eliminar_habitacion", eliminar_habitacion)
         elif sub == "4":
             listar_habitaciones_activas()
         elif sub == "5":
@@ -1720,11 +5606,25 @@ def mostrar_ayuda_reservas():
     print("\n💡 NOTAS:")
     print("┌──────────────────────────────────────────────────────────────┐")
     print("│ • Solo se permiten reservas entre 2025-2027                  │")
-    print("│ • No se permiten reservas en fechas pasadas                  │")
+    print("│ • La habitación queda Ocupada al registrar o importar solo   │")
+    print("│   si la estadía incluye la noche de hoy (entrada ≤ hoy <     │")
+    print("│   salida), también si empezó antes; las futuras las marca la │")
+    print("│   conciliación cuando llega su fecha                         │")
     print("│ • No se permiten solapamientos de fechas                     │")
     print("│ • Los IDs se generan automáticamente                         │")
     print("│ • Las noches se calculan automáticamente                     │")
+    print("│ • Si un ID no existe se sugieren huéspedes cuyo ID, apellido │")
+    print("│   o DNI empieza así y habitaciones por ID o número; se elige │")
+    print("│   una escribiendo #n (por ejemplo, #1)                       │")
     print("│ • El precio final incluye descuentos aplicados               │")
+    print("│ • Buscar disponibles lista las habitaciones libres en un     │")
+    print("│   rango de fechas, de todos los tipos o de uno solo (sin las │")
+    print("│   que están en mantenimiento)                                │")
+    print("│ • Importar toma un CSV o JSON Lines con idhuesped,           │")
+    print("│   idhabitacion, fechaEntrada, fechaSalida y descuento; cada  │")
+    print("│   fila se valida como una reserva manual                     │")
+    print("│ • Asignar habitaciones toma solicitudes con idhuesped, tipo, │")
+    print("│   fechas y descuento, y elige la habitación de cada una      │")
     print("└──────────────────────────────────────────────────────────────┘")
     print("\n" + "=" * 70)
     print("✅ Para más información, consulte la documentación del sistema")
@@ -1736,25 +5636,31 @@ def menu_reservas():
         print("\n🏨 GESTIÓN DE RESERVAS")
         print("[1] Registrar reserva")
         print("[2] Listar reservas")
-        print("[3] Ayuda")
+        print("[3] Buscar habitaciones disponibles")
+        print("[4] Importar reservas desde archivo (CSV o JSON Lines)")
+        print("[5] Asignar habitaciones a solicitudes de un archivo")
+        print("[6] Ayuda")
         print("[0] Volver al menú principal")
-        sub = input_opciones("Opción: ", ["1", "2", "3", "0"])
+        sub = input_opciones("Opción: ", ["1", "2", "3", "4", "5", "6", "0"])
         if sub == "1":
-            registrar_reserva()
+            ejecutar_midiendo_lectura("registrar_reserva", registrar_reserva)
         elif sub == "2":
             # Para listar reservas, primero cargar los datos actualizados
             try:
-                with open(ARCHIVO_RESERVAS, 'r', encoding='utf-8') as f:
-                    reservas = json.load(f)
-                with open(ARCHIVO_HUESPEDES, 'r', encoding='utf-8') as f:
-                    huespedes = json.load(f)
-                with open(ARCHIVO_HABITACIONES, 'r', encoding='utf-8') as f:
-                    habitaciones = json.load(f)
+                reservas = None if reservas_en_flujo() else cargar_archivo(ARCHIVO_RESERVAS)
+                huespedes = cargar_archivo(ARCHIVO_HUESPEDES)
+                habitaciones = cargar_archivo(ARCHIVO_HABITACIONES)
             except Exception as e:
                 print(f"❌ Error al cargar datos: {e}")
             else:
-                listar_reservas(reservas, huespedes, habitaciones)
+                ejecutar_informe(listar_reservas, reservas, huespedes, habitaciones)
         elif sub == "3":
+            buscar_disponibilidad()
+        elif sub == "4":
+            menu_importar_reservas()
+        elif sub == "5":
+            menu_asignar_habitaciones()
+        elif sub == "6":
             mostrar_ayuda_reservas()
         elif sub == "0":
             break
@@ -1804,6 +5710,22 @@ def mostrar_ayuda_informes():
     print("   │ • Útil para análisis de clientes frecuentes     │")
     print("   └─────────────────────────────────────────────────┘")
     
+    print("\n🔹 5. DISPONIBILIDAD DE LOS PRÓXIMOS DÍAS")
+    print("   ┌─────────────────────────────────────────────────┐")
+    print("   │ • Habitaciones libres por tipo y por piso       │")
+    print("   │ • Una fila por noche desde hoy                  │")
+    print("   │ • Racha libre más larga de cada habitación      │")
+    print("   │ • Usa NumPy si está instalado (más rápido)      │")
+    print("   └─────────────────────────────────────────────────┘")
+    
+    print("\n🔹 6. SERIE DIARIA DE OCUPACIÓN E INGRESOS")
+    print("   ┌─────────────────────────────────────────────────┐")
+    print("   │ • Una fila por noche del año elegido            │")
+    print("   │ • Habitaciones vendidas, % de ocupación e       │")
+    print("   │   ingresos de la noche, con totales del año     │")
+    print("   │ • Se puede exportar a un archivo de texto       │")
+    print("   └─────────────────────────────────────────────────┘")
+    
     print("\n💡 CONSEJOS DE USO:")
     print("─" * 30)
     print("   • Los informes se generan en tiempo real")
@@ -1823,22 +5745,96 @@ def menu_informes(reservas, huespedes, habitaciones):
         print("[2] Resumen anual de cantidad de noches por habitación")
         print("[3] Resumen anual de montos totales por habitación")
         print("[4] Informe a elección del equipo")
-        print("[5] Ayuda")
+        print(f"[5] Disponibilidad de los próximos {DIAS_PLANIFICACION} días")
+        print("[6] Serie diaria de ocupación e ingresos")
+        print("[7] Ayuda")
         print("[0] Volver al menú principal")
-        op = input_opciones("Opción: ", ["1", "2", "3", "4", "5", "0"])
+        op = input_opciones("Opción: ", ["1", "2", "3", "4", "5", "6", "7", "0"])
         if op == "1":
-            informe_tabular_mes(reservas, huespedes, habitaciones)
+            ejecutar_informe(informe_tabular_mes, reservas, huespedes, habitaciones)
         elif op == "2":
-            informe_matriz_cantidades(reservas, habitaciones)
+            ejecutar_informe(informe_matriz_cantidades, reservas, habitaciones, por_anio=True)
         elif op == "3":
-            informe_matriz_montos(reservas, habitaciones)
+            ejecutar_informe(informe_matriz_montos, reservas, habitaciones, por_anio=True)
         elif op == "4":
-            informe_a_eleccion(reservas, huespedes, habitaciones)
+            ejecutar_informe(informe_a_eleccion, reservas, huespedes, habitaciones)
         elif op == "5":
+            ejecutar_informe(informe_disponibilidad, reservas, habitaciones, por_anio=True)
+        elif op == "6":
+            ejecutar_informe(informe_serie_diaria, reservas, habitaciones, por_anio=True)
+        elif op == "7":
             mostrar_ayuda_informes()
         elif op == "0":
             break
 
+def mostrar_ayuda_mantenimiento():
+    """Muestra ayuda contextual para las tareas de mantenimiento."""
+    print("\n" + "=" * 70)
+    print("🛠️ CENTRO DE AYUDA - MANTENIMIENTO")
+    print("=" * 70)
+    print("\n📋 TAREAS DISPONIBLES:")
+    print("┌──────────────────────────────────────────────────────────────┐")
+    print("│ • Estadísticas: archivos en memoria y relecturas evitadas    │")
+    print("│ • Compactar diario: vuelca las reservas nuevas del diario    │")
+    print("│   a reservas.json y habitaciones.json (también al salir)     │")
+    print("│ • Restaurar: reconstruye un archivo al estado de una fecha   │")
+    print("│   y hora aplicando sus backups incrementales (.bak)          │")
+    print("│ • Importar a SQLite: copia los JSON a la base hotel.db; se   │")
+    print("│   usa con MOTOR_ALMACENAMIENTO = \"sqlite\"                    │")
+    print("│ • Convertir reservas: reservas.json ⇄ reservas.jsonl (una    │")
+    print("│   reserva por línea; los informes la leen en flujo)          │")
+    print("│ • Verificar integridad: reservas con huésped o habitación    │")
+    print("│   inexistente, fechas inválidas y estadías solapadas         │")
+    print("│ • Conciliar: finaliza las reservas cuya salida ya llegó y    │")
+    print("│   marca cada habitación Ocupada o Disponible según hoy       │")
+    print("│   (también se hace sola al iniciar y cada pocos minutos)     │")
+    print("│ • Validar archivo: revisa un JSON, JSONL o CSV de huéspedes  │")
+    print("│   o habitaciones con las reglas del alta, en varios procesos │")
+    print("│   si es grande, e informa los errores de cada registro       │")
+    print("└──────────────────────────────────────────────────────────────┘")
+    print("\n" + "=" * 70)
+    print("✅ Para más información, consulte la documentación del sistema")
+    print("=" * 70)
+
+def menu_mantenimiento():
+    """Menú de tareas de mantenimiento de los datos del sistema."""
+    while True:
+        print("\n🛠️ MANTENIMIENTO")
+        print("[1] Estadísticas del almacén en memoria")
+        print("[2] Compactar diario de reservas")
+        print("[3] Restaurar archivo desde backups")
+        print("[4] Importar archivos JSON a SQLite")
+        print("[5] Convertir reservas entre JSON y JSON Lines")
+        print("[6] Verificar integridad de los datos")
+        print("[7] Conciliar reservas y estados de habitaciones")
+        print("[8] Validar un archivo de huéspedes o habitaciones")
+        print("[9] Ayuda")
+        print("[0] Volver al menú principal")
+        op = input_opciones("Opción: ", ["1", "2", "3", "4", "5", "6", "7", "8", "9", "0"])
+        if op == "1":
+            mostrar_estadisticas_almacen()
+        elif op == "2":
+            if os.path.exists(ARCHIVO_DIARIO_RESERVAS):
+                compactar_diario()
+            else:
+                print("✅ El diario de reservas está vacío.")
+        elif op == "3":
+            menu_restaurar_backup()
+        elif op == "4":
+            importar_json_a_sqlite()
+        elif op == "5":
+            menu_convertir_formato_reservas()
+        elif op == "6":
+            verificar_integridad_datos()
+        elif op == "7":
+            conciliar_reservas()
+        elif op == "8":
+            menu_validar_registros()
+        elif op == "9":
+            mostrar_ayuda_mantenimiento()
+        elif op == "0":
+            break
+
 #----------------------------------------------------------------------------------------------
 # CUERPO PRINCIPAL
 #----------------------------------------------------------------------------------------------
@@ -1886,16 +5882,20 @@ def main():
             "fechaHoraOperacion": fecha_hora
         }
     """
+    # Las reservas vencidas y el estado de las habitaciones se ponen al día antes de operar
+    conciliar_reservas(informar=False)
     while True:
+        conciliar_si_corresponde()
         print("\n🏨 MENÚ PRINCIPAL")
         print("=" * 40)
         print("[1] Gestión de Huéspedes")
         print("[2] Gestión de Habitaciones")
         print("[3] Gestión de Reservas")
         print("[4] Informes")
+        print("[5] Mantenimiento")
         print("[0] Salir")
         print("=" * 40)
-        op = input_opciones("Opción: ", ["1", "2", "3", "4", "0"])
+        op = input_opciones("Opción: ", ["1", "2", "3", "4", "5", "0"])
         if op == "1":
             menu_huespedes()
         elif op == "2":
@@ -1903,12 +5903,9 @@ def main():
         elif op == "3":
             # Leer datos actualizados de los archivos antes de operar
             try:
-                with open(ARCHIVO_HUESPEDES, 'r', encoding='utf-8') as f:
-                    huespedes = json.load(f)
-                with open(ARCHIVO_HABITACIONES, 'r', encoding='utf-8') as f:
-                    habitaciones = json.load(f)
-                with open(ARCHIVO_RESERVAS, 'r', encoding='utf-8') as f:
-                    reservas = json.load(f)
+                huespedes = cargar_archivo(ARCHIVO_HUESPEDES)
+                habitaciones = cargar_archivo(ARCHIVO_HABITACIONES)
+                reservas = cargar_archivo(ARCHIVO_RESERVAS)
                 reservas = migrar_reservas_ddmmaa(reservas)
             except FileNotFoundError as e:
                 print("❌ Error: No se encontraron los archivos JSON necesarios.")
@@ -1925,12 +5922,11 @@ def main():
                 menu_reservas()
         elif op == "4":
             try:
-                with open(ARCHIVO_HUESPEDES, 'r', encoding='utf-8') as f:
-                    huespedes = json.load(f)
-                with open(ARCHIVO_HABITACIONES, 'r', encoding='utf-8') as f:
-                    habitaciones = json.load(f)
-                with open(ARCHIVO_RESERVAS, 'r', encoding='utf-8') as f:
-                    reservas = json.load(f)
+                huespedes = cargar_archivo(ARCHIVO_HUESPEDES)
+                habitaciones = cargar_archivo(ARCHIVO_HABITACIONES)
+                # Con reservas.jsonl cada informe recorre el archivo en flujo y con particiones
+                # cada informe lee solo lo que necesita (None = no cargar todas las reservas)
+                reservas = None if reservas_en_flujo() or reservas_particionadas() else cargar_archivo(ARCHIVO_RESERVAS)
             except FileNotFoundError as e:
                 print("❌ Error: No se encontraron los archivos JSON necesarios.")
                 print("💡 Ejecute primero el script de conversión para generar los archivos de datos:")
@@ -1943,7 +5939,10 @@ def main():
                 print("💡 Los archivos JSON pueden estar corruptos")
             else:
                 menu_informes(reservas, huespedes, habitaciones)
+        elif op == "5":
+            menu_mantenimiento()
         elif op == "0":
+            compactar_diario()
             print("\n" + "=" * 60)
             print("👋 ¡Gracias por usar el Sistema de Gestión Hotelera!")
             print("Desarrollado por: Equipo 5 - Programación 1 (Viernes async)")
@@ -1958,19 +5957,13 @@ def validar_id_unico_habitacion(habitaciones, idh):
     """Valida que el ID de la habitación sea único."""
     return idh not in habitaciones
 
-def validar_numero_habitacion_unico(habitaciones, numero):
-    """Valida que el número de habitación sea único."""
-    for datos in habitaciones.values():
-        if datos["activo"] and datos["numero"] == numero:
-            return False
-    return True
+def validar_numero_habitacion_unico(habitaciones, numero, id_excluir=None):
+    """Valida que el número de habitación sea único entre habitaciones activas."""
+    return registro_con_clave("habitaciones", habitaciones, "numero", numero, id_excluir) is None
 
-def validar_dni_unico(huespedes, dni):
+def validar_dni_unico(huespedes, dni, id_excluir=None):
     """Valida que el DNI sea único entre huéspedes activos."""
-    for datos in huespedes.values():
-        if datos["activo"] and datos["documento"] == dni:
-            return False
-    return True
+    return registro_con_clave("huespedes", huespedes, "documento", dni, id_excluir) is None
 
 def validar_id_habitacion(idh):
     """Valida que el ID de la habitación tenga entre 2 y 6 caracteres."""
@@ -0,0 +1,85 @@
+import importlib.util
+import json
+import os
+
+import pytest
+
+CARPETA_PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def cargar_script(nombre, archivo):
+    """Importa un script del proyecto como un módulo nuevo, con su propio estado."""
+    spec = importlib.util.spec_from_file_location(nombre, os.path.join(CARPETA_PROYECTO, archivo))
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def cargar_terminal(nombre):
+    """Importa Entrega2.py como un módulo nuevo: cada importación hace de una terminal con su propio estado."""
+    return cargar_script(nombre, "Entrega2.py")
+
+
+def escribir_json(archivo, datos):
+    with open(archivo, mode='w', encoding='utf-8') as f:
+        json.dump(datos, f, ensure_ascii=False, indent=4)
+
+
+def leer_json(archivo):
+    with open(archivo, mode='r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def backups_de(hotel, archivo):
+    contenidos = []
+    for marca, ruta in hotel.listar_backups(archivo):
+        with open(ruta, mode='r', encoding='utf-8') as f:
+            contenidos.append(json.load(f))
+    return contenidos
+
+
+def huesped(nombre, apellido, documento, email, telefono):
+    return {"activo": True, "nombre": nombre, "apellido": apellido, "documento": documento,
+            "email": email, "telefono": telefono, "mediosDePago": ["Efectivo"]}
+
+
+def habitacion(numero, precio, estado="Disponible"):
+    return {"activo": True, "numero": numero, "tipo": "Doble", "descripcion": "Vista al mar", "piso": 1,
+            "estado": estado, "precioNoche": precio, "serviciosIncluidos": ["WiFi"]}
+
+
+def reserva(idhuesped, idhabitacion, entrada, salida, noches, precio):
+    return {"idhuesped": idhuesped, "idhabitacion": idhabitacion, "fechaEntrada": entrada, "fechaSalida": salida,
+            "cantidadNoches": noches, "descuento": 0, "precioNoche": precio, "precioFinal": precio * noches,
+            "fechaHoraOperacion": "2025.12.01 - 10:00:00"}
+
+
+@pytest.fixture
+def carpeta(tmp_path, monkeypatch):
+    """Carpeta de trabajo con pocos huéspedes, habitaciones y reservas en formato JSON."""
+    monkeypatch.chdir(tmp_path)
+    escribir_json("huespedes.json", {
+        "H1": huesped("Ana", "Pérez", 30111222, "ana@mail.com", 1155550001),
+        "H2": huesped("Luis", "Gómez", 30111333, "luis@mail.com", 1155550002),
+    })
+    escribir_json("habitaciones.json", {
+        "HAB1": habitacion(101, 100.0),
+        "HAB2": habitacion(102, 150.0),
+    })
+    escribir_json("reservas.json", {
+        "RSV001ABC": reserva("H1", "HAB1", "010326", "040326", 3, 100.0),
+        "RSV002ABC": reserva("H2", "HAB2", "100326", "120326", 2, 150.0),
+    })
+    return tmp_path
+
+
+@pytest.fixture
+def hotel(carpeta):
+    """Una terminal del sistema trabajando sobre la carpeta de prueba."""
+    return cargar_terminal("terminal_a")
+
+
+@pytest.fixture
+def otra_terminal(carpeta):
+    """Una segunda terminal sobre la misma carpeta, con su propio estado en memoria."""
+    return cargar_terminal("terminal_b")
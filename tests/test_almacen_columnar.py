@@ -0,0 +1,162 @@
+import pytest
+
+from conftest import escribir_json, leer_json, reserva
+
+
+def reescribir_reservas(hotel, reservas):
+    """Guarda las reservas como lo haría otra terminal: archivo nuevo y versión siguiente."""
+    escribir_json("reservas.json", reservas)
+    hotel.incrementar_version("reservas.json")
+
+
+def reconstruccion_prohibida(*argumentos):
+    raise AssertionError("se recorrieron todas las reservas para sincronizar el almacén")
+
+
+def filas_del_almacen(hotel):
+    """Filas del almacén como {huella del ID: {columna: valor}}."""
+    metadatos = hotel.leer_metadatos_columnar()
+    columnas = hotel.abrir_columnas_reservas(metadatos)
+    try:
+        vistas = [columnas[nombre][1].tolist() for nombre in hotel.COLUMNAS_RESERVAS]
+    finally:
+        hotel.cerrar_columnas_reservas(columnas)
+    return {fila[0]: dict(zip(hotel.COLUMNAS_RESERVAS, fila)) for fila in zip(*vistas)}
+
+
+def noches_por_mes(hotel, anio):
+    habitaciones = hotel.cargar_archivo("habitaciones.json")
+    matriz = {hab_id: {mes: 0 for mes in range(1, 13)} for hab_id in habitaciones}
+    assert hotel.acumular_matriz_columnar(hotel.cargar_archivo("reservas.json"), habitaciones, anio, matriz, False)
+    return matriz
+
+
+def test_el_almacen_se_reconstruye_si_el_archivo_cambia_por_otro_medio(hotel):
+    assert noches_por_mes(hotel, 2026)["HAB1"][3] == 3
+
+    reservas = leer_json("reservas.json")
+    reservas["RSV001ABC"].update(fechaEntrada="010626", fechaSalida="050626", cantidadNoches=4)
+    reescribir_reservas(hotel, reservas)
+
+    matriz = noches_por_mes(hotel, 2026)
+    assert matriz["HAB1"][3] == 0
+    assert matriz["HAB1"][6] == 4
+
+
+def test_el_almacen_se_reconstruye_si_una_reserva_cambia_de_habitacion_o_se_elimina(hotel):
+    noches_por_mes(hotel, 2026)
+    reservas = leer_json("reservas.json")
+    reservas["RSV001ABC"]["idhabitacion"] = "HAB2"
+    del reservas["RSV002ABC"]
+    reescribir_reservas(hotel, reservas)
+
+    matriz = noches_por_mes(hotel, 2026)
+    assert matriz["HAB1"][3] == 0
+    assert matriz["HAB2"][3] == 3
+
+
+def test_las_reservas_nuevas_de_otro_medio_tambien_se_ven(hotel):
+    noches_por_mes(hotel, 2026)
+    reservas = leer_json("reservas.json")
+    reservas["RSV003ABC"] = dict(reservas["RSV001ABC"], fechaEntrada="280326", fechaSalida="020426", cantidadNoches=5)
+    reescribir_reservas(hotel, reservas)
+
+    matriz = noches_por_mes(hotel, 2026)
+    assert (matriz["HAB1"][3], matriz["HAB1"][4]) == (3 + 4, 1)
+    assert hotel.leer_metadatos_columnar()["filas"] == 3
+
+
+def test_los_montos_coinciden_con_el_recorrido_de_las_reservas(hotel):
+    habitaciones = hotel.cargar_archivo("habitaciones.json")
+    reservas = hotel.cargar_archivo("reservas.json")
+    columnar = {hab_id: {mes: 0 for mes in range(1, 13)} for hab_id in habitaciones}
+    assert hotel.acumular_matriz_columnar(reservas, habitaciones, 2026, columnar, True)
+    recorrido = {hab_id: {mes: 0 for mes in range(1, 13)} for hab_id in habitaciones}
+    inicios = hotel.inicios_de_mes(2026)
+    serie = hotel.serie_ocupacion(reservas.items(), habitaciones, inicios[0], inicios[12] - inicios[0])
+    hotel.sumar_serie_por_mes(serie, inicios, recorrido, "montos")
+    assert columnar == recorrido
+
+
+@pytest.fixture
+def almacen_al_dia(hotel, monkeypatch):
+    """Almacén sincronizado una vez; desde ahí, sincronizar no puede recorrer todas las reservas."""
+    noches_por_mes(hotel, 2026)
+    monkeypatch.setattr(hotel, "recorrer_reservas", reconstruccion_prohibida)
+    return hotel
+
+
+def test_guardar_una_reserva_modificada_reescribe_solo_su_fila(almacen_al_dia, monkeypatch):
+    hotel = almacen_al_dia
+    reservas = hotel.cargar_archivo("reservas.json")
+    reservas["RSV001ABC"].update(idhabitacion="HAB2", fechaEntrada="010626", fechaSalida="050626", cantidadNoches=4)
+    assert hotel.guardar_reservas(reservas, cambiados=["RSV001ABC"])
+    huellas = []
+    clave_columnar = hotel.clave_columnar
+    def contar_huellas(rid):
+        huellas.append(rid)
+        return clave_columnar(rid)
+    monkeypatch.setattr(hotel, "clave_columnar", contar_huellas)
+
+    matriz = noches_por_mes(hotel, 2026)
+
+    assert (matriz["HAB1"][3], matriz["HAB2"][6], matriz["HAB2"][3]) == (0, 4, 2)
+    assert set(huellas) == {"RSV001ABC"}
+    assert hotel.leer_metadatos_columnar()["filas"] == 2
+
+
+def test_el_diario_la_compactacion_y_las_bajas_se_aplican_sin_reconstruir(almacen_al_dia):
+    hotel = almacen_al_dia
+    reservas = hotel.cargar_archivo("reservas.json")
+    hotel.cargar_archivo("habitaciones.json")
+    reservas["RSV005ABC"] = reserva("H1", "HAB1", "200326", "220326", 2, 100.0)
+    assert hotel.registrar_reserva_en_diario(reservas, "RSV005ABC", "HAB1", "Disponible")
+    assert noches_por_mes(hotel, 2026)["HAB1"][3] == 3 + 2
+
+    # Conciliar anota en el diario las reservas finalizadas: se reescriben solo esas filas
+    reservas["RSV005ABC"]["finalizada"] = True
+    hotel.anotar_en_diario([{"tipo": "reserva", "id": "RSV005ABC", "datos": reservas["RSV005ABC"]}])
+    assert hotel.compactar_diario()
+    del reservas["RSV002ABC"]
+    assert hotel.guardar_reservas(reservas, cambiados=["RSV002ABC"])
+
+    matriz = noches_por_mes(hotel, 2026)
+    assert (matriz["HAB1"][3], matriz["HAB2"][3]) == (3 + 2, 0)
+    metadatos = hotel.leer_metadatos_columnar()
+    assert (metadatos["filas"], metadatos["vacias"]) == (3, 1)
+
+
+def test_las_filas_guardan_huesped_y_precio_por_noche(hotel):
+    noches_por_mes(hotel, 2026)
+    metadatos = hotel.leer_metadatos_columnar()
+    fila = filas_del_almacen(hotel)[hotel.clave_columnar("RSV002ABC")]
+    assert metadatos["huespedes"][fila["huesped"]] == "H2"
+    assert metadatos["habitaciones"][fila["habitacion"]] == "HAB2"
+    assert (fila["descuento"], fila["precio"]) == (0, 150.0)
+
+
+def test_una_restauracion_reconstruye_el_almacen(hotel):
+    noches_por_mes(hotel, 2026)
+    reservas = dict(hotel.cargar_archivo("reservas.json"))
+    del reservas["RSV001ABC"]
+    hotel.escribir_datos(reservas, "reservas.json")
+
+    assert noches_por_mes(hotel, 2026)["HAB1"][3] == 0
+    assert hotel.leer_metadatos_columnar()["vacias"] == 0
+
+
+def test_las_reservas_cambiadas_se_leen_de_reservas_jsonl_sin_decodificar_el_resto(hotel, monkeypatch):
+    reservas = hotel.cargar_archivo("reservas.json")
+    with open("reservas.jsonl", mode='w', encoding='utf-8') as f:
+        for rid, datos in reservas.items():
+            f.write(hotel.linea_jsonl(rid, datos))
+    monkeypatch.setattr(hotel, "ARCHIVO_RESERVAS", "reservas.jsonl")
+    decodificadas = []
+    decodificar = hotel.decodificar_linea_jsonl
+    def contar_decodificadas(linea):
+        decodificadas.append(linea)
+        return decodificar(linea)
+    monkeypatch.setattr(hotel, "decodificar_linea_jsonl", contar_decodificadas)
+
+    assert hotel.reservas_por_id(None, {"RSV002ABC", "RSV009ZZZ"}) == {"RSV002ABC": reservas["RSV002ABC"]}
+    assert len(decodificadas) == 1
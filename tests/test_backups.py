@@ -0,0 +1,75 @@
+from conftest import backups_de, cargar_script, leer_json
+
+
+def test_el_backup_incremental_guarda_solo_las_claves_cambiadas(hotel):
+    huespedes = hotel.cargar_archivo("huespedes.json")
+    huespedes["H1"]["telefono"] = 1144443333
+    assert hotel.guardar_huespedes(huespedes, cambiados=["H1"])
+    del huespedes["H2"]
+    assert hotel.guardar_huespedes(huespedes, cambiados=["H2"])
+
+    base, primero, segundo = backups_de(hotel, "huespedes.json")
+    assert base["tipo"] == "completo" and set(base["cambios"]) == {"H1", "H2"}
+    assert primero["tipo"] == "incremental" and list(primero["cambios"]) == ["H1"] and primero["eliminados"] == []
+    assert segundo["cambios"] == {} and segundo["eliminados"] == ["H2"]
+    assert segundo["incrementales"] == 2
+
+
+def test_guardar_sin_claves_cambiadas_no_compara_con_los_backups(hotel, monkeypatch):
+    huespedes = hotel.cargar_archivo("huespedes.json")
+    assert hotel.guardar_huespedes(huespedes, cambiados=["H1"])
+    def reconstruccion_prohibida(archivo, hasta=None):
+        raise AssertionError("se reconstruyeron los backups al guardar")
+    monkeypatch.setattr(hotel, "reconstruir_desde_backups", reconstruccion_prohibida)
+    huespedes["H2"]["email"] = "luis.gomez@mail.com"
+    assert hotel.guardar_huespedes(huespedes, cambiados=["H2"])
+    assert backups_de(hotel, "huespedes.json")[-1]["cambios"] == {"H2": huespedes["H2"]}
+
+
+def test_cada_tantos_incrementales_se_guarda_un_backup_completo(hotel, monkeypatch):
+    monkeypatch.setattr(hotel, "MAX_BACKUPS_INCREMENTALES", 3)
+    huespedes = hotel.cargar_archivo("huespedes.json")
+    for telefono in range(1100000001, 1100000006):
+        huespedes["H1"]["telefono"] = telefono
+        assert hotel.guardar_huespedes(huespedes, cambiados=["H1"])
+    tipos = [backup["tipo"] for backup in backups_de(hotel, "huespedes.json")]
+    assert tipos == ["completo", "incremental", "incremental", "incremental", "completo", "incremental"]
+    datos, aplicados = hotel.reconstruir_desde_backups("huespedes.json")
+    assert datos == leer_json("huespedes.json")
+    assert aplicados == 2
+
+
+def test_restaurar_vuelve_al_estado_de_una_marca_anterior(hotel, monkeypatch):
+    # Cada backup con su propio segundo, para poder restaurar a una marca intermedia
+    instantes = iter(range(int(hotel.time.time()) + 100, int(hotel.time.time()) + 1000, 10))
+    monkeypatch.setattr(hotel.time, "time", lambda: next(instantes))
+    huespedes = hotel.cargar_archivo("huespedes.json")
+    huespedes["H1"]["nombre"] = "Anabel"
+    assert hotel.guardar_huespedes(huespedes, cambiados=["H1"])
+    marca_intermedia = hotel.listar_backups("huespedes.json")[-1][0]
+    del huespedes["H2"]
+    assert hotel.guardar_huespedes(huespedes, cambiados=["H2"])
+
+    monkeypatch.setattr("builtins.input", lambda mensaje: "s")
+    assert hotel.restaurar_backup("huespedes.json", marca_intermedia)
+    restaurado = leer_json("huespedes.json")
+    assert restaurado["H1"]["nombre"] == "Anabel"
+    assert "H2" in restaurado
+    # La restauración reemplaza el archivo entero: su backup es completo y sirve de base a los siguientes
+    ultimo = backups_de(hotel, "huespedes.json")[-1]
+    assert ultimo["tipo"] == "completo" and ultimo["cambios"] == restaurado
+    assert hotel.cargar_archivo("huespedes.json") == restaurado
+
+
+def test_el_script_de_conversion_deja_una_base_para_los_incrementales(hotel):
+    conversion = cargar_script("conversion", "Conversión_DICCIONARIO_a_ARCHIVO_JSON.py")
+    nuevos = {"H9": dict(leer_json("huespedes.json")["H1"], nombre="Nora")}
+    assert conversion.guardar_archivo_json(nuevos, "huespedes.json", "Huéspedes")
+    tipos = [backup["tipo"] for backup in backups_de(hotel, "huespedes.json")]
+    assert tipos == ["completo", "completo"]
+
+    huespedes = hotel.cargar_archivo("huespedes.json")
+    huespedes["H9"]["telefono"] = 1144443333
+    assert hotel.guardar_huespedes(huespedes, cambiados=["H9"])
+    assert backups_de(hotel, "huespedes.json")[-1]["tipo"] == "incremental"
+    assert hotel.reconstruir_desde_backups("huespedes.json")[0] == leer_json("huespedes.json")
@@ -0,0 +1,59 @@
+from conftest import leer_json
+
+
+def test_guardar_sobre_datos_desactualizados_conserva_los_cambios_de_la_otra_terminal(hotel, otra_terminal):
+    huespedes_a = hotel.cargar_archivo("huespedes.json")
+    huespedes_b = otra_terminal.cargar_archivo("huespedes.json")
+    huespedes_b["H2"]["telefono"] = 1199990000
+    assert otra_terminal.guardar_huespedes(huespedes_b, cambiados=["H2"])
+
+    huespedes_a["H1"]["email"] = "ana.perez@mail.com"
+    assert hotel.esta_desactualizado("huespedes.json", huespedes_a)
+    assert hotel.guardar_huespedes(huespedes_a, cambiados=["H1"])
+
+    en_disco = leer_json("huespedes.json")
+    assert en_disco["H1"]["email"] == "ana.perez@mail.com"
+    assert en_disco["H2"]["telefono"] == 1199990000
+    # El diccionario de la terminal quedó al día en el lugar
+    assert huespedes_a == en_disco
+    assert hotel.ESTADISTICAS_BLOQUEO["escrituras_rebasadas"] == 1
+
+
+def test_rebase_aplica_las_bajas_y_no_pisa_registros_que_no_cambiaron(hotel, otra_terminal):
+    huespedes_a = hotel.cargar_archivo("huespedes.json")
+    huespedes_b = otra_terminal.cargar_archivo("huespedes.json")
+    huespedes_b["H1"]["nombre"] = "Ana María"
+    assert otra_terminal.guardar_huespedes(huespedes_b, cambiados=["H1"])
+
+    del huespedes_a["H2"]
+    assert hotel.guardar_huespedes(huespedes_a, cambiados=["H2"])
+
+    en_disco = leer_json("huespedes.json")
+    assert "H2" not in en_disco
+    assert en_disco["H1"]["nombre"] == "Ana María"
+
+
+def test_rebase_rechaza_una_reserva_nueva_que_se_solapa(hotel, otra_terminal):
+    reservas_a = hotel.cargar_archivo("reservas.json")
+    reservas_b = otra_terminal.cargar_archivo("reservas.json")
+    reservas_b["RSV003ABC"] = dict(reservas_b["RSV001ABC"], fechaEntrada="200326", fechaSalida="250326", cantidadNoches=5)
+    assert otra_terminal.guardar_reservas(reservas_b, cambiados=["RSV003ABC"])
+
+    reservas_a["RSV004ABC"] = dict(reservas_a["RSV001ABC"], fechaEntrada="220326", fechaSalida="240326", cantidadNoches=2)
+    assert hotel.guardar_reservas(reservas_a, cambiados=["RSV004ABC"])
+
+    en_disco = leer_json("reservas.json")
+    assert "RSV003ABC" in en_disco
+    assert "RSV004ABC" not in en_disco
+    assert hotel.ESTADISTICAS_BLOQUEO["reservas_rechazadas"] == 1
+
+
+def test_leer_y_guardar_no_calculan_huellas_de_los_registros(hotel, monkeypatch):
+    def huella_prohibida(texto):
+        raise AssertionError("huella calculada en la lectura o el guardado")
+    monkeypatch.setattr(hotel.hashlib, "sha1", huella_prohibida)
+    huespedes = hotel.cargar_archivo("huespedes.json")
+    huespedes["H1"]["telefono"] = 1144443333
+    assert hotel.guardar_huespedes(huespedes, cambiados=["H1"])
+    hotel.descartar_del_almacen("huespedes.json")
+    assert hotel.cargar_archivo("huespedes.json")["H1"]["telefono"] == 1144443333
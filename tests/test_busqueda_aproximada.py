@@ -0,0 +1,50 @@
+import random
+
+from conftest import huesped
+
+LETRAS = "aeiourstlnmñ"
+
+
+def distancia_por_tabla(a, b):
+    """Levenshtein con la tabla completa de programación dinámica, fila por fila."""
+    anterior = list(range(len(b) + 1))
+    for i, letra_a in enumerate(a, 1):
+        actual = [i]
+        for j, letra_b in enumerate(b, 1):
+            actual.append(min(anterior[j] + 1, actual[j - 1] + 1, anterior[j - 1] + (letra_a != letra_b)))
+        anterior = actual
+    return anterior[-1]
+
+
+def palabra_al_azar(azar, largo_maximo=10):
+    return "".join(azar.choice(LETRAS) for _ in range(azar.randint(0, largo_maximo)))
+
+
+def test_la_distancia_con_vectores_de_bits_coincide_con_la_tabla(hotel):
+    azar = random.Random(42)
+    pares = [(palabra_al_azar(azar), palabra_al_azar(azar)) for _ in range(3000)]
+    # Más largas que 64 letras: los vectores de bits ocupan más de una palabra de máquina
+    pares += [(palabra_al_azar(azar, 150), palabra_al_azar(azar, 150)) for _ in range(50)]
+    pares += [("", ""), ("", "abc"), ("kitten", "sitting"), ("perez", "pérez")]
+    for a, b in pares:
+        assert hotel.distancia_edicion(a, b) == distancia_por_tabla(a, b), (a, b)
+
+
+def test_el_arbol_encuentra_las_mismas_palabras_que_el_recorrido_completo(hotel):
+    azar = random.Random(7)
+    huespedes = {f"H{numero}": huesped(palabra_al_azar(azar, 8) or "ana", palabra_al_azar(azar, 8) or "paz",
+                                       40000000 + numero, f"h{numero}@mail.com", 1100000000 + numero)
+                 for numero in range(400)}
+    arbol = hotel.arbol_nombres_huespedes(huespedes)
+    # Las bajas dejan sus palabras en el árbol, pero no se deben encontrar
+    for numero in range(0, 400, 7):
+        huespedes[f"H{numero}"]["activo"] = False
+        hotel.actualizar_arbol_nombres(huespedes, f"H{numero}")
+    assert len(arbol["ids_por_palabra"]) < len(arbol["palabras"])
+
+    for _ in range(150):
+        palabra = palabra_al_azar(azar, 8)
+        distancias = {vigente: distancia_por_tabla(palabra, vigente) for vigente in arbol["ids_por_palabra"]}
+        for distancia_maxima in (0, 1, 2, 3):
+            esperadas = {vigente: distancia for vigente, distancia in distancias.items() if distancia <= distancia_maxima}
+            assert hotel.palabras_cercanas(arbol, palabra, distancia_maxima) == esperadas, (palabra, distancia_maxima)
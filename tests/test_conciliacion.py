@@ -0,0 +1,26 @@
+def test_la_estadia_incluye_la_noche_de_hoy_aunque_haya_empezado_antes(hotel):
+    reservas = hotel.cargar_archivo("reservas.json")
+    estadia = reservas["RSV001ABC"]  # del 01/03/26 al 04/03/26
+
+    assert not hotel.reserva_en_curso(estadia, hotel.fecha_a_ordinal("280226"))
+    assert hotel.reserva_en_curso(estadia, hotel.fecha_a_ordinal("010326"))
+    # Registrada o importada con la entrada ya pasada: sigue ocupando la habitación esta noche
+    assert hotel.reserva_en_curso(estadia, hotel.fecha_a_ordinal("030326"))
+    # El día de salida la habitación ya no está ocupada por esta reserva
+    assert not hotel.reserva_en_curso(estadia, hotel.fecha_a_ordinal("040326"))
+
+
+def test_conciliar_usa_la_misma_regla_que_el_alta(hotel):
+    reservas = hotel.cargar_archivo("reservas.json")
+    habitaciones = hotel.cargar_archivo("habitaciones.json")
+    hoy = hotel.fecha_a_ordinal("020326")
+
+    finalizadas, cambiadas = hotel.conciliar_datos(reservas, habitaciones, hoy)
+
+    assert finalizadas == []
+    assert cambiadas == ["HAB1"]
+    assert habitaciones["HAB1"]["estado"] == "Ocupada"
+    assert habitaciones["HAB2"]["estado"] == "Disponible"
+    for id_hab, datos in habitaciones.items():
+        en_curso = any(r["idhabitacion"] == id_hab and hotel.reserva_en_curso(r, hoy) for r in reservas.values())
+        assert (datos["estado"] == "Ocupada") == en_curso
@@ -0,0 +1,90 @@
+import os
+
+from conftest import backups_de, cargar_terminal, leer_json, reserva
+
+
+def registrar(hotel, rid, datos):
+    reservas = hotel.cargar_archivo("reservas.json")
+    hotel.cargar_archivo("habitaciones.json")
+    reservas[rid] = datos
+    hotel.indexar_reserva(reservas, rid)
+    assert hotel.registrar_reserva_en_diario(reservas, rid, datos["idhabitacion"], "Ocupada")
+    return reservas
+
+
+def lineas_del_diario(hotel):
+    with open(hotel.ARCHIVO_DIARIO_RESERVAS, mode='r', encoding='utf-8') as f:
+        return f.read().splitlines()
+
+
+def test_registrar_agrega_lineas_al_diario_sin_reescribir_los_archivos(hotel):
+    antes = leer_json("reservas.json")
+    registrar(hotel, "RSV005ABC", reserva("H1", "HAB2", "200326", "220326", 2, 150.0))
+
+    assert len(lineas_del_diario(hotel)) == 2
+    assert leer_json("reservas.json") == antes
+    assert leer_json("habitaciones.json")["HAB2"]["estado"] == "Disponible"
+
+    # Otra terminal ve la reserva y el estado de la habitación aplicando el diario al cargar
+    otra = cargar_terminal("terminal_b")
+    assert otra.cargar_archivo("reservas.json")["RSV005ABC"]["idhabitacion"] == "HAB2"
+    assert otra.cargar_archivo("habitaciones.json")["HAB2"]["estado"] == "Ocupada"
+
+
+def test_una_linea_incompleta_se_ignora_y_no_se_pega_al_registro_siguiente(hotel):
+    with open(hotel.ARCHIVO_DIARIO_RESERVAS, mode='w', encoding='utf-8') as f:
+        f.write('{"tipo": "reserva", "id": "RSV009')
+    registrar(hotel, "RSV005ABC", reserva("H1", "HAB2", "200326", "220326", 2, 150.0))
+
+    registros = hotel.leer_diario()
+    assert [registro["tipo"] for registro in registros] == ["reserva", "estado_habitacion"]
+    assert "RSV009" not in cargar_terminal("terminal_b").cargar_archivo("reservas.json")
+
+
+def test_compactar_vuelca_el_diario_y_deja_un_backup_con_sus_registros(hotel):
+    # Un guardado previo deja el backup completo de cada archivo
+    assert hotel.guardar_reservas(hotel.cargar_archivo("reservas.json"), cambiados=[])
+    assert hotel.guardar_habitaciones(hotel.cargar_archivo("habitaciones.json"), cambiados=[])
+    reservas = registrar(hotel, "RSV005ABC", reserva("H1", "HAB2", "200326", "220326", 2, 150.0))
+
+    assert hotel.compactar_diario()
+
+    assert not os.path.exists(hotel.ARCHIVO_DIARIO_RESERVAS)
+    assert leer_json("reservas.json") == reservas
+    assert leer_json("habitaciones.json")["HAB2"]["estado"] == "Ocupada"
+    ultimo_reservas = backups_de(hotel, "reservas.json")[-1]
+    assert ultimo_reservas["tipo"] == "incremental" and list(ultimo_reservas["cambios"]) == ["RSV005ABC"]
+    ultimo_habitaciones = backups_de(hotel, "habitaciones.json")[-1]
+    assert ultimo_habitaciones["tipo"] == "incremental" and list(ultimo_habitaciones["cambios"]) == ["HAB2"]
+    for archivo in ["reservas.json", "habitaciones.json"]:
+        assert hotel.reconstruir_desde_backups(archivo)[0] == leer_json(archivo)
+
+
+def test_el_diario_se_compacta_solo_al_llegar_al_maximo(hotel, monkeypatch):
+    monkeypatch.setattr(hotel, "MAX_REGISTROS_DIARIO", 4)
+    registrar(hotel, "RSV005ABC", reserva("H1", "HAB2", "200326", "220326", 2, 150.0))
+    assert os.path.exists(hotel.ARCHIVO_DIARIO_RESERVAS)
+
+    reservas = registrar(hotel, "RSV006ABC", reserva("H2", "HAB1", "200326", "220326", 2, 100.0))
+
+    assert not os.path.exists(hotel.ARCHIVO_DIARIO_RESERVAS)
+    assert set(leer_json("reservas.json")) == set(reservas) == {"RSV001ABC", "RSV002ABC", "RSV005ABC", "RSV006ABC"}
+
+
+def test_si_no_se_puede_compactar_no_se_reescribe_el_archivo(hotel, monkeypatch):
+    registrar(hotel, "RSV005ABC", reserva("H1", "HAB2", "200326", "220326", 2, 150.0))
+    antes = leer_json("habitaciones.json")
+    tomar_bloqueo = hotel.tomar_bloqueo
+    def compactacion_bloqueada(operacion):
+        if operacion == "compactar diario":
+            raise TimeoutError(f"no se pudo {operacion}")
+        tomar_bloqueo(operacion)
+    monkeypatch.setattr(hotel, "tomar_bloqueo", compactacion_bloqueada)
+
+    habitaciones = hotel.cargar_archivo("habitaciones.json")
+    habitaciones["HAB1"]["precioNoche"] = 120.0
+    assert not hotel.guardar_habitaciones(habitaciones, cambiados=["HAB1"])
+    assert not hotel.guardar_reservas(hotel.cargar_archivo("reservas.json"), cambiados=[])
+
+    assert leer_json("habitaciones.json") == antes
+    assert os.path.exists(hotel.ARCHIVO_DIARIO_RESERVAS)
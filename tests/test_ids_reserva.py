@@ -0,0 +1,54 @@
+import math
+import random
+import re
+
+FORMATO_ID = re.compile(r"RSV\d{3}[A-Z]{3}")
+
+
+def numero_de_id(hotel, rid):
+    """Invierte la permutación: pasa el ID a su valor y deshace la transformación afín."""
+    digitos, letras = int(rid[3:6]), rid[6:]
+    valor = digitos * 26 ** 3
+    for posicion, letra in enumerate(letras):
+        valor += hotel.LETRAS_ID_RESERVA.index(letra) * 26 ** (2 - posicion)
+    inverso = pow(hotel.MULTIPLICADOR_IDS_RESERVA, -1, hotel.ESPACIO_IDS_RESERVA)
+    return (valor - hotel.DESPLAZAMIENTO_IDS_RESERVA) * inverso % hotel.ESPACIO_IDS_RESERVA
+
+
+def test_cada_numero_tiene_un_id_propio(hotel):
+    # Multiplicador coprimo con el espacio: la transformación afín es una biyección
+    assert math.gcd(hotel.MULTIPLICADOR_IDS_RESERVA, hotel.ESPACIO_IDS_RESERVA) == 1
+    assert hotel.ESPACIO_IDS_RESERVA == 1000 * 26 ** 3
+
+    consecutivos = [hotel.id_reserva_de_numero(numero) for numero in range(200000)]
+    assert len(set(consecutivos)) == len(consecutivos)
+    azar = random.Random(2020)
+    muestra = [azar.randrange(hotel.ESPACIO_IDS_RESERVA) for _ in range(20000)] + [hotel.ESPACIO_IDS_RESERVA - 1]
+    for numero in muestra:
+        rid = hotel.id_reserva_de_numero(numero)
+        assert FORMATO_ID.fullmatch(rid), rid
+        assert numero_de_id(hotel, rid) == numero
+
+
+def test_se_saltean_los_ids_que_ya_existen(hotel):
+    reservas = {hotel.id_reserva_de_numero(0): {}, hotel.id_reserva_de_numero(1): {}, hotel.id_reserva_de_numero(3): {}}
+
+    assert hotel.generar_id_reserva(reservas) == hotel.id_reserva_de_numero(2)
+    assert hotel.leer_secuencia_reservas() == 3
+    assert hotel.generar_id_reserva(reservas) == hotel.id_reserva_de_numero(4)
+    assert hotel.leer_secuencia_reservas() == 5
+
+
+def test_el_contador_se_comparte_entre_terminales(hotel, otra_terminal):
+    asignados = []
+    for terminal in [hotel, otra_terminal, hotel, otra_terminal]:
+        asignados.append(terminal.generar_id_reserva({}))
+
+    assert asignados == [hotel.id_reserva_de_numero(numero) for numero in range(4)]
+    assert otra_terminal.leer_secuencia_reservas() == 4
+    assert hotel.ids_reserva_restantes() == hotel.ESPACIO_IDS_RESERVA - 4
+
+
+def test_sin_ids_libres_no_se_asigna_ninguno(hotel, monkeypatch):
+    monkeypatch.setattr(hotel, "ESPACIO_IDS_RESERVA", 3)
+    assert hotel.siguiente_id_reserva({hotel.id_reserva_de_numero(2): {}}, 2) == (None, 3)
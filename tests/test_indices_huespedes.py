@@ -0,0 +1,85 @@
+import copy
+
+from conftest import habitacion, huesped
+
+
+def estado_indices(hotel, entidad, datos):
+    """Contenido de los índices de una entidad, armándolos si hace falta (sin las palabras huérfanas del árbol)."""
+    estado = {"unicidad": copy.deepcopy({campo: claves for campo, claves in hotel.indice_unicidad(entidad, datos)["claves"].items()}),
+              "autocompletado": list(hotel.indice_autocompletado(entidad, datos)["claves"])}
+    if entidad == "huespedes":
+        texto = hotel.indice_texto_huespedes(datos)
+        estado["texto"] = copy.deepcopy((texto["por_id"], texto["textos"], texto["trigramas"]))
+        arbol = hotel.arbol_nombres_huespedes(datos)
+        estado["arbol"] = copy.deepcopy((arbol["por_id"], arbol["ids_por_palabra"]))
+    return estado
+
+
+def construcciones(hotel):
+    return (hotel.ESTADISTICAS_UNICIDAD["construcciones"], hotel.ESTADISTICAS_AUTOCOMPLETADO["construcciones"],
+            hotel.ESTADISTICAS_TEXTO_HUESPEDES["construcciones"], hotel.ESTADISTICAS_ARBOL_NOMBRES["construcciones"])
+
+
+def indices_recien_armados(hotel, entidad, datos):
+    hotel.descartar_indices(datos)
+    return estado_indices(hotel, entidad, datos)
+
+
+def test_alta_modificacion_y_baja_de_huespedes_dejan_los_indices_como_recien_armados(hotel):
+    huespedes = hotel.cargar_archivo("huespedes.json")
+    estado_indices(hotel, "huespedes", huespedes)
+    armados = construcciones(hotel)
+
+    huespedes["H3"] = huesped("Marta", "Ibáñez", 30111444, "marta@mail.com", 1155550003)
+    hotel.actualizar_indices("huespedes", huespedes, "H3")
+    huespedes["H1"].update(apellido="Pereyra", email="ana.pereyra@mail.com")
+    hotel.actualizar_indices("huespedes", huespedes, "H1")
+    huespedes["H2"]["activo"] = False
+    hotel.actualizar_indices("huespedes", huespedes, "H2")
+    del huespedes["H3"]
+    hotel.actualizar_indices("huespedes", huespedes, "H3")
+    huespedes["H4"] = huesped("Pedro", "Pérez", 30111555, "pedro@mail.com", 1155550004)
+    hotel.actualizar_indices("huespedes", huespedes, "H4")
+
+    actualizados = estado_indices(hotel, "huespedes", huespedes)
+    # Los índices se pusieron al día registro por registro, sin volver a armarlos
+    assert construcciones(hotel) == armados
+    assert actualizados == indices_recien_armados(hotel, "huespedes", huespedes)
+    assert hotel.registro_con_clave("huespedes", huespedes, "documento", 30111333) is None
+    assert [idh for idh, _ in hotel.buscar_huespedes_aproximado(huespedes, "pereira")[0]] == ["H1"]
+
+
+def test_alta_modificacion_y_baja_de_habitaciones_dejan_los_indices_como_recien_armados(hotel):
+    habitaciones = hotel.cargar_archivo("habitaciones.json")
+    estado_indices(hotel, "habitaciones", habitaciones)
+    armados = construcciones(hotel)
+
+    habitaciones["HAB3"] = habitacion(103, 120.0)
+    hotel.actualizar_indices("habitaciones", habitaciones, "HAB3")
+    habitaciones["HAB1"]["numero"] = 201
+    hotel.actualizar_indices("habitaciones", habitaciones, "HAB1")
+    habitaciones["HAB2"]["activo"] = False
+    hotel.actualizar_indices("habitaciones", habitaciones, "HAB2")
+
+    actualizados = estado_indices(hotel, "habitaciones", habitaciones)
+    assert construcciones(hotel) == armados
+    assert actualizados == indices_recien_armados(hotel, "habitaciones", habitaciones)
+    assert hotel.sugerencias_autocompletado("habitaciones", habitaciones, "20") == ["HAB1"]
+
+
+def test_descartar_suelta_todos_los_indices_del_diccionario(hotel):
+    huespedes = hotel.cargar_archivo("huespedes.json")
+    reservas = hotel.cargar_archivo("reservas.json")
+    estado_indices(hotel, "huespedes", huespedes)
+    hotel.indice_intervalos(reservas)
+    hotel.indice_salidas(reservas)
+
+    hotel.descartar_indices(huespedes)
+
+    assert "huespedes" not in hotel.INDICE_UNICIDAD and "huespedes" not in hotel.AUTOCOMPLETADO
+    assert hotel.INDICE_TEXTO_HUESPEDES["datos"] is None and hotel.ARBOL_NOMBRES_HUESPEDES["datos"] is None
+    # Los índices armados sobre otro diccionario no se tocan
+    assert hotel.INDICE_INTERVALOS["datos"] is reservas and hotel.INDICE_SALIDAS["datos"] is reservas
+
+    hotel.descartar_indices(reservas)
+    assert hotel.INDICE_INTERVALOS["datos"] is None and hotel.INDICE_SALIDAS["datos"] is None
@@ -0,0 +1,70 @@
+from conftest import reserva
+
+
+def noche(hotel, fecha):
+    return hotel.fecha_a_ordinal(fecha)
+
+
+def test_un_cambio_de_habitacion_guardado_en_el_lugar_rearma_los_indices(hotel):
+    reservas = hotel.cargar_archivo("reservas.json")
+    entrada = noche(hotel, "010326")
+    assert hotel.habitacion_ocupada_en(reservas, "HAB1", entrada, entrada + 1)
+    assert "RSV001ABC" in hotel.reservas_activas_indexadas(reservas, "idhabitacion", "HAB1")
+    assert hotel.indice_salidas(reservas)
+
+    # Misma cantidad de reservas, pero una cambia de habitación y de fechas
+    reservas["RSV001ABC"].update(idhabitacion="HAB2", fechaEntrada="010626", fechaSalida="050626", cantidadNoches=4)
+    assert hotel.guardar_reservas(reservas, cambiados=["RSV001ABC"])
+
+    assert not hotel.habitacion_ocupada_en(reservas, "HAB1", entrada, entrada + 1)
+    junio = noche(hotel, "020626")
+    assert hotel.habitacion_ocupada_en(reservas, "HAB2", junio, junio + 1)
+    assert hotel.reservas_activas_indexadas(reservas, "idhabitacion", "HAB1") == {}
+    assert "RSV001ABC" in hotel.reservas_activas_indexadas(reservas, "idhabitacion", "HAB2")
+    assert (noche(hotel, "050626"), "RSV001ABC") in hotel.indice_salidas(reservas)
+
+
+def test_registrar_en_el_diario_mantiene_los_indices_sin_rearmarlos(hotel):
+    reservas = hotel.cargar_archivo("reservas.json")
+    hotel.cargar_archivo("habitaciones.json")
+    hotel.reservas_activas_indexadas(reservas, "idhuesped", "H1")
+    hotel.indice_salidas(reservas)
+    hotel.indice_intervalos(reservas)
+    construcciones = (hotel.ESTADISTICAS_INTERVALOS["construcciones"], hotel.ESTADISTICAS_INDICE_POR_ID["construcciones"])
+
+    reservas["RSV005ABC"] = reserva("H1", "HAB2", "200326", "220326", 2, 150.0)
+    hotel.indexar_reserva(reservas, "RSV005ABC")
+    firma_previa = hotel.firma_indices_reservas(reservas)
+    assert hotel.registrar_reserva_en_diario(reservas, "RSV005ABC", "HAB2", "Disponible")
+    hotel.sellar_indices_reservas(reservas, firma_previa)
+
+    entrada = noche(hotel, "200326")
+    assert hotel.habitacion_ocupada_en(reservas, "HAB2", entrada, entrada + 1)
+    assert "RSV005ABC" in hotel.reservas_activas_indexadas(reservas, "idhuesped", "H1")
+    assert (noche(hotel, "220326"), "RSV005ABC") in hotel.indice_salidas(reservas)
+    assert (hotel.ESTADISTICAS_INTERVALOS["construcciones"], hotel.ESTADISTICAS_INDICE_POR_ID["construcciones"]) == construcciones
+
+
+def test_los_indices_incrementales_coinciden_con_los_armados_de_cero(hotel):
+    reservas = hotel.cargar_archivo("reservas.json")
+    hotel.indice_intervalos(reservas)
+    hotel.indice_por_id(reservas, "idhuesped")
+    hotel.indice_salidas(reservas)
+    for numero, (entrada, salida) in enumerate([("150326", "180326"), ("050326", "080326"), ("010427", "030427")]):
+        rid = f"RSV10{numero}XYZ"
+        reservas[rid] = reserva("H2", "HAB1", entrada, salida, 3, 100.0)
+        hotel.indexar_reserva(reservas, rid)
+    incrementales = (
+        {hab: dict(datos) for hab, datos in hotel.indice_intervalos(reservas).items()},
+        {campo: {clave: sorted(lista["reservas"]) for clave, lista in hotel.indice_por_id(reservas, campo).items()}
+         for campo in hotel.CAMPOS_INDICE_POR_ID},
+        list(hotel.indice_salidas(reservas)),
+    )
+    hotel.descartar_indices(reservas)
+    de_cero = (
+        {hab: dict(datos) for hab, datos in hotel.indice_intervalos(reservas).items()},
+        {campo: {clave: sorted(lista["reservas"]) for clave, lista in hotel.indice_por_id(reservas, campo).items()}
+         for campo in hotel.CAMPOS_INDICE_POR_ID},
+        list(hotel.indice_salidas(reservas)),
+    )
+    assert incrementales == de_cero
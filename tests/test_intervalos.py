@@ -0,0 +1,56 @@
+import datetime
+import random
+
+from conftest import reserva
+
+HABITACIONES = ["HAB1", "HAB2", "HAB3"]
+
+
+def ddmmaa(ordinal):
+    return datetime.date.fromordinal(ordinal).strftime("%d%m%y")
+
+
+def reserva_al_azar(hotel, azar):
+    """Reserva con fechas dentro del calendario: a veces solapada con otras, invertida o con una fecha inexistente."""
+    entrada = hotel.PRIMER_DIA_CALENDARIO + azar.randrange(hotel.DIAS_CALENDARIO - 30)
+    salida = entrada + azar.randint(1, 20)
+    datos = reserva("H1", azar.choice(HABITACIONES), ddmmaa(entrada), ddmmaa(salida), salida - entrada, 100.0)
+    caso = azar.random()
+    if caso < 0.1:
+        datos["fechaEntrada"], datos["fechaSalida"] = datos["fechaSalida"], datos["fechaEntrada"]
+    elif caso < 0.15:
+        datos["fechaSalida"] = "310226"
+    return datos
+
+
+def consultas_al_azar(hotel, azar, cantidad):
+    for _ in range(cantidad):
+        entrada = hotel.PRIMER_DIA_CALENDARIO + azar.randrange(hotel.DIAS_CALENDARIO - 30)
+        salida = entrada + azar.randint(-3, 25)
+        yield azar.choice(HABITACIONES), entrada, salida
+
+
+def test_el_indice_responde_igual_que_el_recorrido_completo(hotel):
+    azar = random.Random(20250703)
+    reservas = {f"RSV{numero:03d}AAA": reserva_al_azar(hotel, azar) for numero in range(300)}
+
+    for id_hab, entrada, salida in consultas_al_azar(hotel, azar, 3000):
+        assert hotel.habitacion_ocupada_en(reservas, id_hab, entrada, salida) == \
+            hotel.solapa_reserva_exhaustiva(reservas, id_hab, entrada, salida), (id_hab, entrada, salida)
+
+
+def test_el_indice_actualizado_con_cada_alta_responde_igual_que_el_recorrido_completo(hotel, monkeypatch):
+    monkeypatch.setattr(hotel, "VERIFICAR_INDICE_INTERVALOS", True)
+    azar = random.Random(17)
+    reservas = {}
+    hotel.indice_intervalos(reservas)
+    for numero in range(200):
+        rid = f"RSV{numero:03d}AAA"
+        reservas[rid] = reserva_al_azar(hotel, azar)
+        hotel.indexar_reserva(reservas, rid)
+        for id_hab, entrada, salida in consultas_al_azar(hotel, azar, 10):
+            hotel.solapa_reserva(reservas, id_hab, entrada, salida)
+
+    assert hotel.ESTADISTICAS_INTERVALOS["verificaciones"] == 2000
+    assert hotel.ESTADISTICAS_INTERVALOS["discrepancias"] == 0
+    assert hotel.ESTADISTICAS_INTERVALOS["construcciones"] == 1
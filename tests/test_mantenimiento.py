@@ -0,0 +1,39 @@
+
+def hotel_con_habitacion_en_mantenimiento(hotel):
+    huespedes = hotel.cargar_archivo("huespedes.json")
+    habitaciones = hotel.cargar_archivo("habitaciones.json")
+    habitaciones["HAB1"]["estado"] = "Mantenimiento"
+    reservas = hotel.cargar_archivo("reservas.json")
+    return huespedes, habitaciones, reservas
+
+
+def test_importar_rechaza_una_habitacion_en_mantenimiento(hotel):
+    huespedes, habitaciones, reservas = hotel_con_habitacion_en_mantenimiento(hotel)
+    fila = {"idhuesped": "H1", "idhabitacion": "HAB1", "fechaEntrada": "200326", "fechaSalida": "220326", "descuento": "0"}
+
+    datos, motivo = hotel.validar_fila_importacion(fila, reservas, huespedes, habitaciones)
+
+    assert datos is None and "mantenimiento" in motivo
+    # Ocupada solo describe el día de hoy: se puede reservar para otras fechas
+    habitaciones["HAB2"]["estado"] = "Ocupada"
+    fila["idhabitacion"] = "HAB2"
+    assert hotel.validar_fila_importacion(fila, reservas, huespedes, habitaciones)[1] is None
+
+
+def test_asignar_no_ubica_solicitudes_en_habitaciones_en_mantenimiento(hotel):
+    huespedes, habitaciones, reservas = hotel_con_habitacion_en_mantenimiento(hotel)
+    entrada, salida = hotel.fecha_a_ordinal("200326"), hotel.fecha_a_ordinal("220326")
+    solicitudes = {1: ("H1", "Doble", entrada, salida), 2: ("H2", "Doble", entrada, salida)}
+
+    asignadas = hotel.asignar_habitaciones(solicitudes, reservas, habitaciones)
+
+    # Las dos son dobles, pero HAB1 está en mantenimiento: solo una entra, en HAB2
+    assert list(asignadas.values()) == ["HAB2"]
+
+
+def test_buscar_disponibles_no_lista_habitaciones_en_mantenimiento(hotel):
+    huespedes, habitaciones, reservas = hotel_con_habitacion_en_mantenimiento(hotel)
+    entrada, salida = hotel.fecha_a_ordinal("200326"), hotel.fecha_a_ordinal("220326")
+
+    assert hotel.habitaciones_libres(reservas, habitaciones, entrada, salida) == ["HAB2"]
+    assert hotel.habitaciones_libres(reservas, habitaciones, entrada, salida, "Doble") == ["HAB2"]
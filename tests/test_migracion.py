@@ -0,0 +1,40 @@
+from conftest import escribir_json, leer_json, reserva
+
+
+def test_migrar_guarda_las_fechas_y_pone_al_dia_indices_y_almacen_columnar(hotel):
+    reservas = leer_json("reservas.json")
+    reservas["RSV003ABC"] = reserva("H2", "HAB1", "0106", "0506", 4, 100.0)
+    reservas["RSV004ABC"] = reserva("H2", "HAB2", "310225", "020325", 2, 150.0)
+    escribir_json("reservas.json", reservas)
+
+    reservas = hotel.cargar_archivo("reservas.json")
+    habitaciones = hotel.cargar_archivo("habitaciones.json")
+    matriz = {hab_id: {mes: 0 for mes in range(1, 13)} for hab_id in habitaciones}
+    hotel.acumular_matriz_columnar(reservas, habitaciones, 2025, matriz, False)
+    inicio_junio = hotel.fecha_a_ordinal("010625")
+    assert not hotel.habitacion_ocupada_en(reservas, "HAB1", inicio_junio, inicio_junio + 1)
+
+    assert hotel.migrar_reservas_ddmmaa(reservas) is reservas
+
+    en_disco = leer_json("reservas.json")
+    assert en_disco["RSV003ABC"]["fechaEntrada"] == "010625"
+    assert "RSV004ABC" not in en_disco
+    assert hotel.cargar_archivo("reservas.json") is reservas
+    assert not hotel.esta_desactualizado("reservas.json", reservas)
+    assert hotel.habitacion_ocupada_en(reservas, "HAB1", inicio_junio, inicio_junio + 1)
+    assert "RSV003ABC" in hotel.reservas_activas_indexadas(reservas, "idhuesped", "H2")
+
+    matriz = {hab_id: {mes: 0 for mes in range(1, 13)} for hab_id in habitaciones}
+    assert hotel.acumular_matriz_columnar(reservas, habitaciones, 2025, matriz, False)
+    assert matriz["HAB1"][6] == 4
+    assert matriz["HAB2"][2] == 0
+
+
+def test_migrar_sin_fechas_antiguas_no_guarda_ni_descarta_indices(hotel, monkeypatch):
+    reservas = hotel.cargar_archivo("reservas.json")
+    indice = hotel.indice_intervalos(reservas)
+    def guardado_prohibido(*argumentos):
+        raise AssertionError("se guardaron reservas sin cambios")
+    monkeypatch.setattr(hotel, "guardar_reservas", guardado_prohibido)
+    hotel.migrar_reservas_ddmmaa(reservas)
+    assert hotel.indice_intervalos(reservas) is indice
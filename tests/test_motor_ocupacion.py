@@ -0,0 +1,65 @@
+import datetime
+import random
+
+import pytest
+
+from conftest import habitacion, reserva
+
+DIAS = 90
+
+
+def datos_al_azar(hotel, semilla):
+    azar = random.Random(semilla)
+    habitaciones = {}
+    for numero in range(12):
+        datos = habitacion(100 + numero, 100.0)
+        datos["tipo"] = azar.choice(["Simple", "Doble", "Suite"])
+        datos["piso"] = azar.randint(1, 3)
+        datos["activo"] = numero != 5
+        habitaciones[f"HAB{numero}"] = datos
+    # Una habitación sin ninguna noche libre y otra sin reservas
+    habitaciones["LLENA"] = habitacion(200, 100.0)
+    habitaciones["VACIA"] = habitacion(201, 100.0)
+    desde = datetime.date(2026, 3, 1).toordinal()
+    pares = [("RSVLLENA", reserva("H1", "LLENA", "150226", "150626", 120, 100.0))]
+    for numero in range(150):
+        entrada = desde + azar.randint(-10, DIAS + 5)
+        salida = entrada + azar.randint(1, 12)
+        fechas = [datetime.date.fromordinal(dia).strftime("%d%m%y") for dia in (entrada, salida)]
+        pares.append((f"RSV{numero:03d}", reserva("H1", f"HAB{azar.randrange(12)}", fechas[0], fechas[1], salida - entrada, 100.0)))
+    return pares, habitaciones, desde
+
+
+def resultados(hotel, pares, habitaciones, desde):
+    ids, matriz = hotel.matriz_ocupacion(pares, habitaciones, desde, DIAS)
+    filas = [[int(ocupada) for ocupada in fila] for fila in matriz]
+    return (ids, filas, hotel.libres_por_grupo(ids, matriz, habitaciones, "tipo", DIAS),
+            hotel.libres_por_grupo(ids, matriz, habitaciones, "piso", DIAS), hotel.rachas_libres_mas_largas(ids, matriz, DIAS))
+
+
+def test_la_version_en_python_coincide_con_el_recorrido_noche_por_noche(hotel, monkeypatch):
+    monkeypatch.setattr(hotel, "numpy", None)
+    pares, habitaciones, desde = datos_al_azar(hotel, 3)
+
+    ids, filas, por_tipo, por_piso, rachas = resultados(hotel, pares, habitaciones, desde)
+
+    assert ids == [idh for idh, datos in habitaciones.items() if datos["activo"]]
+    for idh, fila in zip(ids, filas):
+        estadias = [hotel.intervalo_de_reserva(datos) for _, datos in pares if datos["idhabitacion"] == idh]
+        assert fila == [int(any(entrada <= desde + noche < salida for entrada, salida in estadias)) for noche in range(DIAS)]
+    for tipo, libres in por_tipo.items():
+        assert libres == [sum(1 for idh, fila in zip(ids, filas) if habitaciones[idh]["tipo"] == tipo and not fila[noche])
+                          for noche in range(DIAS)]
+    assert rachas["LLENA"] == (0, None) and rachas["VACIA"] == (DIAS, 0)
+
+
+@pytest.mark.parametrize("semilla", [1, 2, 3])
+def test_numpy_y_python_dan_los_mismos_resultados(hotel, monkeypatch, semilla):
+    pytest.importorskip("numpy")
+    pares, habitaciones, desde = datos_al_azar(hotel, semilla)
+
+    con_numpy = resultados(hotel, pares, habitaciones, desde)
+    monkeypatch.setattr(hotel, "numpy", None)
+    sin_numpy = resultados(hotel, pares, habitaciones, desde)
+
+    assert con_numpy == sin_numpy
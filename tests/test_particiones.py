@@ -0,0 +1,96 @@
+import pytest
+
+from conftest import leer_json, reserva
+
+
+def carga_completa_prohibida(*argumentos):
+    raise AssertionError("se cargaron todas las particiones")
+
+
+@pytest.fixture
+def hotel_particionado(hotel, monkeypatch):
+    """Reservas particionadas por año (2025 y 2026). La de 2025 tiene el primer ID que asignaría el contador."""
+    reservas = leer_json("reservas.json")
+    reservas[hotel.id_reserva_de_numero(0)] = reserva("H1", "HAB1", "100525", "120525", 2, 100.0)
+    hotel.escribir_particiones_reservas(reservas, hotel.ARCHIVO_MANIFIESTO_RESERVAS)
+    monkeypatch.setattr(hotel, "ARCHIVO_RESERVAS", hotel.ARCHIVO_MANIFIESTO_RESERVAS)
+    return hotel
+
+
+def ingresar(monkeypatch, *respuestas):
+    pendientes = iter(respuestas)
+    monkeypatch.setattr("builtins.input", lambda mensaje: next(pendientes))
+
+
+def dia(hotel, fecha):
+    return hotel.fecha_a_ordinal(fecha)
+
+
+def test_la_particion_se_devuelve_sin_copiar_y_el_indice_dura_entre_consultas(hotel_particionado):
+    hotel = hotel_particionado
+    particion = hotel.cargar_particion_reservas("2026")
+
+    assert hotel.solapa_reserva(None, "HAB1", dia(hotel, "020326"), dia(hotel, "050326"))
+    assert not hotel.solapa_reserva(None, "HAB1", dia(hotel, "050326"), dia(hotel, "080326"))
+    assert not hotel.solapa_reserva(None, "HAB2", dia(hotel, "010326"), dia(hotel, "100326"))
+
+    assert hotel.cargar_particion_reservas("2026") is particion
+    assert hotel.ESTADISTICAS_INTERVALOS["construcciones"] == 1
+
+
+def test_registrar_una_reserva_no_carga_todas_las_particiones(hotel_particionado, monkeypatch):
+    hotel = hotel_particionado
+    monkeypatch.setattr(hotel, "leer_particiones_reservas", carga_completa_prohibida)
+    particion = hotel.cargar_particion_reservas("2026")
+    ingresar(monkeypatch, "H1", "HAB1", "200326", "220326", "0")
+
+    hotel.registrar_reserva(hotel.ARCHIVO_RESERVAS)
+
+    # El primer ID del contador ya estaba en la partición de 2025: se saltea
+    rid = hotel.id_reserva_de_numero(1)
+    assert [registro["id"] for registro in hotel.leer_diario() if registro["tipo"] == "reserva"] == [rid]
+    assert hotel.cargar_particion_reservas("2026") is particion
+    assert particion[rid]["fechaEntrada"] == "200326"
+    assert hotel.solapa_reserva(None, "HAB1", dia(hotel, "210326"), dia(hotel, "230326"))
+    assert hotel.ESTADISTICAS_INTERVALOS["construcciones"] == 1
+
+
+def test_una_reserva_anotada_por_otra_terminal_se_ve_en_la_particion(hotel_particionado, otra_terminal, monkeypatch):
+    hotel = hotel_particionado
+    monkeypatch.setattr(otra_terminal, "ARCHIVO_RESERVAS", hotel.ARCHIVO_MANIFIESTO_RESERVAS)
+    assert not hotel.solapa_reserva(None, "HAB2", dia(hotel, "150326"), dia(hotel, "170326"))
+
+    reservas = {"RSV005ABC": reserva("H2", "HAB2", "140326", "160326", 2, 150.0)}
+    assert otra_terminal.registrar_reserva_en_diario(reservas, "RSV005ABC", "HAB2", "Disponible")
+
+    assert hotel.solapa_reserva(None, "HAB2", dia(hotel, "150326"), dia(hotel, "170326"))
+    assert "RSV005ABC" not in hotel.cargar_particion_reservas("2025")
+
+
+def test_el_informe_anual_lee_solo_la_particion_del_anio(hotel_particionado, monkeypatch):
+    hotel = hotel_particionado
+    leidas = []
+    cargar_particion = hotel.cargar_particion_reservas
+    def anotar_lectura(clave):
+        leidas.append(clave)
+        return cargar_particion(clave)
+    monkeypatch.setattr(hotel, "cargar_particion_reservas", anotar_lectura)
+    monkeypatch.setattr(hotel, "leer_particiones_reservas", carga_completa_prohibida)
+    habitaciones = hotel.cargar_archivo("habitaciones.json")
+    matriz = {hab_id: {mes: 0 for mes in range(1, 13)} for hab_id in habitaciones}
+
+    assert hotel.acumular_matriz_columnar(None, habitaciones, 2025, matriz, False)
+
+    assert matriz["HAB1"][5] == 2
+    assert sum(matriz["HAB1"].values()) + sum(matriz["HAB2"].values()) == 2
+    assert set(leidas) == {"2025"}
+    assert hotel.leer_metadatos_columnar("reservas.columnas.2025")["filas"] == 1
+
+    # Una reserva anotada en el diario se agrega al almacén del año sin reconstruirlo
+    reservas = {"RSV005ABC": reserva("H2", "HAB2", "010725", "050725", 4, 150.0)}
+    assert hotel.registrar_reserva_en_diario(reservas, "RSV005ABC", "HAB2", "Disponible")
+    monkeypatch.setattr(hotel, "recorrer_reservas", carga_completa_prohibida)
+    matriz = {hab_id: {mes: 0 for mes in range(1, 13)} for hab_id in habitaciones}
+    assert hotel.acumular_matriz_columnar(None, habitaciones, 2025, matriz, False)
+    assert (matriz["HAB1"][5], matriz["HAB2"][7]) == (2, 4)
+    assert set(leidas) == {"2025"}
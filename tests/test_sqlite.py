@@ -0,0 +1,56 @@
+import pytest
+
+
+@pytest.fixture
+def hotel_sqlite(hotel, monkeypatch):
+    """La terminal de prueba con los archivos JSON importados a la base SQLite."""
+    assert hotel.importar_json_a_sqlite()
+    monkeypatch.setattr(hotel, "MOTOR_ALMACENAMIENTO", "sqlite")
+    yield hotel
+    hotel.obtener_conexion_sqlite().close()
+
+
+def sentencias_al_guardar(hotel, tabla, guardar):
+    """Sentencias que tocan la tabla durante un guardado."""
+    sentencias = []
+    conexion = hotel.obtener_conexion_sqlite()
+    conexion.set_trace_callback(sentencias.append)
+    try:
+        assert guardar()
+    finally:
+        conexion.set_trace_callback(None)
+    return [sentencia for sentencia in sentencias if f" {tabla}" in sentencia]
+
+
+def filas(hotel, tabla):
+    return dict(hotel.obtener_conexion_sqlite().execute(f"SELECT id, datos FROM {tabla}"))
+
+
+def test_guardar_escribe_solo_las_filas_cambiadas(hotel_sqlite, monkeypatch):
+    hotel = hotel_sqlite
+    def huella_prohibida(*args):
+        raise AssertionError("se calculó una huella por registro")
+    monkeypatch.setattr(hotel.hashlib, "sha1", huella_prohibida)
+    huespedes = hotel.cargar_archivo("huespedes.json")
+    antes = filas(hotel, "huespedes")
+
+    huespedes["H1"]["telefono"] = 1144443333
+    sentencias = sentencias_al_guardar(hotel, "huespedes", lambda: hotel.guardar_huespedes(huespedes, cambiados=["H1"]))
+    assert len(sentencias) == 1 and sentencias[0].startswith("INSERT OR REPLACE INTO huespedes")
+    despues = filas(hotel, "huespedes")
+    assert despues["H2"] == antes["H2"] and despues["H1"] != antes["H1"]
+
+    del huespedes["H2"]
+    sentencias = sentencias_al_guardar(hotel, "huespedes", lambda: hotel.guardar_huespedes(huespedes, cambiados=["H2"]))
+    assert sentencias == ["DELETE FROM huespedes WHERE id = 'H2'"]
+    assert set(filas(hotel, "huespedes")) == {"H1"}
+
+
+def test_guardar_sin_claves_cambiadas_reemplaza_la_tabla(hotel_sqlite):
+    hotel = hotel_sqlite
+    reemplazo = {"HAB9": dict(hotel.cargar_archivo("habitaciones.json")["HAB1"], numero=109)}
+
+    hotel.escribir_datos(reemplazo, "habitaciones.json")
+
+    assert set(filas(hotel, "habitaciones")) == {"HAB9"}
+    assert hotel.cargar_archivo("habitaciones.json") == reemplazo